@@ -0,0 +1,151 @@
+# -*- encoding: utf-8 -*-
+"""
+Benchmarks for decoding api responses.
+
+The pages of a large task list are served by a local server and recorded once, the benchmarks
+then replay the recorded calls without any network access.
+"""
+from __future__ import absolute_import
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urlparse import parse_qs, urlparse
+
+import requests
+
+from evergreen.api import EvergreenApi, JSONDecodeError
+from evergreen.transport import RecordingTransport, ReplayTransport
+
+from harness import print_results, time_benchmark
+
+N_PAGES = 10
+N_TASKS_PER_PAGE = 100
+SAMPLE_TASK_FILE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'evergreen', 'data',
+                                'task.json')
+
+
+def task_list_pages(n_pages=N_PAGES, n_tasks=N_TASKS_PER_PAGE):
+    """Create the bodies of pages of a large task list."""
+    with open(SAMPLE_TASK_FILE) as task_file:
+        task = json.load(task_file)
+    pages = []
+    for page in range(n_pages):
+        tasks = [dict(task, task_id='task_{}_{}'.format(page, i)) for i in range(n_tasks)]
+        pages.append(json.dumps(tasks).encode('utf-8'))
+    return pages
+
+
+class _TaskPagesHandler(BaseHTTPRequestHandler):
+    """Serve the pages of a large task list, linking each page to the next."""
+
+    def do_GET(self):
+        pages = self.server.pages
+        page = int(parse_qs(urlparse(self.path).query).get('start_at', ['0'])[0])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(pages[page])))
+        if page + 1 < len(pages):
+            next_url = '{}/rest/v2/builds/build_id/tasks?start_at={}'.format(
+                self.server.url, page + 1)
+            self.send_header('Link', '<{}>; rel="next"'.format(next_url))
+        self.end_headers()
+        self.wfile.write(pages[page])
+
+    def log_message(self, *args):
+        pass
+
+
+def record_task_pages(pages, cassette_dir):
+    """
+    Record getting and iterating over every task of a build from a local server.
+
+    :param pages: Bodies of the pages of tasks.
+    :param cassette_dir: Directory to record the calls to.
+    :return: Url of the api server the calls were recorded from.
+    """
+    server = HTTPServer(('127.0.0.1', 0), _TaskPagesHandler)
+    server.pages = pages
+    server.url = 'http://127.0.0.1:{}'.format(server.server_port)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        api = EvergreenApi(api_server=server.url)
+        api.session = RecordingTransport(api.session, cassette_dir)
+        api.tasks_by_build('build_id')
+        list(api.iter_tasks_by_build('build_id'))
+        api.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return server.url
+
+
+class _DoubleDecodingApi(EvergreenApi):
+    """Api with the response pipeline that decoded every body several times, for comparison."""
+
+    @staticmethod
+    def _raise_for_status(response):
+        try:
+            json_data = response.json()
+            if response.status_code >= 400 and 'error' in json_data:
+                raise requests.exceptions.HTTPError(json_data['error'], response=response)
+        except JSONDecodeError:
+            pass
+
+        response.raise_for_status()
+
+    def _paginate(self, url, params=None):
+        response = self._call_api(url, params)
+        json_data = response.json()
+        while "next" in response.links:
+            response = self._call_api(response.links['next']['url'])
+            if response.json():
+                json_data.extend(response.json())
+
+        return json_data
+
+
+def tasks_by_build(api_class, api_server, cassette_dir):
+    """Get every task of a build with many pages of tasks."""
+    api = api_class(api_server=api_server)
+    api.session = ReplayTransport(cassette_dir)
+    return lambda: api.tasks_by_build('build_id')
+
+
+def iter_tasks_by_build(api_server, cassette_dir):
+    """Iterate over every task of a build with many pages of tasks."""
+    api = EvergreenApi(api_server=api_server)
+    api.session = ReplayTransport(cassette_dir)
+    return lambda: sum(1 for _ in api.iter_tasks_by_build('build_id'))
+
+
+def run():
+    """Run the api benchmarks."""
+    cassette_dir = tempfile.mkdtemp()
+    try:
+        api_server = record_task_pages(task_list_pages(), cassette_dir)
+        return [
+            time_benchmark('api.tasks_by_build',
+                           tasks_by_build(EvergreenApi, api_server, cassette_dir), number=5),
+            time_benchmark('api.tasks_by_build (decoding every body 3 times)',
+                           tasks_by_build(_DoubleDecodingApi, api_server, cassette_dir),
+                           number=5),
+            time_benchmark('api.iter_tasks_by_build',
+                           iter_tasks_by_build(api_server, cassette_dir), number=5),
+        ]
+    finally:
+        shutil.rmtree(cassette_dir)
+
+
+if __name__ == '__main__':
+    print_results(run())
@@ -0,0 +1,98 @@
+# -*- encoding: utf-8 -*-
+"""Benchmarks for build and version metrics."""
+from __future__ import absolute_import
+
+from array import array
+from datetime import date, timedelta
+import random
+
+from evergreen.metrics.buildmetrics import BuildMetrics
+from evergreen.metrics.flakiness import FlakinessScorer
+from evergreen.metrics.stats_util import e_divisive
+from evergreen.metrics.versionmetrics import VersionMetrics
+
+from fixtures import StubApi
+from harness import print_results, time_benchmark
+
+N_BUILD_TASKS = 10000
+N_VERSION_BUILDS = 100
+N_VERSION_TASKS_PER_BUILD = 100
+N_SERIES_POINTS = 400
+N_FLAKINESS_TESTS = 20000
+N_FLAKINESS_DAYS = 90
+
+
+def build_metrics(api):
+    """Calculate the metrics of a build."""
+    return lambda: BuildMetrics(api.build()).calculate()
+
+
+def version_metrics(api):
+    """Calculate the metrics of a version."""
+    return lambda: VersionMetrics(api.version()).calculate()
+
+
+def performance_series(n):
+    """Create a performance series with two change points."""
+    rng = random.Random(0)
+    third = n // 3
+    return [rng.gauss(10, 1) for _ in range(third)] + \
+        [rng.gauss(12, 1) for _ in range(n - 2 * third)] + \
+        [rng.gauss(9, 1) for _ in range(third)]
+
+
+def change_points(values, use_numpy):
+    """Detect the change points of a series with E-Divisive."""
+    return lambda: e_divisive(values, use_numpy=use_numpy)
+
+
+def flakiness_scorer(n_tests, n_days, use_numpy):
+    """Create a flakiness scorer with daily counts for every test."""
+    rng = random.Random(0)
+    after_date = date(2019, 1, 1)
+    scorer = FlakinessScorer(after_date, after_date + timedelta(days=n_days), use_numpy=use_numpy)
+    for test in range(n_tests):
+        key = ('test_{}.js'.format(test), 'task', 'variant')
+        counts = array('L', [rng.randrange(20) for _ in range(n_days)] +
+                       [rng.randrange(3) for _ in range(n_days)])
+        scorer._counts[key] = counts
+    return scorer
+
+
+def flakiness_scores(scorer):
+    """Score the flakiness of every test of a scorer."""
+    return lambda: list(scorer.scores())
+
+
+def run():
+    """Run the metrics benchmarks."""
+    results = [
+        time_benchmark('metrics.build_metrics_10k_tasks',
+                       build_metrics(StubApi(1, N_BUILD_TASKS)), number=1, repeat=3),
+        time_benchmark('metrics.version_metrics_100_builds',
+                       version_metrics(StubApi(N_VERSION_BUILDS, N_VERSION_TASKS_PER_BUILD)),
+                       number=1, repeat=3),
+        time_benchmark('metrics.e_divisive_400_points_python',
+                       change_points(performance_series(N_SERIES_POINTS), False),
+                       number=1, repeat=3),
+        time_benchmark('metrics.flakiness_20k_tests_python',
+                       flakiness_scores(flakiness_scorer(N_FLAKINESS_TESTS, N_FLAKINESS_DAYS,
+                                                         False)),
+                       number=1, repeat=3),
+    ]
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return results
+    results.append(time_benchmark('metrics.e_divisive_400_points_numpy',
+                                  change_points(performance_series(N_SERIES_POINTS), True),
+                                  number=1, repeat=3))
+    results.append(time_benchmark('metrics.flakiness_20k_tests_numpy',
+                                  flakiness_scores(flakiness_scorer(N_FLAKINESS_TESTS,
+                                                                    N_FLAKINESS_DAYS, True)),
+                                  number=1, repeat=3))
+    return results
+
+
+if __name__ == '__main__':
+    print_results(run())
@@ -0,0 +1,53 @@
+# -*- encoding: utf-8 -*-
+"""Benchmarks for the evergreen object model."""
+from __future__ import absolute_import
+
+from evergreen.task import Task
+from evergreen.util import parse_evergreen_datetime
+
+from fixtures import sample_json
+from harness import print_results, time_benchmark
+
+N_OBJECTS = 1000
+
+
+def evg_attrib_access(tasks):
+    """Read plain and datetime evg_attrib properties of many tasks."""
+    def _run():
+        for task in tasks:
+            task.status
+            task.display_name
+            task.start_time
+    return _run
+
+
+def getattr_access(tasks):
+    """Read fields that are only available through __getattr__."""
+    def _run():
+        for task in tasks:
+            task.distro_id
+            task.host_id
+    return _run
+
+
+def parse_datetimes(datetimes):
+    """Parse evergreen datetime strings."""
+    def _run():
+        for datetime_str in datetimes:
+            parse_evergreen_datetime(datetime_str)
+    return _run
+
+
+def run():
+    """Run the object model benchmarks."""
+    tasks = [Task(sample_json('task.json'), None) for _ in range(N_OBJECTS)]
+    datetimes = ['2019-02-13T19:{:02d}:21.000Z'.format(i % 60) for i in range(N_OBJECTS)]
+    return [
+        time_benchmark('models.evg_attrib_access', evg_attrib_access(tasks), number=20),
+        time_benchmark('models.getattr_access', getattr_access(tasks), number=20),
+        time_benchmark('util.parse_evergreen_datetime', parse_datetimes(datetimes), number=5),
+    ]
+
+
+if __name__ == '__main__':
+    print_results(run())
@@ -0,0 +1,81 @@
+# -*- encoding: utf-8 -*-
+"""Benchmarks for formatting performance results."""
+from __future__ import absolute_import
+
+from evergreen.metrics.performance_comparison import compare_performance_data
+from evergreen.performance_results import PerformanceData, PerformanceTestBatch, \
+    _format_performance_results, _is_run_matching
+
+from harness import print_results, time_benchmark
+
+N_THREAD_LEVELS = 48
+N_MEASUREMENTS = 12
+N_VALUES = 5
+N_TEST_RUNS = 50
+
+
+def sys_perf_results(n_thread_levels=N_THREAD_LEVELS, n_measurements=N_MEASUREMENTS,
+                     n_values=N_VALUES):
+    """Create the results of a sys-perf test run with many thread levels."""
+    results = {}
+    for thread_level in range(1, n_thread_levels + 1):
+        thread_results = {}
+        for measurement in range(n_measurements):
+            name = 'measurement_{}'.format(measurement)
+            values = [float(thread_level * measurement + i) for i in range(n_values)]
+            thread_results[name] = sum(values) / n_values
+            thread_results[name + '_values'] = values
+        results[str(thread_level * 2)] = thread_results
+    results['start'] = 1564220585.937
+    results['end'] = 1564246750.222
+    return results
+
+
+def sys_perf_batch(n_test_runs=N_TEST_RUNS):
+    """Create a batch of sys-perf test runs."""
+    return {
+        'results': [{'name': 'test_{}'.format(i), 'results': sys_perf_results()}
+                    for i in range(n_test_runs)],
+    }
+
+
+def format_results(results):
+    """Format a single sys-perf test run."""
+    return lambda: _format_performance_results(results)
+
+
+def match_and_read_results(batch_json):
+    """Filter the runs in a batch and then read the results of the matching runs."""
+    def _run():
+        batch = PerformanceTestBatch(batch_json, None, None)
+        for test_run in batch.test_runs:
+            if _is_run_matching(test_run, None):
+                for result in test_run.test_results:
+                    result.mean_value
+    return _run
+
+
+def compare_batches(base_json, batch_json, use_numpy=None):
+    """Compare the results of two batches."""
+    return lambda: compare_performance_data(PerformanceData({'data': base_json}, None),
+                                            PerformanceData({'data': batch_json}, None),
+                                            use_numpy=use_numpy)
+
+
+def run():
+    """Run the performance results benchmarks."""
+    batch_json = sys_perf_batch()
+    return [
+        time_benchmark('performance_results.format_results', format_results(sys_perf_results()),
+                       number=100),
+        time_benchmark('performance_results.match_and_read_batch',
+                       match_and_read_results(batch_json), number=5),
+        time_benchmark('performance_comparison.compare_batch',
+                       compare_batches(sys_perf_batch(), batch_json), number=1),
+        time_benchmark('performance_comparison.compare_batch_python',
+                       compare_batches(sys_perf_batch(), batch_json, use_numpy=False), number=1),
+    ]
+
+
+if __name__ == '__main__':
+    print_results(run())
@@ -0,0 +1,54 @@
+# -*- encoding: utf-8 -*-
+"""Benchmarks for the json and yaml backends."""
+from __future__ import absolute_import
+
+import yaml
+
+from evergreen import serialization
+
+from fixtures import task_jsons
+from harness import print_results, time_benchmark
+
+N_TASKS = 1000
+
+
+def decode_page(backend, page):
+    """Decode a large page of tasks."""
+    return lambda: backend.loads(page)
+
+
+def encode_lines(backend, records):
+    """Encode records as json lines."""
+    return lambda: [backend.dumps(record) for record in records]
+
+
+def dump_yaml(dumper, records):
+    """Encode records as yaml."""
+    return lambda: yaml.dump(records, Dumper=dumper)
+
+
+def run():
+    """Run the serialization benchmarks."""
+    records = task_jsons(N_TASKS)
+    page = serialization.create_json_backend(serialization.STDLIB_JSON).dumps(records)
+    page = page.encode('utf-8')
+
+    results = []
+    for name in serialization.available_json_backends():
+        backend = serialization.create_json_backend(name)
+        results.append(time_benchmark('serialization.decode_task_page ({})'.format(name),
+                                      decode_page(backend, page), number=20))
+        results.append(time_benchmark('serialization.encode_json_lines ({})'.format(name),
+                                      encode_lines(backend, records), number=20))
+
+    dumpers = [('python', yaml.SafeDumper)]
+    if hasattr(yaml, 'CSafeDumper'):
+        dumpers.append(('libyaml', yaml.CSafeDumper))
+    for name, dumper in dumpers:
+        results.append(time_benchmark('serialization.dump_yaml ({})'.format(name),
+                                      dump_yaml(dumper, records[:100]), number=5))
+    return results
+
+
+if __name__ == '__main__':
+    print_results(run())
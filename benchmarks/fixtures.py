@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+"""Synthetic evergreen data used by the benchmarks."""
+from __future__ import absolute_import
+
+import json
+import os
+
+from evergreen.build import Build
+from evergreen.task import Task
+from evergreen.version import Version
+
+SAMPLE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests',
+                                'evergreen', 'data')
+TASK_STATUSES = [
+    ('success', {'status': 'success', 'type': 'test', 'timed_out': False}),
+    ('failed', {'status': 'failed', 'type': 'test', 'timed_out': False}),
+    ('failed', {'status': 'failed', 'type': 'system', 'timed_out': False}),
+    ('failed', {'status': 'failed', 'type': 'test', 'timed_out': True}),
+    ('undispatched', {'status': 'undispatched', 'type': '', 'timed_out': False}),
+]
+
+
+def sample_json(file_name):
+    """Read json from the given file in the test data directory."""
+    with open(os.path.join(SAMPLE_DATA_PATH, file_name)) as sample_file:
+        return json.load(sample_file)
+
+
+def task_jsons(n_tasks, build_id='build_id'):
+    """Create the json of tasks in a build with a mix of statuses."""
+    task = sample_json('task.json')
+    tasks = []
+    for i in range(n_tasks):
+        status, status_details = TASK_STATUSES[i % len(TASK_STATUSES)]
+        tasks.append(dict(task, task_id='{}_task_{}'.format(build_id, i), build_id=build_id,
+                          status=status, status_details=status_details))
+    return tasks
+
+
+def build_json(build_id, n_tasks):
+    """Create the json of a build with the given number of tasks."""
+    return dict(sample_json('build.json'), _id=build_id,
+                tasks=['{}_task_{}'.format(build_id, i) for i in range(n_tasks)])
+
+
+class StubApi(object):
+    """Api returning pre-built builds and tasks instead of calling evergreen."""
+
+    def __init__(self, n_builds, n_tasks_per_build):
+        """
+        Create a stub api for a version.
+
+        :param n_builds: Number of builds in the version.
+        :param n_tasks_per_build: Number of tasks in each build.
+        """
+        self._builds = [build_json('build_{}'.format(i), n_tasks_per_build)
+                        for i in range(n_builds)]
+        self._tasks = {build['_id']: task_jsons(n_tasks_per_build, build['_id'])
+                       for build in self._builds}
+
+    def version(self):
+        """Get the version being stubbed."""
+        return Version(sample_json('version.json'), self)
+
+    def build(self):
+        """Get the first build of the version."""
+        return Build(self._builds[0], self)
+
+    def builds_by_version(self, version_id):
+        """Get the builds of the version."""
+        return [Build(build, self) for build in self._builds]
+
+    def tasks_by_build(self, build_id, fetch_all_executions=None):
+        """Get the tasks of a build."""
+        return [Task(task, self) for task in self._tasks[build_id]]
@@ -0,0 +1,40 @@
+# -*- encoding: utf-8 -*-
+"""Helpers for timing evergreen.py hot paths."""
+from __future__ import absolute_import
+from __future__ import print_function
+
+import timeit
+
+DEFAULT_REPEAT = 5
+
+
+def time_benchmark(name, fn, number, repeat=DEFAULT_REPEAT):
+    """
+    Time a benchmark function.
+
+    :param name: Name of benchmark.
+    :param fn: Function to time, called with no arguments.
+    :param number: Number of calls per timing run.
+    :param repeat: Number of timing runs.
+    :return: Dictionary describing the timing of a single call.
+    """
+    timings = timeit.repeat(fn, number=number, repeat=repeat)
+    per_call = [timing / number for timing in timings]
+    return {
+        'name': name,
+        'number': number,
+        'repeat': repeat,
+        'best_sec': min(per_call),
+        'mean_sec': sum(per_call) / len(per_call),
+    }
+
+
+def print_results(results):
+    """
+    Print benchmark results as a table.
+
+    :param results: Iterable of benchmark results.
+    """
+    for result in results:
+        print('{name:<60} {best:>12.3f} us  (mean {mean:.3f} us)'.format(
+            name=result['name'], best=result['best_sec'] * 1e6, mean=result['mean_sec'] * 1e6))
@@ -0,0 +1,79 @@
+# -*- encoding: utf-8 -*-
+"""
+Run every evergreen.py benchmark.
+
+Results are printed as a table and can also be saved as json, so the timings of different
+commits can be compared to catch regressions::
+
+    $ python benchmarks/run.py --json results.json
+"""
+from __future__ import absolute_import
+
+import datetime
+import json
+import platform
+
+import click
+
+import evergreen
+
+import bench_api
+import bench_metrics
+import bench_models
+import bench_performance_results
+import bench_serialization
+from harness import print_results
+
+BENCHMARK_MODULES = {
+    'api': bench_api,
+    'metrics': bench_metrics,
+    'models': bench_models,
+    'performance_results': bench_performance_results,
+    'serialization': bench_serialization,
+}
+
+
+def run_benchmarks(names):
+    """
+    Run the benchmarks in the given modules.
+
+    :param names: Names of benchmark modules to run.
+    :return: List of benchmark results.
+    """
+    results = []
+    for name in names:
+        results.extend(BENCHMARK_MODULES[name].run())
+    return results
+
+
+def results_document(results):
+    """
+    Create a json document describing a run of the benchmarks.
+
+    :param results: List of benchmark results.
+    :return: Dictionary of results and the environment they were collected in.
+    """
+    return {
+        'evergreen_version': evergreen.__version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+        'benchmarks': results,
+    }
+
+
+@click.command()
+@click.option('--json', 'json_path', type=click.Path(dir_okay=False),
+              help='Save the results as json to the given file.')
+@click.argument('modules', nargs=-1, type=click.Choice(sorted(BENCHMARK_MODULES)))
+def main(json_path, modules):
+    """Run the benchmarks in MODULES, or all benchmarks if none are given."""
+    results = run_benchmarks(modules or sorted(BENCHMARK_MODULES))
+    print_results(results)
+    if json_path:
+        with open(json_path, 'w') as json_file:
+            json.dump(results_document(results), json_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -64,13 +64,19 @@ setup(
         'backports.functools_lru_cache ~= 1.5;python_version<"3.3"',
         'enum34 ~= 1.1.6;python_version<"3.3"',
         'Click ~= 7.0',
-        'pylibversion ~= 0.1.0',
         'python-dateutil ~= 2.8.1',
         'PyYAML ~= 5.1',
         'requests ~= 2.22.0',
         'structlog ~= 19.1.0',
         'tenacity ~= 5.0.4',
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'compression': ['brotli'],
+        'fast-json': ['orjson;platform_python_implementation=="CPython"',
+                      'ujson;platform_python_implementation!="CPython"'],
+        'stats': ['numpy', 'scipy'],
+    },
     entry_points={
         'console_scripts': [
             'evg-api=evergreen.cli.main:main',
@@ -1,20 +1,46 @@
-"""Evergreen API Module."""
-from pylibversion import version_tuple_to_str
+"""
+Evergreen API Module.
+
+The classes below can be imported directly from `evergreen`. Their modules, and the libraries
+they depend on, are only imported when a class is first used, so importing evergreen is fast.
+"""
+from importlib import import_module
 
 # Shortcuts for importing.
-from evergreen.api import EvergreenApi, RetryingEvergreenApi, CachedEvergreenApi, Requester
-from evergreen.build import Build
-from evergreen.commitqueue import CommitQueue
-from evergreen.distro import Distro
-from evergreen.host import Host
-from evergreen.manifest import Manifest
-from evergreen.patch import Patch
-from evergreen.project import Project
-from evergreen.task import Task
-from evergreen.tst import Tst
-from evergreen.stats import TestStats, TaskStats
-from evergreen.task_reliability import TaskReliability
-from evergreen.version import Version
+_SHORTCUTS = {
+    'EvergreenApi': 'evergreen.api',
+    'RetryingEvergreenApi': 'evergreen.api',
+    'CachedEvergreenApi': 'evergreen.api',
+    'Requester': 'evergreen.api',
+    'Build': 'evergreen.build',
+    'CommitQueue': 'evergreen.commitqueue',
+    'Distro': 'evergreen.distro',
+    'Host': 'evergreen.host',
+    'Manifest': 'evergreen.manifest',
+    'Patch': 'evergreen.patch',
+    'Project': 'evergreen.project',
+    'Task': 'evergreen.task',
+    'Tst': 'evergreen.tst',
+    'TestStats': 'evergreen.stats',
+    'TaskStats': 'evergreen.stats',
+    'TaskReliability': 'evergreen.task_reliability',
+    'Version': 'evergreen.version',
+}
+
+VERSION = (1, 0, 42)
+__version__ = '.'.join(str(part) for part in VERSION)
+__all__ = sorted(_SHORTCUTS)
+
+
+def __getattr__(name):
+    """Import a shortcut class from its module on first access."""
+    if name not in _SHORTCUTS:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module(_SHORTCUTS[name]), name)
+    globals()[name] = value
+    return value
+
 
-VERSION = (1, 0, 2)
-__version__ = version_tuple_to_str(VERSION)
+def __dir__():
+    """List the attributes of the module, including shortcuts that are not yet imported."""
+    return sorted(set(globals()) | set(_SHORTCUTS))
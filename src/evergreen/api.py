@@ -2,7 +2,10 @@
 """API for interacting with evergreen."""
 from __future__ import absolute_import
 
+import os
+import threading
 import time
+import weakref
 
 from evergreen.performance_results import PerformanceData
 
@@ -22,36 +25,109 @@ except ImportError:
     from backports.functools_lru_cache import lru_cache
 
 import requests
-import structlog
-from structlog.stdlib import LoggerFactory
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from evergreen.build import Build
 from evergreen.commitqueue import CommitQueue
+from evergreen.compression import ClientMetrics, ResponseLines, accept_encoding_header, \
+    response_sizes, wire_bytes
 from evergreen.config import read_evergreen_config, DEFAULT_API_SERVER, get_auth_from_config, \
     DEFAULT_NETWORK_TIMEOUT_SEC, read_evergreen_from_file
 from evergreen.distro import Distro
 from evergreen.host import Host
+from evergreen.log import get_logger
 from evergreen.manifest import Manifest
 from evergreen.patch import Patch
 from evergreen.project import Project
+from evergreen.retry import RetryPolicy
+from evergreen.serialization import loads
 from evergreen.task import Task
 from evergreen.tst import Tst
-from evergreen.stats import TestStats, TaskStats
+from evergreen.stats import TestStats, TaskStats, merge_stats
 from evergreen.task_reliability import TaskReliability
-from evergreen.util import evergreen_input_to_output, iterate_by_time_window
+from evergreen.throttle import Throttle
+from evergreen.transport import session_after_fork
+from evergreen.util import evergreen_input_to_output, iterate_by_time_window, parallel_map, \
+    date_chunks, DEFAULT_MAX_WORKERS, SingleFlight
+from evergreen.validator_cache import NOT_MODIFIED
 from evergreen.version import Version, Requester
 
-structlog.configure(logger_factory=LoggerFactory())
-LOGGER = structlog.getLogger(__name__)
+LOGGER = get_logger(__name__)
 
 CACHE_SIZE = 5000
+POOL_CONNECTIONS = 10
+POOL_MAX_SIZE = 32
 DEFAULT_LIMIT = 100
 MAX_RETRIES = 3
 START_WAIT_TIME_SEC = 2
 MAX_WAIT_TIME_SEC = 5
 
 
+# Clients in this process, so they can be prepared for use in a child after a fork.
+_CLIENTS = weakref.WeakSet()
+
+
+def _prepare_clients_after_fork():
+    """Prepare every client inherited from the parent process for use in a forked child."""
+    for client in list(_CLIENTS):
+        client._check_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_prepare_clients_after_fork)
+
+
+def _stats_params(after_date, before_date, group_num_days, requesters, tests, tasks, variants,
+                  distros, group_by, sort):
+    """
+    Build the parameters for a stats endpoint, leaving out any that were not specified.
+
+    :return: Dictionary of parameters to pass to a stats endpoint.
+    """
+    params = {
+        'after_date': after_date,
+        'before_date': before_date,
+        'group_num_days': group_num_days,
+        'requesters': requesters,
+        'tests': tests,
+        'tasks': tasks,
+        'variants': variants,
+        'distros': distros,
+        'group_by': group_by,
+        'sort': sort,
+    }
+    return {key: value for key, value in params.items() if value}
+
+
+def _is_daily_stats_query(group_num_days, group_by, sort):
+    """
+    Determine if a stats query can be answered by a stats store.
+
+    A store keeps the stats of each day with the default grouping and sort order. It fetches
+    missing days with an explicit group_by, so its own queries always go to evergreen.
+
+    :param group_num_days: Days to aggregate stats over.
+    :param group_by: How to group stats.
+    :param sort: How to sort stats.
+    :return: True if the query asks for daily stats with the default grouping and sort order.
+    """
+    return group_num_days in (None, 1) and group_by is None and sort is None
+
+
+def _request_key(url, params):
+    """
+    Build a hashable key identifying a call to the api.
+
+    :param url: Url of call.
+    :param params: Parameters of call.
+    :return: Key for the call.
+    """
+    if not params:
+        return url, ()
+    return url, tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in params.items()))
+
+
 class _BaseEvergreenApi(object):
     """Base methods for building API objects."""
 
@@ -64,14 +140,109 @@ class _BaseEvergreenApi(object):
         """
         self._timeout = timeout
         self._api_server = api_server
-        self.session = requests.Session()
-        adapter = requests.adapters.HTTPAdapter()
-        self.session.mount('{url.scheme}://'.format(url=urlparse(api_server)), adapter)
+        self._throttle = Throttle()
+        self._single_flight = SingleFlight()
+        self._validator_cache = None
+        self._stats_store = None
+        self.metrics = ClientMetrics()
+        self.session_headers = {'Accept-Encoding': accept_encoding_header()}
         if auth:
-            self.session.headers.update({
+            self.session_headers.update({
                 'Api-User': auth.username,
                 'Api-Key': auth.api_key,
             })
+        self._adapter = self._create_adapter()
+        self._local = threading.local()
+        self._session_override = None
+        self._pid = os.getpid()
+        _CLIENTS.add(self)
+
+    @property
+    def session(self):
+        """
+        Get the session used to make calls from the current thread.
+
+        Each thread gets its own requests.Session, so an api object can be used from many
+        threads at once. The sessions share one connection pool, so connections are reused
+        across threads. A session assigned to this property is used by every thread instead.
+
+        :return: Session for the current thread.
+        """
+        self._check_fork()
+        if self._session_override is not None:
+            return self._session_override
+
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+        return session
+
+    @session.setter
+    def session(self, session):
+        """
+        Use the given session for calls from every thread.
+
+        In a forked child, the session is prepared with `session_after_fork`: a requests.Session
+        gets new connection pools and a transport's `after_fork` method is called. Other sessions
+        must not be shared with forked children.
+
+        :param session: Session to use.
+        """
+        self._session_override = session
+
+    @staticmethod
+    def _create_adapter():
+        """
+        Create the connection pool shared by the sessions of every thread.
+
+        :return: Transport adapter with a thread safe connection pool.
+        """
+        return requests.adapters.HTTPAdapter(pool_connections=POOL_CONNECTIONS,
+                                             pool_maxsize=POOL_MAX_SIZE)
+
+    def _create_session(self):
+        """
+        Create a session for the current thread.
+
+        :return: Session sending the api headers through the shared connection pool.
+        """
+        session = requests.Session()
+        session.headers.update(self.session_headers)
+        session.mount('{url.scheme}://'.format(url=urlparse(self._api_server)), self._adapter)
+        return session
+
+    def _check_fork(self):
+        """Prepare the client for use in this process if it was created before a fork."""
+        if self._pid != os.getpid():
+            self._after_fork()
+
+    def _after_fork(self):
+        """
+        Prepare a client inherited from the parent process for use in a forked child.
+
+        The connections belong to the parent, so the child gets a new connection pool and new
+        sessions without closing the inherited ones. Cached data is kept, but locks that another
+        thread of the parent may have held and calls it had in flight are reset.
+        """
+        self._pid = os.getpid()
+        self._adapter = self._create_adapter()
+        self._local = threading.local()
+        self._single_flight = SingleFlight()
+        self._throttle.after_fork()
+        self.metrics.after_fork()
+        if self._validator_cache is not None:
+            self._validator_cache.after_fork()
+        if self._stats_store is not None:
+            self._stats_store.after_fork()
+        if self._session_override is not None:
+            session_after_fork(self._session_override)
+
+    def close(self):
+        """Close the connections of every thread."""
+        if self._session_override is not None:
+            self._session_override.close()
+        self._adapter.close()
 
     def _create_url(self, endpoint):
         """
@@ -111,46 +282,114 @@ class _BaseEvergreenApi(object):
         """
         Make a call to the evergreen api.
 
+        Concurrent identical calls share a single request to the server.
+
         :param url: Url of call to make.
         :param params: parameters to pass to api.
         :return: response from api server.
         """
+        self._check_fork()
+        return self._single_flight.call(_request_key(url, params), self._make_request, url,
+                                        params)
+
+    def _make_request(self, url, params=None):
+        """
+        Make a request to the evergreen api.
+
+        If a validator cache is in use and a previous response to the request had validators,
+        the request is made conditional and the previous response is reused if it has not been
+        modified.
+
+        :param url: Url of request to make.
+        :param params: parameters to pass to api.
+        :return: response from api server.
+        """
+        key = _request_key(url, params) if self._validator_cache is not None else None
+        cached = self._validator_cache.get(key) if key else None
+
         start_time = time.time()
-        response = self.session.get(url=url, params=params, timeout=self._timeout)
+        with self._throttle.permit() as permit:
+            if cached:
+                response = self.session.get(url=url, params=params,
+                                            headers=cached.conditional_headers(),
+                                            timeout=self._timeout)
+            else:
+                response = self.session.get(url=url, params=params, timeout=self._timeout)
+            permit.status_code = response.status_code
         self._log_api_call_time(response, start_time)
+        self.metrics.record(url, *response_sizes(response))
+
+        if cached and response.status_code == NOT_MODIFIED:
+            return cached.response
 
         self._raise_for_status(response)
+        if key:
+            self._validator_cache.update(key, response)
         return response
 
     def _stream_api(self, url, params=None):
         """
         Make a streaming call to an api.
 
+        Only the status line and headers are checked before the first line is returned, after
+        that lines are returned as they arrive and only the current line is held in memory. If
+        the caller stops iterating, the connection is closed without reading the rest of the
+        content.
+
         :param url: url to call
         :param params: url parameters
         :return: Iterable over the lines of the returned content.
         """
+        with self._open_stream(url, params) as res:
+            lines = ResponseLines(res)
+            try:
+                for line in lines:
+                    yield line
+            finally:
+                compressed_size = wire_bytes(res)
+                self.metrics.record(url, lines.num_bytes if compressed_size is None
+                                    else compressed_size, lines.num_bytes)
+
+    def _open_stream(self, url, params=None):
+        """
+        Start a streaming call to an api.
+
+        :param url: url to call
+        :param params: url parameters
+        :return: Streaming response from api server.
+        """
+        self._check_fork()
         start_time = time.time()
-        with self.session.get(url=url, params=params, stream=True, timeout=self._timeout) as res:
-            self._log_api_call_time(res, start_time)
-            self._raise_for_status(res)
+        with self._throttle.permit() as permit:
+            response = self.session.get(url=url, params=params, stream=True,
+                                        timeout=self._timeout)
+            permit.status_code = response.status_code
+        self._log_api_call_time(response, start_time)
 
-            for line in res.iter_lines(decode_unicode=True):
-                yield line
+        try:
+            self._raise_for_status(response)
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
 
     @staticmethod
     def _raise_for_status(response):
         """
         Raise an exception with the evergreen message if it exists.
 
+        The body is only decoded for error responses, successful responses are left for the
+        caller to decode.
+
         :param response: response from evergreen api.
         """
-        try:
-            json_data = response.json()
-            if response.status_code >= 400 and 'error' in json_data:
-                raise requests.exceptions.HTTPError(json_data['error'], response=response)
-        except JSONDecodeError:
-            pass
+        if response.status_code >= 400:
+            try:
+                json_data = loads(response.content)
+                if 'error' in json_data:
+                    raise requests.exceptions.HTTPError(json_data['error'], response=response)
+            except JSONDecodeError:
+                pass
 
         response.raise_for_status()
 
@@ -163,13 +402,14 @@ class _BaseEvergreenApi(object):
         :return: json list of all results.
         """
         response = self._call_api(url, params)
-        json_data = response.json()
+        json_data = loads(response.content)
         while "next" in response.links:
             if params and 'limit' in params and len(json_data) >= params['limit']:
                 break
             response = self._call_api(response.links['next']['url'])
-            if response.json():
-                json_data.extend(response.json())
+            page = loads(response.content)
+            if page:
+                json_data.extend(page)
 
         return json_data
 
@@ -189,7 +429,7 @@ class _BaseEvergreenApi(object):
         next_url = url
         while True:
             response = self._call_api(next_url, params)
-            json_response = response.json()
+            json_response = loads(response.content)
             if not json_response:
                 break
             for result in json_response:
@@ -197,7 +437,9 @@ class _BaseEvergreenApi(object):
             if 'next' not in response.links:
                 break
 
+            # The next link already includes the query parameters.
             next_url = response.links['next']['url']
+            params = None
 
     def _lazy_paginate_by_date(self, url, params=None):
         """
@@ -213,7 +455,7 @@ class _BaseEvergreenApi(object):
             }
 
         while True:
-            data = self._call_api(url, params).json()
+            data = loads(self._call_api(url, params).content)
             if not data:
                 break
             for result in data:
@@ -238,6 +480,15 @@ class _DistrosApi(_BaseEvergreenApi):
         distro_list = self._paginate(url)
         return [Distro(distro, self) for distro in distro_list]
 
+    def iter_all_distros(self):
+        """
+        Get all distros in evergreen, lazily fetching pages of results as they are needed.
+
+        :return: Generator of all distros in evergreen.
+        """
+        url = self._create_url('/distros')
+        return (Distro(distro, self) for distro in self._lazy_paginate(url))
+
 
 class _HostApi(_BaseEvergreenApi):
     """API for hosts endpoints."""
@@ -261,6 +512,20 @@ class _HostApi(_BaseEvergreenApi):
         host_list = self._paginate(url, params)
         return [Host(host, self) for host in host_list]
 
+    def iter_all_hosts(self, status=None):
+        """
+        Get all hosts in evergreen, lazily fetching pages of results as they are needed.
+
+        :param status: Only return hosts with specified status.
+        :return: Generator of all hosts in evergreen.
+        """
+        params = {}
+        if status:
+            params['status'] = status
+
+        url = self._create_url('/hosts')
+        return (Host(host, self) for host in self._lazy_paginate(url, params))
+
 
 class _ProjectApi(_BaseEvergreenApi):
     """API for project endpoints."""
@@ -279,6 +544,15 @@ class _ProjectApi(_BaseEvergreenApi):
         project_list = self._paginate(url)
         return [Project(project, self) for project in project_list]
 
+    def iter_all_projects(self):
+        """
+        Get all projects in evergreen, lazily fetching pages of results as they are needed.
+
+        :return: Generator of all projects in evergreen.
+        """
+        url = self._create_url('/projects')
+        return (Project(project, self) for project in self._lazy_paginate(url))
+
     def project_by_id(self, project_id):
         """
         Get a project by project_id.
@@ -381,10 +655,15 @@ class _ProjectApi(_BaseEvergreenApi):
                               variants=None,
                               distros=None,
                               group_by=None,
-                              sort=None):
+                              sort=None,
+                              chunk_num_days=None,
+                              max_workers=DEFAULT_MAX_WORKERS):
         """
         Get a patch by patch id.
 
+        Wide date ranges can be split into chunks of `chunk_num_days` days which are queried
+        concurrently. Chunks are aligned to `group_num_days` so that no group spans two chunks.
+
         :param project_id: Id of patch to query for.
         :param after_date: Collect stats after this date.
         :param before_date: Collect stats before this date.
@@ -396,32 +675,72 @@ class _ProjectApi(_BaseEvergreenApi):
         :param distros: Only include specified distros.
         :param group_by: How to group results (test_task_variant, test_task, or test)
         :param sort: How to sort results (earliest or latest).
+        :param chunk_num_days: Split the date range into chunks of this many days.
+        :param max_workers: Maximum number of chunks to query at once.
         :return: Patch queried for.
         """
-        params = {
-            'after_date': after_date,
-            'before_date': before_date,
-        }
-        if group_num_days:
-            params['group_num_days'] = group_num_days
-        if requesters:
-            params['requesters'] = requesters
-        if tests:
-            params['tests'] = tests
-        if tasks:
-            params['tasks'] = tasks
-        if variants:
-            params['variants'] = variants
-        if distros:
-            params['distros'] = distros
-        if group_by:
-            params['group_by'] = group_by
-        if sort:
-            params['sort'] = sort
+        if self._stats_store is not None and _is_daily_stats_query(group_num_days, group_by,
+                                                                   sort):
+            return self._stats_store.test_stats_by_project(project_id, after_date, before_date,
+                                                           requesters, tests, tasks, variants,
+                                                           distros)
+        params = _stats_params(after_date, before_date, group_num_days, requesters, tests, tasks,
+                               variants, distros, group_by, sort)
         url = self._create_url('/projects/{project_id}/test_stats'.format(project_id=project_id))
-        test_stats_list = self._paginate(url, params)
+        if chunk_num_days:
+            test_stats_list = self._paginate_by_date_chunks(url, params, chunk_num_days,
+                                                            max_workers)
+        else:
+            test_stats_list = self._paginate(url, params)
         return [TestStats(test_stat, self) for test_stat in test_stats_list]
 
+    def _paginate_by_date_chunks(self, url, params, chunk_num_days, max_workers):
+        """
+        Query a stats endpoint concurrently over chunks of its date range and merge the results.
+
+        :param url: Url of stats endpoint.
+        :param params: Parameters to pass to the endpoint, including the full date range.
+        :param chunk_num_days: Number of days in each chunk.
+        :param max_workers: Maximum number of chunks to query at once.
+        :return: json list of merged results.
+        """
+        chunks = list(date_chunks(params['after_date'], params['before_date'], chunk_num_days,
+                                  params.get('group_num_days') or 1))
+
+        def _query_chunk(indexed_chunk):
+            index, (chunk_after, chunk_before) = indexed_chunk
+            chunk_params = dict(params, after_date=chunk_after, before_date=chunk_before)
+            return index, self._paginate(url, chunk_params)
+
+        chunk_results = sorted(parallel_map(_query_chunk, enumerate(chunks), max_workers),
+                               key=lambda indexed_result: indexed_result[0],
+                               reverse=params.get('sort') == 'latest')
+        return merge_stats(stats for _, results in chunk_results for stats in results)
+
+    def iter_test_stats_by_project(self,
+                                   project_id,
+                                   after_date,
+                                   before_date,
+                                   group_num_days=None,
+                                   requesters=None,
+                                   tests=None,
+                                   tasks=None,
+                                   variants=None,
+                                   distros=None,
+                                   group_by=None,
+                                   sort=None):
+        """
+        Get test stats by project id, lazily fetching pages of results as they are needed.
+
+        Takes the same parameters as `test_stats_by_project`.
+
+        :return: Generator of test stats.
+        """
+        params = _stats_params(after_date, before_date, group_num_days, requesters, tests, tasks,
+                               variants, distros, group_by, sort)
+        url = self._create_url('/projects/{project_id}/test_stats'.format(project_id=project_id))
+        return (TestStats(test_stat, self) for test_stat in self._lazy_paginate(url, params))
+
     def tasks_by_project(self, project_id, statuses=None):
         """
         Get all the tasks for a project.
@@ -435,6 +754,19 @@ class _ProjectApi(_BaseEvergreenApi):
         params = {'status': statuses} if statuses else None
         return [Task(json, self) for json in self._paginate(url, params)]
 
+    def iter_tasks_by_project(self, project_id, statuses=None):
+        """
+        Get all the tasks for a project, lazily fetching pages of results as they are needed.
+
+        :param project_id: The project's id.
+        :param statuses: the types of statuses to get tasks for.
+        :return: Generator of matching tasks.
+        """
+        url = self._create_url(
+            "/projects/{project_id}/versions/tasks".format(project_id=project_id))
+        params = {'status': statuses} if statuses else None
+        return (Task(json, self) for json in self._lazy_paginate(url, params))
+
     def task_stats_by_project(self,
                               project_id,
                               after_date,
@@ -461,28 +793,39 @@ class _ProjectApi(_BaseEvergreenApi):
         :param sort: How to sort results (earliest or latest).
         :return: Patch queried for.
         """
-        params = {
-            'after_date': after_date,
-            'before_date': before_date,
-        }
-        if group_num_days:
-            params['group_num_days'] = group_num_days
-        if requesters:
-            params['requesters'] = requesters
-        if tasks:
-            params['tasks'] = tasks
-        if variants:
-            params['variants'] = variants
-        if distros:
-            params['distros'] = distros
-        if group_by:
-            params['group_by'] = group_by
-        if sort:
-            params['sort'] = sort
+        if self._stats_store is not None and _is_daily_stats_query(group_num_days, group_by,
+                                                                   sort):
+            return self._stats_store.task_stats_by_project(project_id, after_date, before_date,
+                                                           requesters, tasks, variants, distros)
+        params = _stats_params(after_date, before_date, group_num_days, requesters, None, tasks,
+                               variants, distros, group_by, sort)
         url = self._create_url('/projects/{project_id}/task_stats'.format(project_id=project_id))
         task_stats_list = self._paginate(url, params)
         return [TaskStats(task_stat, self) for task_stat in task_stats_list]
 
+    def iter_task_stats_by_project(self,
+                                   project_id,
+                                   after_date,
+                                   before_date,
+                                   group_num_days=None,
+                                   requesters=None,
+                                   tasks=None,
+                                   variants=None,
+                                   distros=None,
+                                   group_by=None,
+                                   sort=None):
+        """
+        Get task stats by project id, lazily fetching pages of results as they are needed.
+
+        Takes the same parameters as `task_stats_by_project`.
+
+        :return: Generator of task stats.
+        """
+        params = _stats_params(after_date, before_date, group_num_days, requesters, None, tasks,
+                               variants, distros, group_by, sort)
+        url = self._create_url('/projects/{project_id}/task_stats'.format(project_id=project_id))
+        return (TaskStats(task_stat, self) for task_stat in self._lazy_paginate(url, params))
+
     def task_reliability_by_project(self,
                                     project_id,
                                     after_date=None,
@@ -509,31 +852,39 @@ class _ProjectApi(_BaseEvergreenApi):
         :param sort: How to sort results (earliest or latest).
         :return: Patch queried for.
         """
-        params = {}
-        if after_date:
-            params['after_date'] = after_date
-        if before_date:
-            params['before_date'] = before_date
-        if group_num_days:
-            params['group_num_days'] = group_num_days
-        if requesters:
-            params['requesters'] = requesters
-        if tasks:
-            params['tasks'] = tasks
-        if variants:
-            params['variants'] = variants
-        if distros:
-            params['distros'] = distros
-        if group_by:
-            params['group_by'] = group_by
-        if sort:
-            params['sort'] = sort
+        params = _stats_params(after_date, before_date, group_num_days, requesters, None, tasks,
+                               variants, distros, group_by, sort)
         url = self._create_url('/projects/{project_id}/task_reliability'.format(
             project_id=project_id))
         task_reliability_scores = self._paginate(url, params)
         return [TaskReliability(task_reliability, self)
                 for task_reliability in task_reliability_scores]
 
+    def iter_task_reliability_by_project(self,
+                                         project_id,
+                                         after_date=None,
+                                         before_date=None,
+                                         group_num_days=None,
+                                         requesters=None,
+                                         tasks=None,
+                                         variants=None,
+                                         distros=None,
+                                         group_by=None,
+                                         sort=None):
+        """
+        Get task reliability scores, lazily fetching pages of results as they are needed.
+
+        Takes the same parameters as `task_reliability_by_project`.
+
+        :return: Generator of task reliability scores.
+        """
+        params = _stats_params(after_date, before_date, group_num_days, requesters, None, tasks,
+                               variants, distros, group_by, sort)
+        url = self._create_url('/projects/{project_id}/task_reliability'.format(
+            project_id=project_id))
+        return (TaskReliability(task_reliability, self)
+                for task_reliability in self._lazy_paginate(url, params))
+
 
 class _BuildApi(_BaseEvergreenApi):
     """API for build endpoints."""
@@ -568,6 +919,21 @@ class _BuildApi(_BaseEvergreenApi):
         task_list = self._paginate(url, params)
         return [Task(task, self) for task in task_list]
 
+    def iter_tasks_by_build(self, build_id, fetch_all_executions=None):
+        """
+        Get all tasks for a given build, lazily fetching pages of results as they are needed.
+
+        :param build_id: build_id to query.
+        :param fetch_all_executions: Fetch all executions for a given task.
+        :return: Generator of tasks for the specified build.
+        """
+        params = {}
+        if fetch_all_executions:
+            params['fetch_all_executions'] = 1
+
+        url = self._create_url('/builds/{build_id}/tasks'.format(build_id=build_id))
+        return (Task(task, self) for task in self._lazy_paginate(url, params))
+
 
 class _VersionApi(_BaseEvergreenApi):
     """API for version endpoints."""
@@ -598,6 +964,17 @@ class _VersionApi(_BaseEvergreenApi):
         build_list = self._paginate(url, params)
         return [Build(build, self) for build in build_list]
 
+    def iter_builds_by_version(self, version_id, params=None):
+        """
+        Get all builds for a given Evergreen version_id, lazily fetching pages of results.
+
+        :param version_id: Version Id to query for.
+        :param params: Dictionary of parameters to pass to query.
+        :return: Generator of builds for the specified version.
+        """
+        url = self._create_url('/versions/{version_id}/builds'.format(version_id=version_id))
+        return (Build(build, self) for build in self._lazy_paginate(url, params))
+
 
 class _PatchApi(_BaseEvergreenApi):
     """API for patch endpoints."""
@@ -615,7 +992,7 @@ class _PatchApi(_BaseEvergreenApi):
         :return: Patch queried for.
         """
         url = self._create_url('/patches/{patch_id}'.format(patch_id=patch_id))
-        return Patch(self._call_api(url, params).json(), self)
+        return Patch(loads(self._call_api(url, params).content), self)
 
 
 class _TaskApi(_BaseEvergreenApi):
@@ -637,7 +1014,7 @@ class _TaskApi(_BaseEvergreenApi):
         if fetch_all_executions:
             params = {'fetch_all_executions': fetch_all_executions}
         url = self._create_url('/tasks/{task_id}'.format(task_id=task_id))
-        return Task(self._call_api(url, params).json(), self)
+        return Task(loads(self._call_api(url, params).content), self)
 
     def tests_by_task(self, task_id, status=None, execution=None):
         """
@@ -651,11 +1028,75 @@ class _TaskApi(_BaseEvergreenApi):
         params = {}
         if status:
             params['status'] = status
-        if execution:
+        if execution is not None:
             params['execution'] = execution
         url = self._create_url('/tasks/{task_id}/tests'.format(task_id=task_id))
         return [Tst(test, self) for test in self._paginate(url, params)]
 
+    def iter_tests_by_task(self, task_id, status=None, execution=None):
+        """
+        Get all tests for a given task, lazily fetching pages of results as they are needed.
+
+        :param task_id: Id of task to query for.
+        :param status: Limit results to given status.
+        :param execution: Retrieve the specified task execution (defaults to 0).
+        :return: Generator of tests for the specified task.
+        """
+        params = {}
+        if status:
+            params['status'] = status
+        if execution is not None:
+            params['execution'] = execution
+        url = self._create_url('/tasks/{task_id}/tests'.format(task_id=task_id))
+        return (Tst(test, self) for test in self._lazy_paginate(url, params))
+
+    def tests_by_tasks(self, tasks, status=None, fetch_all_executions=False,
+                       max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get all tests for a collection of tasks, querying the tasks concurrently.
+
+        Each task is only queried once, even if it appears multiple times in `tasks`. When all
+        executions are fetched, a test that ran in several executions of a task is only reported
+        for the latest of those executions, and only if its status in that execution matches
+        `status`.
+
+        :param tasks: Tasks to get tests for.
+        :param status: Limit results to given status.
+        :param fetch_all_executions: Query previous executions of each task as well.
+        :param max_workers: Maximum number of tasks to query at once.
+        :return: Generator of tests, yielded as the results for each task arrive.
+        """
+        latest_tasks = {}
+        for task in tasks:
+            seen_task = latest_tasks.get(task.task_id)
+            if seen_task is None or (seen_task.execution or 0) < (task.execution or 0):
+                latest_tasks[task.task_id] = task
+
+        def _tests_for_task(task):
+            executions = {task.execution or 0}
+            if fetch_all_executions:
+                executions.update(previous['execution']
+                                  for previous in task.json.get('previous_executions') or [])
+
+            if len(executions) == 1:
+                return self.tests_by_task(task.task_id, status=status, execution=executions.pop())
+
+            # Executions are queried unfiltered so a test is judged by its latest execution, a
+            # test that failed and then passed on a retry is not reported as failing.
+            seen_tests = set()
+            task_tests = []
+            for execution in sorted(executions, reverse=True):
+                for test in self.tests_by_task(task.task_id, execution=execution):
+                    if test.test_file not in seen_tests:
+                        seen_tests.add(test.test_file)
+                        if status is None or test.status == status:
+                            task_tests.append(test)
+            return task_tests
+
+        for task_tests in parallel_map(_tests_for_task, latest_tasks.values(), max_workers):
+            for test in task_tests:
+                yield test
+
     def performance_results_by_task(self, task_id):
         """
         Get the 'perf.json' performance results for a given task_id
@@ -666,6 +1107,30 @@ class _TaskApi(_BaseEvergreenApi):
         url = self._create_plugin_url('/task/{task_id}/perf'.format(task_id=task_id))
         return PerformanceData(self._paginate(url), self)
 
+    def performance_results_by_tasks(self, tasks, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get the 'perf.json' performance results for a collection of tasks, querying concurrently.
+
+        Display tasks and tasks without performance results are skipped.
+
+        :param tasks: Tasks to get performance results for.
+        :param max_workers: Maximum number of tasks to query at once.
+        :return: Generator of performance results, yielded as they arrive.
+        """
+        task_ids = {task.task_id for task in tasks if not task.display_only}
+
+        def _results_for_task(task_id):
+            try:
+                return self.performance_results_by_task(task_id)
+            except requests.exceptions.HTTPError as err:
+                if err.response is not None and err.response.status_code == 404:
+                    return None
+                raise
+
+        for performance_data in parallel_map(_results_for_task, task_ids, max_workers):
+            if performance_data is not None and performance_data.json:
+                yield performance_data
+
     def performance_results_by_task_name(self, task_id, task_name):
         """
         Get the 'perf.json' performance results for a given task_id and task_name
@@ -705,7 +1170,7 @@ class _OldApi(_BaseEvergreenApi):
         """
         url = self._create_old_url('plugin/manifest/get/{project_id}/{revision}'.format(
             project_id=project_id, revision=revision))
-        return Manifest(self._call_api(url).json(), self)
+        return Manifest(loads(self._call_api(url).content), self)
 
 
 class _LogApi(_BaseEvergreenApi):
@@ -745,13 +1210,37 @@ class EvergreenApi(_ProjectApi, _BuildApi, _VersionApi, _PatchApi, _HostApi, _Ta
                    _LogApi, _DistrosApi):
     """Access to the Evergreen API Server."""
 
-    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None):
-        """Create an Evergreen Api object."""
+    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None, throttle=None,
+                 validator_cache=None, compression=None, stats_store_path=None):
+        """
+        Create an Evergreen Api object.
+
+        :param api_server: URI of Evergreen API server.
+        :param auth: EvgAuth object with auth information.
+        :param timeout: Network timeout.
+        :param throttle: Throttle to limit the rate and concurrency of calls, no limit if None.
+        :param validator_cache: ValidatorCache to make repeated calls conditional with, calls
+                                are not conditional if None.
+        :param compression: Content encodings to accept in order of preference, every supported
+                            encoding if None, or an empty list for uncompressed responses.
+        :param stats_store_path: Path of a sqlite database to keep finalized daily stats in, or
+                                 ':memory:' to keep them for the life of the api. Daily stats are
+                                 always queried from evergreen if None.
+        """
         super(EvergreenApi, self).__init__(api_server, auth, timeout=timeout)
+        if throttle:
+            self._throttle = throttle
+        self._validator_cache = validator_cache
+        if compression is not None:
+            self.session_headers['Accept-Encoding'] = accept_encoding_header(compression)
+        if stats_store_path is not None:
+            from evergreen.stats_store import StatsStore
+            self._stats_store = StatsStore(self, stats_store_path)
 
     @classmethod
     def get_api(cls, auth=None, use_config_file=False, config_file=None,
-                timeout=DEFAULT_NETWORK_TIMEOUT_SEC):
+                timeout=DEFAULT_NETWORK_TIMEOUT_SEC, throttle=None, validator_cache=None,
+                compression=None, stats_store_path=None):
         """
         Get an evergreen api instance based on config file settings.
 
@@ -759,12 +1248,17 @@ class EvergreenApi(_ProjectApi, _BuildApi, _VersionApi, _PatchApi, _HostApi, _Ta
         :param use_config_file: attempt to read auth from default config file.
         :param config_file: config file with authentication information.
         :param timeout: Network timeout.
+        :param throttle: Throttle to limit the rate and concurrency of calls, no limit if None.
+        :param validator_cache: ValidatorCache to make repeated calls conditional with.
+        :param compression: Content encodings to accept in order of preference.
+        :param stats_store_path: Path of a sqlite database to keep finalized daily stats in.
         :return: EvergreenApi instance.
         """
         kwargs = EvergreenApi._setup_kwargs(timeout=timeout, auth=auth,
                                             use_config_file=use_config_file,
                                             config_file=config_file)
-        return cls(**kwargs)
+        return cls(throttle=throttle, validator_cache=validator_cache, compression=compression,
+                   stats_store_path=stats_store_path, **kwargs)
 
     @staticmethod
     def _setup_kwargs(auth=None, use_config_file=False,
@@ -793,9 +1287,11 @@ class CachedEvergreenApi(EvergreenApi):
     Access to the Evergreen API server that caches certain calls.
     """
 
-    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None):
+    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None, throttle=None,
+                 validator_cache=None, compression=None, stats_store_path=None):
         """Create an Evergreen Api object."""
-        super(CachedEvergreenApi, self).__init__(api_server, auth, timeout)
+        super(CachedEvergreenApi, self).__init__(api_server, auth, timeout, throttle,
+                                                 validator_cache, compression, stats_store_path)
 
     @lru_cache(maxsize=CACHE_SIZE)
     def build_by_id(self, build_id):
@@ -832,13 +1328,31 @@ class CachedEvergreenApi(EvergreenApi):
 class RetryingEvergreenApi(EvergreenApi):
     """An Evergreen Api that retries failed calls."""
 
-    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None):
-        """Create an Evergreen Api object."""
-        super(RetryingEvergreenApi, self).__init__(api_server, auth, timeout)
+    def __init__(self, api_server=DEFAULT_API_SERVER, auth=None, timeout=None, throttle=None,
+                 validator_cache=None, compression=None, retry_policy=None,
+                 stats_store_path=None):
+        """
+        Create an Evergreen Api object.
+
+        :param api_server: URI of Evergreen API server.
+        :param auth: EvgAuth object with auth information.
+        :param timeout: Network timeout.
+        :param throttle: Throttle to limit the rate and concurrency of calls, no limit if None.
+        :param validator_cache: ValidatorCache to make repeated calls conditional with.
+        :param compression: Content encodings to accept in order of preference.
+        :param retry_policy: RetryPolicy deciding which calls are retried and when.
+        :param stats_store_path: Path of a sqlite database to keep finalized daily stats in.
+        """
+        super(RetryingEvergreenApi, self).__init__(api_server, auth, timeout, throttle,
+                                                   validator_cache, compression, stats_store_path)
+        self._retry_policy = retry_policy or RetryPolicy(
+            max_attempts=MAX_RETRIES, start_wait=START_WAIT_TIME_SEC, max_wait=MAX_WAIT_TIME_SEC)
+
+    def _after_fork(self):
+        """Prepare a client inherited from the parent process for use in a forked child."""
+        super(RetryingEvergreenApi, self)._after_fork()
+        self._retry_policy.budget.after_fork()
 
-    @retry(retry=retry_if_exception_type(requests.exceptions.HTTPError),
-           stop=stop_after_attempt(MAX_RETRIES),
-           wait=wait_exponential(multiplier=1, min=START_WAIT_TIME_SEC, max=MAX_WAIT_TIME_SEC))
     def _call_api(self, url, params=None):
         """
         Call into the evergreen api.
@@ -847,4 +1361,17 @@ class RetryingEvergreenApi(EvergreenApi):
         :param params: Parameters to pass to api.
         :return: Result from calling API.
         """
-        return super(RetryingEvergreenApi, self)._call_api(url, params)
+        return self._retry_policy.call(super(RetryingEvergreenApi, self)._call_api, url, params)
+
+    def _open_stream(self, url, params=None):
+        """
+        Start a streaming call to the evergreen api.
+
+        Only starting the call is retried, once lines have been returned a failure is raised.
+
+        :param url: Url to call.
+        :param params: Parameters to pass to api.
+        :return: Streaming response from api server.
+        """
+        return self._retry_policy.call(super(RetryingEvergreenApi, self)._open_stream, url,
+                                       params)
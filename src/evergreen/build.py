@@ -3,6 +3,7 @@ from __future__ import absolute_import
 
 from evergreen.base import _BaseEvergreenObject, evg_attrib, evg_datetime_attrib
 from evergreen.metrics.buildmetrics import BuildMetrics
+from evergreen.util import DEFAULT_MAX_WORKERS
 
 
 EVG_BUILD_STATUS_FAILED = 'failed'
@@ -73,6 +74,24 @@ class Build(_BaseEvergreenObject):
         """
         return self._api.tasks_by_build(self.id, fetch_all_executions)
 
+    def get_all_tests(self, status=None, fetch_all_executions=False,
+                      max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get the tests for every task in this build.
+
+        The tasks are queried concurrently and tests are returned as they arrive.
+
+        :param status: Only return tests with the given status.
+        :param fetch_all_executions: Include tests from previous executions of tasks. A test
+                                     that ran in several executions is only reported once.
+        :param max_workers: Maximum number of tasks to query at once.
+        :return: Generator of tests in this build.
+        """
+        tasks = self.get_tasks(fetch_all_executions)
+        return self._api.tests_by_tasks(tasks, status=status,
+                                        fetch_all_executions=fetch_all_executions,
+                                        max_workers=max_workers)
+
     def is_completed(self):
         """
         Determine if this build has completed running tasks.
@@ -1,16 +1,20 @@
 from __future__ import absolute_import
 
+from collections import OrderedDict
+from datetime import datetime, timezone
 from enum import Enum
 from itertools import islice
-import json
-import yaml
 
 import click
+import requests
 
 from evergreen import EvergreenApi
+from evergreen.errors.exceptions import ActiveTaskMetricsException
+from evergreen.serialization import dumps, yaml_dump
+from evergreen.util import DEFAULT_MAX_WORKERS, parallel_map, parse_evergreen_datetime
 
 
-DisplayFormat = Enum('DisplayFormat', 'human json yaml')
+DisplayFormat = Enum('DisplayFormat', 'human json yaml jsonl')
 
 
 def fmt_output(fmt, data):
@@ -22,17 +26,38 @@ def fmt_output(fmt, data):
     :return: Data is specified format.
     """
     if fmt == DisplayFormat.json:
-        return json.dumps(data, indent=4)
+        return dumps(data, pretty=True)
+    if fmt == DisplayFormat.jsonl:
+        return dumps(data)
     if fmt == DisplayFormat.yaml:
-        return yaml.safe_dump(data)
+        return yaml_dump(data)
     return data
 
 
+def echo_records(fmt, records):
+    """
+    Write the given records in the specified format.
+
+    In JSON Lines format each record is written as soon as it is available, so records from a lazy
+    paginator are written with constant memory. Other formats write all records at once.
+
+    :param fmt: DisplayFormat to use.
+    :param records: Iterable of records to write.
+    """
+    if fmt == DisplayFormat.jsonl:
+        for record in records:
+            click.echo(dumps(record))
+    else:
+        click.echo(fmt_output(fmt, list(records)))
+
+
 @click.group()
 @click.option('--json', 'display_format', flag_value=DisplayFormat.json,
               help='Write output in json.')
 @click.option('--yaml', 'display_format', flag_value=DisplayFormat.yaml,
               help='Write output in yaml.')
+@click.option('--jsonl', 'display_format', flag_value=DisplayFormat.jsonl,
+              help='Write output in json lines, one record per line as it is fetched.')
 @click.option('--human-readable', 'display_format', flag_value=DisplayFormat.human, default=True,
               help='Write output in a human readable format.')
 @click.pass_context
@@ -47,8 +72,8 @@ def cli(ctx, display_format):
 def list_hosts(ctx):
     api = ctx.obj['api']
     fmt = ctx.obj['format']
-    host_list = api.all_hosts()
-    click.echo(fmt_output(fmt, [host.json for host in host_list]))
+    host_list = api.iter_all_hosts()
+    echo_records(fmt, (host.json for host in host_list))
 
 
 @cli.command()
@@ -58,12 +83,14 @@ def list_hosts(ctx):
 def list_patches(ctx, project, limit):
     api = ctx.obj['api']
     fmt = ctx.obj['format']
-    patches = []
-    for i, p in enumerate(api.patches_by_project(project)):
-        patches.append(p.json)
-        if limit and i > limit:
-            break
-    click.echo(fmt_output(fmt, patches))
+
+    def _patches():
+        for i, p in enumerate(api.patches_by_project(project)):
+            yield p.json
+            if limit and i > limit:
+                break
+
+    echo_records(fmt, _patches())
 
 
 @cli.command()
@@ -71,9 +98,8 @@ def list_patches(ctx, project, limit):
 def list_projects(ctx):
     api = ctx.obj['api']
     fmt = ctx.obj['format']
-    project_list = api.all_projects()
-    projects = [project.json for project in project_list]
-    click.echo(fmt_output(fmt, projects))
+    project_list = api.iter_all_projects()
+    echo_records(fmt, (project.json for project in project_list))
 
 
 @cli.command()
@@ -84,9 +110,7 @@ def list_versions(ctx, project, limit):
     api = ctx.obj['api']
     fmt = ctx.obj['format']
     version_list = api.versions_by_project(project)
-    versions_to_display = [version for version in islice(version_list, None, limit)]
-
-    click.echo(fmt_output(fmt, versions_to_display))
+    echo_records(fmt, (version.json for version in islice(version_list, None, limit)))
 
 
 @cli.command()
@@ -107,11 +131,10 @@ def test_stats(ctx, after_date, before_date, project, distros, group_by, group_n
     api = ctx.obj['api']
     fmt = ctx.obj['format']
 
-    test_stat_list = api.test_stats_by_project(project, after_date, before_date, group_num_days,
-                                               requesters, tests, tasks, variants, distros,
-                                               group_by, sort)
-    test_statistics = [t.json for t in test_stat_list]
-    click.echo(fmt_output(fmt, test_statistics))
+    test_stat_list = api.iter_test_stats_by_project(project, after_date, before_date,
+                                                    group_num_days, requesters, tests, tasks,
+                                                    variants, distros, group_by, sort)
+    echo_records(fmt, (t.json for t in test_stat_list))
 
 
 @cli.command()
@@ -131,11 +154,10 @@ def task_stats(ctx, after_date, before_date, project, distros, group_by, group_n
     api = ctx.obj['api']
     fmt = ctx.obj['format']
 
-    task_stat_list = api.task_stats_by_project(project, after_date, before_date, group_num_days,
-                                               requesters, tasks, variants, distros,
-                                               group_by, sort)
-    task_statistics = [t.json for t in task_stat_list]
-    click.echo(fmt_output(fmt, task_statistics))
+    task_stat_list = api.iter_task_stats_by_project(project, after_date, before_date,
+                                                    group_num_days, requesters, tasks, variants,
+                                                    distros, group_by, sort)
+    echo_records(fmt, (t.json for t in task_stat_list))
 
 
 RELIABILITY_GROUP_MAPPING = {
@@ -220,57 +242,186 @@ OR
     api = ctx.obj['api']
     fmt = ctx.obj['format']
 
-    task_reliability_list = api.task_reliability_by_project(project, after_date, before_date,
-                                                            group_num_days, requesters, tasks,
-                                                            variants, distros,
-                                                            RELIABILITY_GROUP_MAPPING[group_by],
-                                                            sort)
-    task_reliability_scores = [t.json for t in task_reliability_list]
-    click.echo(fmt_output(fmt, task_reliability_scores))
+    task_reliability_list = api.iter_task_reliability_by_project(
+        project, after_date, before_date, group_num_days, requesters, tasks, variants, distros,
+        RELIABILITY_GROUP_MAPPING[group_by], sort)
+    echo_records(fmt, (t.json for t in task_reliability_list))
+
+
+def read_ids(ids, id_file):
+    """
+    Combine ids given on the command line with ids read from a file, one per line.
+
+    Duplicate ids are dropped so each one is only analyzed once.
+
+    :param ids: Ids given on the command line.
+    :param id_file: Open file to read more ids from, or None.
+    :return: List of unique ids in the order they were given.
+    """
+    all_ids = list(ids)
+    if id_file:
+        all_ids.extend(line.strip() for line in id_file if line.strip())
+    return list(OrderedDict.fromkeys(all_ids))
+
+
+def utc_datetime(ctx, param, value):
+    """Parse a datetime option, treating datetimes without a timezone as UTC."""
+    if value is None:
+        return None
+    when = parse_evergreen_datetime(value)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when
+
+
+def metrics_or_skip(item_id, get_metrics, skipped):
+    """
+    Calculate the metrics of one of a batch of builds or versions.
+
+    Items whose metrics cannot be calculated, because they are still running or could not be
+    fetched, are reported and skipped so the rest of the batch is still written.
+
+    :param item_id: Id of the build or version.
+    :param get_metrics: Function to calculate the metrics of the item.
+    :param skipped: List to add the ids of skipped items to.
+    :return: Metrics of the item, or None if it was skipped.
+    """
+    try:
+        return get_metrics()
+    except (ActiveTaskMetricsException, requests.exceptions.HTTPError) as err:
+        click.echo('Skipping {}: {}'.format(item_id, err), err=True)
+        skipped.append(item_id)
+        return None
+
+
+def echo_metrics(fmt, metrics_list, include_children):
+    """
+    Write metrics as they are calculated.
+
+    :param fmt: DisplayFormat to use.
+    :param metrics_list: Iterable of metrics, None for items without metrics.
+    :param include_children: Include the metrics of children in the output.
+    """
+    metrics_list = (metrics for metrics in metrics_list if metrics is not None)
+    if fmt == DisplayFormat.human:
+        for metrics in metrics_list:
+            click.echo(metrics)
+    else:
+        echo_records(fmt, (metrics.as_dict(include_children=include_children)
+                           for metrics in metrics_list))
 
 
 @cli.command()
 @click.pass_context
-@click.option('-v', '--version', 'version_id', required=True)
+@click.option('-v', '--version', 'version_ids', multiple=True,
+              help='Id of version to analyze, can be given multiple times.')
+@click.option('--version-file', type=click.File('r'),
+              help="File with version ids to analyze, one per line, or '-' for stdin.")
+@click.option('-p', '--project', help='Analyze the versions of this project in a time window.')
+@click.option('-a', '--after', callback=utc_datetime,
+              help='Analyze project versions created after this time (UTC), required with '
+                   '--project.')
+@click.option('-b', '--before', callback=utc_datetime,
+              help='Analyze project versions created before this time (UTC), defaults to now.')
+@click.option('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+              help='Number of versions to analyze concurrently.')
 @click.option('--builds', is_flag=True, default=False, help='Include builds of version in output')
-def version_stats(ctx, version_id, builds):
+def version_stats(ctx, version_ids, version_file, project, after, before, workers, builds):
     """
-    Collect stats for the given evergreen version.
+    Collect stats for the given evergreen versions.
+
+    Many versions can be analyzed at once, concurrently and sharing a single client, by giving
+    several ids, a file of ids or a project and time window. Results are written as soon as
+    they are calculated. Versions that are still running or cannot be fetched are reported and
+    skipped, and the command then exits with an error status.
 
     :param ctx: Command context.
-    :param version_id: Id of version to analyze.
+    :param version_ids: Ids of versions to analyze.
+    :param version_file: File with ids of versions to analyze.
+    :param project: Project to analyze versions of.
+    :param after: Analyze project versions created after this time.
+    :param before: Analyze project versions created before this time.
+    :param workers: Number of versions to analyze concurrently.
     :param builds: Include builds of version in output.
     """
     api = ctx.obj['api']
     fmt = ctx.obj['format']
 
-    version = api.version_by_id(version_id)
-    if fmt == DisplayFormat.human:
-        click.echo(version.get_metrics())
+    version_ids = read_ids(version_ids, version_file)
+    skipped = []
+    if project:
+        if after is None:
+            raise click.UsageError('--after is required with --project.')
+        before = before or datetime.now(timezone.utc)
+        versions = api.versions_by_project_time_window(project, before, after)
+        metrics_list = parallel_map(
+            lambda version: metrics_or_skip(version.version_id, version.get_metrics, skipped),
+            versions, workers)
+    elif len(version_ids) == 1:
+        version = api.version_by_id(version_ids[0])
+        if fmt == DisplayFormat.human:
+            click.echo(version.get_metrics())
+        else:
+            click.echo(fmt_output(fmt, version.get_metrics().as_dict(include_children=builds)))
+        return
+    elif version_ids:
+        metrics_list = parallel_map(
+            lambda version_id: metrics_or_skip(
+                version_id, lambda: api.version_by_id(version_id).get_metrics(), skipped),
+            version_ids, workers)
     else:
-        click.echo(fmt_output(fmt, version.get_metrics().as_dict(include_children=builds)))
+        raise click.UsageError('Give a version, a version file or a project.')
+
+    echo_metrics(fmt, metrics_list, builds)
+    if skipped:
+        ctx.exit(1)
 
 
 @cli.command()
 @click.pass_context
-@click.option('-b', '--build', 'build_id', required=True)
+@click.option('-b', '--build', 'build_ids', multiple=True,
+              help='Id of build to analyze, can be given multiple times.')
+@click.option('--build-file', type=click.File('r'),
+              help="File with build ids to analyze, one per line, or '-' for stdin.")
+@click.option('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+              help='Number of builds to analyze concurrently.')
 @click.option('--tasks', is_flag=True, default=False, help='Include tasks of build in output')
-def build_stats(ctx, build_id, tasks):
+def build_stats(ctx, build_ids, build_file, workers, tasks):
     """
-    Collect stats for the given evergreen build.
+    Collect stats for the given evergreen builds.
+
+    Many builds can be analyzed at once, concurrently and sharing a single client, by giving
+    several ids or a file of ids. Results are written as soon as they are calculated. Builds
+    that are still running or cannot be fetched are reported and skipped, and the command then
+    exits with an error status.
 
     :param ctx: Command context.
-    :param build_id: Id of build to analyze.
+    :param build_ids: Ids of builds to analyze.
+    :param build_file: File with ids of builds to analyze.
+    :param workers: Number of builds to analyze concurrently.
     :param tasks: If true include tasks in output.
     """
     api = ctx.obj['api']
     fmt = ctx.obj['format']
 
-    build = api.build_by_id(build_id)
-    if fmt == DisplayFormat.human:
-        click.echo(build.get_metrics())
-    else:
-        click.echo(fmt_output(fmt, build.get_metrics().as_dict(include_children=tasks)))
+    build_ids = read_ids(build_ids, build_file)
+    if not build_ids:
+        raise click.UsageError('Give a build or a build file.')
+    if len(build_ids) == 1:
+        build = api.build_by_id(build_ids[0])
+        if fmt == DisplayFormat.human:
+            click.echo(build.get_metrics())
+        else:
+            click.echo(fmt_output(fmt, build.get_metrics().as_dict(include_children=tasks)))
+        return
+
+    skipped = []
+    echo_metrics(fmt, parallel_map(
+        lambda build_id: metrics_or_skip(
+            build_id, lambda: api.build_by_id(build_id).get_metrics(), skipped),
+        build_ids, workers), tasks)
+    if skipped:
+        ctx.exit(1)
 
 
 def main():
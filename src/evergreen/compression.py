@@ -0,0 +1,202 @@
+# -*- encoding: utf-8 -*-
+"""Negotiation and measurement of compressed api responses."""
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import namedtuple
+import threading
+
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse  # type: ignore
+
+from requests.models import ITER_CHUNK_SIZE
+from requests.utils import stream_decode_response_unicode
+from urllib3.util.request import ACCEPT_ENCODING
+
+PREFERRED_ENCODINGS = ('br', 'gzip', 'deflate')
+IDENTITY = 'identity'
+_API_PREFIXES = ('/rest/v2', '/plugin/json')
+
+EndpointMetrics = namedtuple('EndpointMetrics', ['requests', 'compressed_bytes',
+                                                 'uncompressed_bytes'])
+
+
+def supported_encodings():
+    """
+    Get the content encodings the client is able to decode.
+
+    gzip and deflate are always supported, br is supported when the brotli package is installed.
+
+    :return: Tuple of supported encodings in order of preference.
+    """
+    available = {encoding.strip() for encoding in ACCEPT_ENCODING.split(',')}
+    return tuple(encoding for encoding in PREFERRED_ENCODINGS if encoding in available)
+
+
+def accept_encoding_header(encodings=None):
+    """
+    Build the value of the Accept-Encoding header to send.
+
+    Encodings that the client is unable to decode are left out.
+
+    :param encodings: Encodings to accept in order of preference, all supported encodings if
+                      None, or no compression if empty.
+    :return: Value of the Accept-Encoding header.
+    """
+    supported = supported_encodings()
+    if encodings is None:
+        encodings = supported
+    accepted = [encoding for encoding in encodings if encoding in supported]
+    return ', '.join(accepted) if accepted else IDENTITY
+
+
+def endpoint_name(url):
+    """
+    Get the name of the endpoint a url belongs to.
+
+    Ids in the path are replaced with `{}` so calls for different objects are grouped together,
+    e.g. `/rest/v2/versions/abc123/builds` belongs to `/versions/{}/builds`.
+
+    :param url: Url of call.
+    :return: Name of endpoint.
+    """
+    path = urlparse(url).path
+    for prefix in _API_PREFIXES:
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    segments = [segment for segment in path.split('/') if segment]
+    return '/' + '/'.join(segment if index % 2 == 0 else '{}'
+                          for index, segment in enumerate(segments))
+
+
+def response_sizes(response):
+    """
+    Get the number of bytes a response took on the wire and after decompression.
+
+    :param response: Response that has been completely read.
+    :return: Tuple of (compressed bytes, uncompressed bytes).
+    """
+    uncompressed = len(response.content or b'')
+    compressed = wire_bytes(response)
+    return (uncompressed if compressed is None else compressed), uncompressed
+
+
+def wire_bytes(response):
+    """
+    Get the number of bytes of a response body read from the wire.
+
+    :param response: Response that has been read.
+    :return: Number of bytes, or None if it is unknown.
+    """
+    try:
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        pass
+    content_length = response.headers.get('Content-Length')
+    return int(content_length) if content_length and content_length.isdigit() else None
+
+
+class ClientMetrics(object):
+    """Counts of requests and response bytes for each endpoint called by a client."""
+
+    def __init__(self):
+        """Create empty client metrics."""
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def after_fork(self):
+        """Replace the lock, which another thread may have held when the process forked."""
+        self._lock = threading.Lock()
+
+    def record(self, url, compressed_bytes, uncompressed_bytes):
+        """
+        Record a response.
+
+        :param url: Url of call.
+        :param compressed_bytes: Number of bytes the response body took on the wire.
+        :param uncompressed_bytes: Number of bytes of the decompressed response body.
+        """
+        endpoint = endpoint_name(url)
+        with self._lock:
+            num_requests, compressed, uncompressed = self._endpoints.get(endpoint, (0, 0, 0))
+            self._endpoints[endpoint] = EndpointMetrics(num_requests + 1,
+                                                        compressed + compressed_bytes,
+                                                        uncompressed + uncompressed_bytes)
+
+    def endpoints(self):
+        """
+        Get the metrics of every endpoint that has been called.
+
+        :return: Dictionary of endpoint name to EndpointMetrics.
+        """
+        with self._lock:
+            return dict(self._endpoints)
+
+    def compression_ratio(self, endpoint=None):
+        """
+        Get how many times smaller responses were on the wire than after decompression.
+
+        :param endpoint: Name of endpoint to get ratio for, all endpoints if None.
+        :return: Ratio of uncompressed to compressed bytes, None if nothing has been received.
+        """
+        endpoints = self.endpoints()
+        if endpoint:
+            metrics = [endpoints[endpoint]] if endpoint in endpoints else []
+        else:
+            metrics = endpoints.values()
+        compressed = sum(metric.compressed_bytes for metric in metrics)
+        uncompressed = sum(metric.uncompressed_bytes for metric in metrics)
+        return uncompressed / compressed if compressed else None
+
+    def reset(self):
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._endpoints.clear()
+
+
+class ResponseLines(object):
+    """
+    Lines of a streaming response, counting the bytes they took after decompression.
+
+    Lines are split and decoded the same way as `Response.iter_lines(decode_unicode=True)`, but
+    the bytes are counted before decoding, so line endings and multi-byte characters are
+    included in the count.
+    """
+
+    def __init__(self, response, chunk_size=ITER_CHUNK_SIZE):
+        """
+        Create the lines of a response.
+
+        :param response: Streaming response to read.
+        :param chunk_size: Number of bytes to read at a time.
+        """
+        self.response = response
+        self.chunk_size = chunk_size
+        self.num_bytes = 0
+
+    def __iter__(self):
+        """Iterate over the lines of the response as they arrive."""
+        chunks = stream_decode_response_unicode(self._counted_chunks(), self.response)
+        pending = None
+        for chunk in chunks:
+            if pending is not None:
+                chunk = pending + chunk
+            lines = chunk.splitlines()
+            # The last line is incomplete unless the chunk ended with a line break.
+            if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
+                pending = lines.pop()
+            else:
+                pending = None
+            for line in lines:
+                yield line
+        if pending is not None:
+            yield pending
+
+    def _counted_chunks(self):
+        """Iterate over the decompressed chunks of the response, counting their bytes."""
+        for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+            self.num_bytes += len(chunk)
+            yield chunk
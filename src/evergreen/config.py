@@ -5,8 +5,6 @@ from __future__ import absolute_import
 from collections import namedtuple
 import os
 
-import yaml
-
 EvgAuth = namedtuple('EvgAuth', ['username', 'api_key'])
 
 DEFAULT_NETWORK_TIMEOUT_SEC = 5 * 60
@@ -24,6 +22,8 @@ def read_evergreen_from_file(filename):
     :param filename: Filename to read config.
     :return: Config read from file.
     """
+    import yaml
+
     with open(filename, 'r') as fstream:
         return yaml.safe_load(fstream)
 
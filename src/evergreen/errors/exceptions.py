@@ -45,3 +45,21 @@ class ActiveTaskMetricsException(MetricsException):
         super(MetricsException, self).__init__(msg)
 
         self.task = task
+
+
+class CassetteMissException(EvergreenException):
+    """An exception when a request being replayed was never recorded."""
+
+    def __init__(self, url, msg=None):
+        """
+        Create a new exception instance.
+
+        :param url: Url of request that was not recorded.
+        :param msg: Message describing exception.
+        """
+        if not msg:
+            msg = 'No recorded response for {url}'.format(url=url)
+
+        super(CassetteMissException, self).__init__(msg)
+
+        self.url = url
@@ -0,0 +1,144 @@
+# -*- encoding: utf-8 -*-
+"""Export evergreen stats to columnar formats."""
+from __future__ import absolute_import
+
+from itertools import islice
+
+from evergreen.util import parse_evergreen_date
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Fields are described as (name, type) pairs so they can be declared without pyarrow installed.
+TEST_STATS_FIELDS = (
+    ('test_file', 'string'),
+    ('task_name', 'string'),
+    ('variant', 'string'),
+    ('distro', 'string'),
+    ('date', 'date'),
+    ('num_pass', 'int'),
+    ('num_fail', 'int'),
+    ('avg_duration_pass', 'float'),
+)
+
+TASK_STATS_FIELDS = (
+    ('task_name', 'string'),
+    ('variant', 'string'),
+    ('distro', 'string'),
+    ('date', 'date'),
+    ('num_pass', 'int'),
+    ('num_fail', 'int'),
+    ('avg_duration_pass', 'float'),
+)
+
+TASK_RELIABILITY_FIELDS = (
+    ('task_name', 'string'),
+    ('variant', 'string'),
+    ('distro', 'string'),
+    ('date', 'date'),
+    ('num_success', 'int'),
+    ('num_failed', 'int'),
+    ('num_total', 'int'),
+    ('num_timeout', 'int'),
+    ('num_test_failed', 'int'),
+    ('num_system_failed', 'int'),
+    ('num_setup_failed', 'int'),
+    ('avg_duration_success', 'float'),
+    ('success_rate', 'float'),
+)
+
+_CONVERTERS = {
+    'string': str,
+    'date': parse_evergreen_date,
+    'int': int,
+    'float': float,
+}
+
+
+def _require_pyarrow():
+    """Raise an error if pyarrow is not available."""
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for columnar export, install evergreen.py[arrow]')
+
+
+def arrow_schema(fields):
+    """
+    Create an arrow schema for the given fields.
+
+    :param fields: Fields to include, e.g. TEST_STATS_FIELDS.
+    :return: pyarrow schema for the fields.
+    """
+    _require_pyarrow()
+    arrow_types = {
+        'string': pyarrow.string(),
+        'date': pyarrow.date32(),
+        'int': pyarrow.int64(),
+        'float': pyarrow.float64(),
+    }
+    return pyarrow.schema([(name, arrow_types[type_name]) for name, type_name in fields])
+
+
+def _to_columns(stats, fields):
+    """
+    Convert a collection of stats into typed columns.
+
+    :param stats: Stats objects to convert.
+    :param fields: Fields to extract from each object.
+    :return: List of columns, one for each field.
+    """
+    columns = [[] for _ in fields]
+    converters = [_CONVERTERS[type_name] for _, type_name in fields]
+    for stat in stats:
+        json = stat.json
+        for column, (name, _), convert in zip(columns, fields, converters):
+            value = json.get(name)
+            column.append(convert(value) if value is not None else None)
+    return columns
+
+
+def to_record_batches(stats, fields, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Convert stats into arrow record batches.
+
+    Stats are consumed lazily, so an `iter_*_stats_by_project` generator can be streamed into
+    batches without holding all the results in memory.
+
+    :param stats: Iterable of stats objects, e.g. TestStats.
+    :param fields: Fields to include, e.g. TEST_STATS_FIELDS.
+    :param batch_size: Maximum number of rows in each batch.
+    :return: Generator of record batches.
+    """
+    schema = arrow_schema(fields)
+    stats = iter(stats)
+    while True:
+        batch = list(islice(stats, batch_size))
+        if not batch:
+            break
+        yield pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(column, type=field.type)
+             for column, field in zip(_to_columns(batch, fields), schema)],
+            schema=schema)
+
+
+def write_parquet(stats, fields, where, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write stats to a parquet file.
+
+    :param stats: Iterable of stats objects, e.g. TestStats.
+    :param fields: Fields to include, e.g. TEST_STATS_FIELDS.
+    :param where: Path or file-like object to write to.
+    :param batch_size: Maximum number of rows to buffer before writing.
+    :return: Number of rows written.
+    """
+    schema = arrow_schema(fields)
+    n_rows = 0
+    with pyarrow.parquet.ParquetWriter(where, schema) as writer:
+        for batch in to_record_batches(stats, fields, batch_size):
+            writer.write_batch(batch)
+            n_rows += batch.num_rows
+    return n_rows
@@ -0,0 +1,50 @@
+# -*- encoding: utf-8 -*-
+"""
+Loggers that import and configure structlog the first time they are used.
+
+structlog is slow to import and configuring it is a global side effect, so importing evergreen
+does neither. The default configuration is only applied if structlog has not been configured
+by the application.
+"""
+from __future__ import absolute_import
+
+
+def configure_logging():
+    """Configure structlog to log through the standard library, unless already configured."""
+    import structlog
+    from structlog.stdlib import LoggerFactory
+
+    if not structlog.is_configured():
+        structlog.configure(logger_factory=LoggerFactory())
+
+
+class _LazyLogger(object):
+    """Logger that creates a structlog logger on first use."""
+
+    def __init__(self, name):
+        """
+        Create a lazy logger.
+
+        :param name: Name of logger.
+        """
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, item):
+        """Forward calls to the structlog logger, creating it if needed."""
+        if self._logger is None:
+            import structlog
+
+            configure_logging()
+            self._logger = structlog.get_logger(self._name)
+        return getattr(self._logger, item)
+
+
+def get_logger(name):
+    """
+    Get a logger that imports structlog when it is first used.
+
+    :param name: Name of logger.
+    :return: Logger.
+    """
+    return _LazyLogger(name)
@@ -3,7 +3,7 @@
 from __future__ import absolute_import
 from __future__ import division
 
-from structlog import get_logger
+from evergreen.log import get_logger
 
 from evergreen.errors.exceptions import ActiveTaskMetricsException
 
@@ -0,0 +1,283 @@
+# -*- encoding: utf-8 -*-
+"""Flakiness metrics for Evergreen tests."""
+from __future__ import absolute_import
+from __future__ import division
+
+from array import array
+from collections import namedtuple
+from datetime import timedelta
+
+from evergreen.metrics.stats_util import binomial_log_likelihood, binomial_log_likelihoods, \
+    chi_square_1_sf, optional_import, wilson_interval, wilson_intervals
+from evergreen.util import as_date
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_CHANGEPOINT_P_VALUE = 0.01
+DEFAULT_MIN_SEGMENT_DAYS = 3
+# Tests scored together with numpy, bounding the size of the intermediate arrays.
+NUMPY_CHUNK_SIZE = 10000
+
+ChangePoint = namedtuple('ChangePoint', ['date', 'fail_rate_before', 'fail_rate_after',
+                                         'p_value'])
+TestFlakiness = namedtuple('TestFlakiness', ['test_file', 'task_name', 'variant', 'num_pass',
+                                             'num_fail', 'fail_rate', 'fail_rate_low',
+                                             'fail_rate_high', 'changepoint', 'is_flaky'])
+
+
+class FlakinessScorer(object):
+    """
+    Score the flakiness of tests from their daily test stats.
+
+    Stats are added one at a time and accumulated into a fixed size array of daily pass and fail
+    counts for each (test, task, variant), so the raw stats never need to be held in memory.
+    A test is reported as flaky when it both passes and fails over the window without a
+    significant change in its fail rate. A significant change is reported as a changepoint,
+    since that usually points to a regression or a fix rather than flakiness.
+
+    With numpy, the counts of many tests are stacked into a (tests x days) matrix and scored with
+    array operations instead of one test at a time; both ways give the same scores.
+    """
+
+    def __init__(self, after_date, before_date, confidence=DEFAULT_CONFIDENCE,
+                 changepoint_p_value=DEFAULT_CHANGEPOINT_P_VALUE,
+                 min_segment_days=DEFAULT_MIN_SEGMENT_DAYS, use_numpy=None):
+        """
+        Create a flakiness scorer for a window of days.
+
+        :param after_date: First day of the window.
+        :param before_date: Day after the last day of the window.
+        :param confidence: Confidence level of the fail rate intervals.
+        :param changepoint_p_value: Largest p-value for a changepoint to be reported.
+        :param min_segment_days: Minimum days with results on each side of a changepoint.
+        :param use_numpy: Score tests with numpy, defaults to using it if it is installed.
+        """
+        self.after_date = as_date(after_date)
+        self.before_date = as_date(before_date)
+        self.confidence = confidence
+        self.changepoint_p_value = changepoint_p_value
+        self.min_segment_days = min_segment_days
+
+        self._numpy = None if use_numpy is False else optional_import('numpy')
+        if use_numpy and self._numpy is None:
+            raise ImportError('numpy is required for vectorized flakiness scores, install '
+                              'evergreen.py[stats]')
+
+        self._num_days = (self.before_date - self.after_date).days
+        self._date_index = {}
+        self._counts = {}
+
+    def add(self, test_stats):
+        """
+        Add the stats for a test on a given day.
+
+        Stats outside of the window are ignored.
+
+        :param test_stats: TestStats to add.
+        :return: self.
+        """
+        json = test_stats.json
+        day = self._day_index(json['date'])
+        if day is None:
+            return self
+
+        key = (json.get('test_file'), json.get('task_name'), json.get('variant'))
+        counts = self._counts.get(key)
+        if counts is None:
+            # Passes are stored in the first half of the array and failures in the second.
+            counts = array('L', [0]) * (2 * self._num_days)
+            self._counts[key] = counts
+        counts[day] += json.get('num_pass') or 0
+        counts[self._num_days + day] += json.get('num_fail') or 0
+        return self
+
+    def add_all(self, test_stats_list):
+        """
+        Add a collection of test stats.
+
+        :param test_stats_list: Iterable of TestStats to add.
+        :return: self.
+        """
+        for test_stats in test_stats_list:
+            self.add(test_stats)
+        return self
+
+    def scores(self):
+        """
+        Calculate the flakiness of every test that has been added.
+
+        :return: Generator of TestFlakiness for each (test, task, variant).
+        """
+        if self._numpy is None:
+            for key, counts in self._counts.items():
+                yield self._score(key, counts)
+            return
+
+        items = list(self._counts.items())
+        for start in range(0, len(items), NUMPY_CHUNK_SIZE):
+            for score in self._score_all(items[start:start + NUMPY_CHUNK_SIZE]):
+                yield score
+
+    def flaky_tests(self):
+        """
+        Get the tests that are considered flaky.
+
+        :return: List of TestFlakiness for flaky tests, most frequently failing first.
+        """
+        return sorted((score for score in self.scores() if score.is_flaky),
+                      key=lambda score: score.fail_rate, reverse=True)
+
+    def _day_index(self, evg_date):
+        """Get the index of the given date in the window, or None if it is outside of it."""
+        if evg_date not in self._date_index:
+            index = (as_date(evg_date) - self.after_date).days
+            self._date_index[evg_date] = index if 0 <= index < self._num_days else None
+        return self._date_index[evg_date]
+
+    def _score(self, key, counts):
+        """Calculate the flakiness of a single test from its daily counts."""
+        passes = counts[:self._num_days]
+        failures = counts[self._num_days:]
+        num_pass = sum(passes)
+        num_fail = sum(failures)
+        total = num_pass + num_fail
+        fail_rate = num_fail / total if total else 0.0
+        fail_rate_low, fail_rate_high = wilson_interval(num_fail, total, self.confidence)
+        changepoint = self._find_changepoint(passes, failures, num_fail, total)
+        is_flaky = num_pass > 0 and num_fail > 0 and changepoint is None
+
+        test_file, task_name, variant = key
+        return TestFlakiness(test_file, task_name, variant, num_pass, num_fail, fail_rate,
+                             fail_rate_low, fail_rate_high, changepoint, is_flaky)
+
+    def _find_changepoint(self, passes, failures, num_fail, total):
+        """
+        Find the most likely single change in fail rate over the window.
+
+        Each split between days with results is scored with the likelihood ratio of two
+        separate fail rates against a single one, using running totals so the whole series is
+        scanned once. Since the best of many splits is picked, its p-value is multiplied by the
+        number of splits tried (a Bonferroni correction), otherwise a test that is only flaky would
+        often appear to change by chance.
+
+        :return: ChangePoint if a significant change was found, otherwise None.
+        """
+        days = [day for day in range(self._num_days) if passes[day] or failures[day]]
+        if len(days) < 2 * self.min_segment_days or num_fail == 0 or num_fail == total:
+            return None
+
+        null_likelihood = binomial_log_likelihood(num_fail, total)
+        best = None
+        num_splits = 0
+        fail_before = 0
+        total_before = 0
+        for position, day in enumerate(days[:len(days) - self.min_segment_days]):
+            fail_before += failures[day]
+            total_before += failures[day] + passes[day]
+            if position + 1 < self.min_segment_days:
+                continue
+            num_splits += 1
+            fail_after = num_fail - fail_before
+            total_after = total - total_before
+            statistic = 2 * (binomial_log_likelihood(fail_before, total_before) +
+                             binomial_log_likelihood(fail_after, total_after) - null_likelihood)
+            if best is None or statistic > best[0]:
+                best = (statistic, days[position + 1], fail_before / total_before,
+                        fail_after / total_after)
+
+        if best is None:
+            return None
+        p_value = min(1.0, num_splits * chi_square_1_sf(best[0]))
+        if p_value > self.changepoint_p_value:
+            return None
+        return ChangePoint(self.after_date + timedelta(days=best[1]), best[2], best[3], p_value)
+
+    def _score_all(self, items):
+        """
+        Calculate the flakiness of many tests at once with numpy.
+
+        This scores every split of every test like `_find_changepoint`, using running totals
+        along the days of the counts matrix.
+
+        :param items: List of (key, counts) of the tests to score.
+        :return: List of TestFlakiness for each test.
+        """
+        numpy = self._numpy
+        counts = numpy.vstack([numpy.frombuffer(test_counts, dtype='L')
+                               for _, test_counts in items]).astype(numpy.int64)
+        passes = counts[:, :self._num_days]
+        failures = counts[:, self._num_days:]
+        daily_total = passes + failures
+        num_pass = passes.sum(axis=1)
+        num_fail = failures.sum(axis=1)
+        total = num_pass + num_fail
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            fail_rate = numpy.where(total > 0, num_fail / total, 0.0)
+        fail_rate_low, fail_rate_high = wilson_intervals(num_fail, total, self.confidence)
+
+        # Days with results up to and including each day, splits are made after them.
+        has_results = daily_total > 0
+        position = numpy.cumsum(has_results, axis=1)
+        num_days = position[:, -1]
+        can_change = (num_days >= 2 * self.min_segment_days) & (num_fail > 0) & (num_fail < total)
+        candidates = has_results & (position >= self.min_segment_days) & \
+            (position <= (num_days - self.min_segment_days)[:, numpy.newaxis]) & \
+            can_change[:, numpy.newaxis]
+        fail_before = numpy.cumsum(failures, axis=1)
+        total_before = numpy.cumsum(daily_total, axis=1)
+        fail_after = num_fail[:, numpy.newaxis] - fail_before
+        total_after = total[:, numpy.newaxis] - total_before
+        statistics = 2 * (binomial_log_likelihoods(fail_before, total_before) +
+                          binomial_log_likelihoods(fail_after, total_after) -
+                          binomial_log_likelihoods(num_fail, total)[:, numpy.newaxis])
+        statistics = numpy.where(candidates, statistics, -numpy.inf)
+        best = numpy.argmax(statistics, axis=1)
+        num_splits = candidates.sum(axis=1)
+
+        scores = []
+        columns = zip(items, num_pass.tolist(), num_fail.tolist(), fail_rate.tolist(),
+                      fail_rate_low.tolist(), fail_rate_high.tolist(), can_change.tolist())
+        for row, ((key, _), test_pass, test_fail, rate, low, high, changes) in enumerate(columns):
+            changepoint = None
+            if changes:
+                changepoint = self._changepoint_at(row, int(best[row]), int(num_splits[row]),
+                                                   statistics, has_results, fail_before,
+                                                   total_before, fail_after, total_after)
+            test_file, task_name, variant = key
+            scores.append(TestFlakiness(test_file, task_name, variant, test_pass, test_fail, rate,
+                                        low, high, changepoint,
+                                        test_pass > 0 and test_fail > 0 and changepoint is None))
+        return scores
+
+    def _changepoint_at(self, row, day, num_splits, statistics, has_results, fail_before,
+                        total_before, fail_after, total_after):
+        """
+        Create the changepoint of a test scored with numpy at its best split.
+
+        :return: ChangePoint if the split is significant, otherwise None.
+        """
+        p_value = min(1.0, num_splits * chi_square_1_sf(float(statistics[row, day])))
+        if p_value > self.changepoint_p_value:
+            return None
+        # The change is dated from the next day with results, as in `_find_changepoint`.
+        next_day = day + 1 + int(self._numpy.flatnonzero(has_results[row, day + 1:])[0])
+        return ChangePoint(self.after_date + timedelta(days=next_day),
+                           int(fail_before[row, day]) / int(total_before[row, day]),
+                           int(fail_after[row, day]) / int(total_after[row, day]), p_value)
+
+
+def score_project(api, project_id, after_date, before_date, **kwargs):
+    """
+    Score the flakiness of the tests in a project.
+
+    :param api: Evergreen api to query stats with.
+    :param project_id: Id of project to query.
+    :param after_date: First day to include.
+    :param before_date: Day after the last day to include.
+    :param kwargs: Additional arguments to pass to FlakinessScorer.
+    :return: FlakinessScorer with the stats for the project added.
+    """
+    scorer = FlakinessScorer(after_date, before_date, **kwargs)
+    test_stats = api.iter_test_stats_by_project(project_id, str(scorer.after_date),
+                                                str(scorer.before_date), group_num_days=1,
+                                                group_by='test_task_variant')
+    return scorer.add_all(test_stats)
@@ -0,0 +1,163 @@
+# -*- encoding: utf-8 -*-
+"""Compare two sets of Evergreen performance results."""
+from __future__ import absolute_import
+from __future__ import division
+
+from collections import defaultdict, namedtuple
+import math
+
+from evergreen.metrics.performance_series import lower_is_better
+from evergreen.metrics.stats_util import mann_whitney_u_test, mann_whitney_u_tests, \
+    optional_import, welch_t_test, welch_t_tests
+
+DEFAULT_SIGNIFICANCE = 0.05
+DEFAULT_MIN_PERCENT_CHANGE = 2.0
+DEFAULT_NOISE_MULTIPLIER = 2.0
+
+VERDICT_IMPROVEMENT = 'improvement'
+VERDICT_REGRESSION = 'regression'
+VERDICT_NO_CHANGE = 'no change'
+VERDICT_INCONCLUSIVE = 'inconclusive'
+
+PerformanceComparison = namedtuple('PerformanceComparison', [
+    'test_name', 'thread_level', 'measurement', 'base_mean', 'mean', 'percent_change',
+    'noise_percent', 'welch_p_value', 'mann_whitney_p_value', 'verdict'])
+
+
+def _results_by_key(performance_data):
+    """Index the results of performance data by (test name, thread level, measurement)."""
+    return {(test_run.test_name, result.thread_level, result.measurement): result
+            for test_run in performance_data.test_batch.test_runs
+            for result in test_run.test_results}
+
+
+def _noise_percent(values):
+    """Get the coefficient of variation of the values as a percent."""
+    if len(values) < 2:
+        return 0.0
+    mean = sum(values) / len(values)
+    if not mean:
+        return 0.0
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return 100 * math.sqrt(variance) / abs(mean)
+
+
+def _value_stats(base_values, values):
+    """Get the base noise and the p-values of the tests comparing two sets of values."""
+    return (_noise_percent(base_values), welch_t_test(base_values, values),
+            mann_whitney_u_test(base_values, values))
+
+
+def _value_stats_vectorized(value_pairs):
+    """
+    Get the base noise and the p-values of the tests for many pairs of values with numpy.
+
+    Pairs with the same numbers of values are stacked into arrays, with a row for each pair, so
+    every pair in a stack is tested at once.
+
+    :param value_pairs: List of (base values, values) pairs.
+    :return: List of (noise percent, Welch's p-value, Mann-Whitney p-value) for each pair.
+    """
+    import numpy
+
+    stacks = defaultdict(list)
+    for index, (base_values, values) in enumerate(value_pairs):
+        stacks[(len(base_values), len(values))].append(index)
+
+    stats = [None] * len(value_pairs)
+    for (n_base, n_values), indexes in stacks.items():
+        base = numpy.array([value_pairs[index][0] for index in indexes], dtype=float)
+        new = numpy.array([value_pairs[index][1] for index in indexes], dtype=float)
+        no_values = [None] * len(indexes)
+        if n_base < 2:
+            noise_percents = [0.0] * len(indexes)
+        else:
+            mean = numpy.abs(base.mean(axis=1))
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                noise_percents = numpy.where(
+                    mean == 0, 0.0, 100 * base.std(axis=1, ddof=1) / mean).tolist()
+        welch_p_values = welch_t_tests(base, new).tolist() \
+            if n_base >= 2 and n_values >= 2 else no_values
+        mann_whitney_p_values = mann_whitney_u_tests(base, new).tolist()
+        for index, value_stats in zip(indexes, zip(noise_percents, welch_p_values,
+                                                   mann_whitney_p_values)):
+            stats[index] = value_stats
+    return stats
+
+
+def _verdict(measurement, percent_change, noise_percent, p_value, significance,
+             min_percent_change, noise_multiplier):
+    """Decide if a change is an improvement, a regression, no change or inconclusive."""
+    threshold = max(min_percent_change, noise_multiplier * noise_percent)
+    if percent_change is None:
+        return VERDICT_INCONCLUSIVE
+    if abs(percent_change) < threshold:
+        return VERDICT_NO_CHANGE
+    if p_value is None or p_value > significance:
+        return VERDICT_INCONCLUSIVE
+    if (percent_change < 0) == lower_is_better(measurement):
+        return VERDICT_IMPROVEMENT
+    return VERDICT_REGRESSION
+
+
+def compare_performance_data(base, performance_data, significance=DEFAULT_SIGNIFICANCE,
+                             min_percent_change=DEFAULT_MIN_PERCENT_CHANGE,
+                             noise_multiplier=DEFAULT_NOISE_MULTIPLIER, use_numpy=None):
+    """
+    Compare performance results against a base, e.g. a patch against its base commit.
+
+    Results are matched by test name, thread level and measurement. A match is reported as an
+    improvement or a regression only if its change is larger than both `min_percent_change` and
+    `noise_multiplier` times the noise of the base values, and the Welch's t-test over the
+    recorded values is significant. When there are too few recorded values for a t-test, the
+    Mann-Whitney U test is used instead. With numpy and scipy, the tests of all the matches are
+    computed at once over arrays of their recorded values.
+
+    :param base: PerformanceData to compare against.
+    :param performance_data: PerformanceData to compare.
+    :param significance: Largest p-value for a change to be considered significant.
+    :param min_percent_change: Smallest percent change that is considered a change.
+    :param noise_multiplier: Multiple of the base noise that a change must exceed.
+    :param use_numpy: Compute the tests with numpy and scipy, defaults to using them if they are
+                      installed.
+    :return: List of PerformanceComparison for every matching result.
+    """
+    vectorized = use_numpy is not False and optional_import('numpy') is not None and \
+        optional_import('scipy.special') is not None
+    if use_numpy and not vectorized:
+        raise ImportError('numpy and scipy are required for vectorized comparisons, install '
+                          'evergreen.py[stats]')
+
+    base_results = _results_by_key(base)
+    matches = []
+    value_pairs = []
+    for key, result in _results_by_key(performance_data).items():
+        base_result = base_results.get(key)
+        if base_result is None:
+            continue
+        base_mean = base_result.mean_value
+        mean = result.mean_value
+        if base_mean is None or mean is None:
+            continue
+        matches.append((key, base_mean, mean))
+        value_pairs.append((base_result.recorded_values or [base_mean],
+                            result.recorded_values or [mean]))
+
+    if vectorized:
+        stats = _value_stats_vectorized(value_pairs)
+    else:
+        stats = [_value_stats(base_values, values) for base_values, values in value_pairs]
+
+    comparisons = []
+    for (key, base_mean, mean), value_stats in zip(matches, stats):
+        test_name, thread_level, measurement = key
+        noise_percent, welch_p_value, mann_whitney_p_value = value_stats
+        percent_change = 100 * (mean - base_mean) / abs(base_mean) if base_mean else None
+        p_value = welch_p_value if welch_p_value is not None else mann_whitney_p_value
+        verdict = _verdict(measurement, percent_change, noise_percent, p_value, significance,
+                           min_percent_change, noise_multiplier)
+
+        comparisons.append(PerformanceComparison(
+            test_name, thread_level, measurement, base_mean, mean, percent_change,
+            noise_percent, welch_p_value, mann_whitney_p_value, verdict))
+    return comparisons
@@ -0,0 +1,150 @@
+# -*- encoding: utf-8 -*-
+"""Time series of Evergreen performance results."""
+from __future__ import absolute_import
+from __future__ import division
+
+from array import array
+from collections import namedtuple
+import random
+
+from evergreen.metrics.stats_util import e_divisive
+
+DEFAULT_MIN_SIZE = 5
+DEFAULT_PERMUTATIONS = 99
+DEFAULT_SIGNIFICANCE = 0.05
+
+SeriesKey = namedtuple('SeriesKey', ['test_name', 'thread_level', 'measurement'])
+Series = namedtuple('Series', ['orders', 'revisions', 'values'])
+PerformanceChangePoint = namedtuple('PerformanceChangePoint', [
+    'test_name', 'thread_level', 'measurement', 'order', 'revision', 'mean_before', 'mean_after',
+    'percent_change', 'probability'])
+
+
+def lower_is_better(measurement):
+    """
+    Guess whether a lower value is an improvement for the given measurement.
+
+    :param measurement: Name of measurement.
+    :return: True if the measurement looks like a latency or duration.
+    """
+    return any(word in measurement for word in ('latency', 'duration', 'time'))
+
+
+class PerformanceSeries(object):
+    """
+    Performance results flattened into one series per (test, thread level, measurement).
+
+    Each series holds the mean value of every history point in revision order. Values are kept
+    in compact arrays, and the results of each test run are only formatted once.
+    """
+
+    def __init__(self):
+        """Create an empty set of series."""
+        self._points = {}
+
+    @classmethod
+    def from_performance_data(cls, performance_data_list):
+        """
+        Create series from a performance history.
+
+        :param performance_data_list: Iterable of PerformanceData, e.g. the result of
+                                      `performance_results_by_task_name`.
+        :return: PerformanceSeries for the history.
+        """
+        series = cls()
+        for performance_data in performance_data_list:
+            series.add(performance_data)
+        return series
+
+    def add(self, performance_data):
+        """
+        Add a history point.
+
+        :param performance_data: PerformanceData to add.
+        :return: self.
+        """
+        order = performance_data.order
+        revision = performance_data.revision
+        for test_run in performance_data.test_batch.test_runs:
+            for result in test_run.test_results:
+                if result.mean_value is None:
+                    continue
+                key = SeriesKey(test_run.test_name, result.thread_level, result.measurement)
+                self._points.setdefault(key, []).append((order, revision, result.mean_value))
+        return self
+
+    def keys(self):
+        """Get the keys of all the series."""
+        return list(self._points.keys())
+
+    def series(self, key):
+        """
+        Get a single series in revision order.
+
+        :param key: SeriesKey of series to get.
+        :return: Series with parallel orders, revisions and values.
+        """
+        points = sorted(self._points[key], key=lambda point: point[0])
+        return Series(array('l', [point[0] for point in points]),
+                      [point[1] for point in points],
+                      array('d', [point[2] for point in points]))
+
+    def as_columns(self):
+        """
+        Get every point of every series as columns.
+
+        :return: Dictionary of column name to list of values.
+        """
+        columns = {field: [] for field in SeriesKey._fields + ('order', 'revision', 'value')}
+        for key in self._points:
+            series = self.series(key)
+            for column, value in zip(SeriesKey._fields, key):
+                columns[column].extend([value] * len(series.values))
+            columns['order'].extend(series.orders)
+            columns['revision'].extend(series.revisions)
+            columns['value'].extend(series.values)
+        return columns
+
+    def change_points(self, min_size=DEFAULT_MIN_SIZE, permutations=DEFAULT_PERMUTATIONS,
+                      significance=DEFAULT_SIGNIFICANCE, seed=0):
+        """
+        Detect change points in every series with E-Divisive.
+
+        :param min_size: Minimum number of points between change points.
+        :param permutations: Number of permutations used for each significance test.
+        :param significance: Largest probability of a change being chance for it to be kept.
+        :param seed: Seed for the permutations, so results are reproducible.
+        :return: List of PerformanceChangePoint.
+        """
+        rng = random.Random(seed)
+        change_points = []
+        for key in self._points:
+            series = self.series(key)
+            indexes = e_divisive(series.values, min_size, permutations, significance, rng)
+            bounds = [0] + [index for index, _ in indexes] + [len(series.values)]
+            for position, (index, probability) in enumerate(indexes):
+                before = series.values[bounds[position]:index]
+                after = series.values[index:bounds[position + 2]]
+                mean_before = sum(before) / len(before)
+                mean_after = sum(after) / len(after)
+                percent_change = 100 * (mean_after - mean_before) / mean_before \
+                    if mean_before else None
+                change_points.append(PerformanceChangePoint(
+                    key.test_name, key.thread_level, key.measurement, series.orders[index],
+                    series.revisions[index], mean_before, mean_after, percent_change,
+                    probability))
+        return change_points
+
+    def regressions(self, **kwargs):
+        """
+        Detect change points that made performance worse.
+
+        Whether a higher value is worse is guessed from the measurement name with
+        `lower_is_better`.
+
+        :param kwargs: Arguments to pass to change_points.
+        :return: List of PerformanceChangePoint for regressions.
+        """
+        return [change_point for change_point in self.change_points(**kwargs)
+                if (change_point.mean_after > change_point.mean_before) ==
+                lower_is_better(change_point.measurement)]
@@ -0,0 +1,481 @@
+# -*- encoding: utf-8 -*-
+"""Statistical helpers used by evergreen metrics."""
+from __future__ import absolute_import
+from __future__ import division
+
+import importlib
+import math
+import random
+
+
+def normal_cdf(x):
+    """
+    Cumulative distribution function of the standard normal distribution.
+
+    :param x: Value to evaluate.
+    :return: Probability of a standard normal variable being at most x.
+    """
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def normal_ppf(p):
+    """
+    Inverse of the standard normal cumulative distribution function.
+
+    :param p: Probability, between 0 and 1 exclusive.
+    :return: Value x such that normal_cdf(x) == p.
+    """
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if normal_cdf(mid) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def wilson_interval(successes, total, confidence=0.95):
+    """
+    Wilson score interval for a binomial proportion.
+
+    :param successes: Number of successes observed.
+    :param total: Number of trials observed.
+    :param confidence: Confidence level of the interval.
+    :return: (lower, upper) bounds of the proportion, or (0, 1) if there are no trials.
+    """
+    if not total:
+        return 0.0, 1.0
+    z = normal_ppf(1 - (1 - confidence) / 2)
+    proportion = successes / total
+    denominator = 1 + z * z / total
+    center = (proportion + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / total + z * z / (4 * total * total))
+    margin /= denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def binomial_log_likelihood(successes, total):
+    """
+    Log likelihood of observing the given successes at their maximum likelihood rate.
+
+    :param successes: Number of successes observed.
+    :param total: Number of trials observed.
+    :return: Log likelihood.
+    """
+    failures = total - successes
+    log_likelihood = 0.0
+    if successes:
+        log_likelihood += successes * math.log(successes / total)
+    if failures:
+        log_likelihood += failures * math.log(failures / total)
+    return log_likelihood
+
+
+def wilson_intervals(successes, total, confidence=0.95):
+    """
+    Wilson score intervals for an array of binomial proportions, requires numpy.
+
+    :param successes: numpy array of the number of successes observed.
+    :param total: numpy array of the number of trials observed.
+    :param confidence: Confidence level of the intervals.
+    :return: (lower, upper) numpy arrays of bounds, (0, 1) where there are no trials.
+    """
+    import numpy
+
+    z = normal_ppf(1 - (1 - confidence) / 2)
+    total = numpy.asarray(total, dtype=float)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        proportion = successes / total
+        denominator = 1 + z * z / total
+        center = (proportion + z * z / (2 * total)) / denominator
+        margin = z * numpy.sqrt(proportion * (1 - proportion) / total +
+                                z * z / (4 * total * total))
+        margin /= denominator
+    lower = numpy.where(total > 0, numpy.maximum(0.0, center - margin), 0.0)
+    upper = numpy.where(total > 0, numpy.minimum(1.0, center + margin), 1.0)
+    return lower, upper
+
+
+def binomial_log_likelihoods(successes, total):
+    """
+    Log likelihoods of observing arrays of successes at their maximum likelihood rates.
+
+    Requires numpy.
+
+    :param successes: numpy array of the number of successes observed.
+    :param total: numpy array of the number of trials observed.
+    :return: numpy array of log likelihoods.
+    """
+    import numpy
+
+    successes = numpy.asarray(successes, dtype=float)
+    failures = total - successes
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return (numpy.where(successes > 0, successes * numpy.log(successes / total), 0.0) +
+                numpy.where(failures > 0, failures * numpy.log(failures / total), 0.0))
+
+
+def chi_square_1_sf(statistic):
+    """
+    Survival function of the chi-squared distribution with one degree of freedom.
+
+    :param statistic: Value of the test statistic.
+    :return: Probability of a value at least as large as statistic.
+    """
+    if statistic <= 0:
+        return 1.0
+    return math.erfc(math.sqrt(statistic / 2))
+
+
+def _sum_of_pairwise_distances(values):
+    """
+    Sum of |x - y| over every pair of values.
+
+    :param values: Values to sum the distances of.
+    :return: Sum of the pairwise distances.
+    """
+    n = len(values)
+    return sum(value * (2 * i - n + 1) for i, value in enumerate(sorted(values)))
+
+
+def e_divisive_split(values, min_size):
+    """
+    Find the split of a series that best divides it into two different distributions.
+
+    Splits are scored with the E-Divisive energy statistic. All candidate splits are scored in a
+    single O(n^2) pass by moving one value at a time from the right segment to the left and
+    updating the within and between segment distance sums.
+
+    :param values: Series of values.
+    :param min_size: Minimum number of values on each side of the split, at least 2.
+    :return: (index, statistic) of the best split, where index is the first value of the
+             right segment, or None if the series is too short to split.
+    """
+    n = len(values)
+    if n < 2 * min_size:
+        return None
+
+    within_left = 0.0
+    within_right = float(_sum_of_pairwise_distances(values))
+    between = 0.0
+    best = None
+    for moving in range(n - min_size):
+        value = values[moving]
+        to_left = sum(abs(value - other) for other in values[:moving])
+        to_right = sum(abs(value - other) for other in values[moving + 1:])
+        within_left += to_left
+        within_right -= to_right
+        between += to_right - to_left
+
+        left_size = moving + 1
+        right_size = n - left_size
+        if left_size < min_size:
+            continue
+        energy = (2 * between / (left_size * right_size) -
+                  2 * within_left / (left_size * (left_size - 1)) -
+                  2 * within_right / (right_size * (right_size - 1)))
+        statistic = left_size * right_size / n * energy
+        if best is None or statistic > best[1]:
+            best = (left_size, statistic)
+    return best
+
+
+def _python_split_scorer(values, min_size):
+    """
+    Create a function that finds the best split of some of the values in pure python.
+
+    :param values: Series of values.
+    :param min_size: Minimum number of values on each side of the split.
+    :return: Function taking a list of indexes into values and returning their best split.
+    """
+    return lambda order: e_divisive_split([values[i] for i in order], min_size)
+
+
+def _numpy_split_scorer(numpy, values, min_size):
+    """
+    Create a function that finds the best split of some of the values with numpy.
+
+    The distances between every pair of values are computed once. A split of any ordering of the
+    values is then scored by taking the rows and columns of those distances in that order, which
+    gives the same running sums as e_divisive_split for every candidate split at once.
+
+    :param numpy: numpy module.
+    :param values: Series of values.
+    :param min_size: Minimum number of values on each side of the split.
+    :return: Function taking a list of indexes into values and returning their best split.
+    """
+    series = numpy.asarray(values, dtype=float)
+    distances = numpy.abs(series[:, numpy.newaxis] - series[numpy.newaxis, :])
+
+    def best_split(order):
+        n = len(order)
+        if n < 2 * min_size:
+            return None
+        index = numpy.asarray(order)
+        segment = distances[numpy.ix_(index, index)]
+        # Distances are symmetric, so the column sums of the lower triangle are the distances
+        # from each value to the values after it.
+        lower = numpy.tril(segment, -1)
+        to_left = lower.sum(axis=1)
+        to_right = lower.sum(axis=0)
+        within_left = numpy.cumsum(to_left)
+        within_right = to_left.sum() - numpy.cumsum(to_right)
+        between = numpy.cumsum(to_right - to_left)
+
+        candidates = slice(min_size - 1, n - min_size)
+        left_size = numpy.arange(1, n + 1)[candidates]
+        right_size = n - left_size
+        energy = (2 * between[candidates] / (left_size * right_size) -
+                  2 * within_left[candidates] / (left_size * (left_size - 1)) -
+                  2 * within_right[candidates] / (right_size * (right_size - 1)))
+        statistics = left_size * right_size / n * energy
+        best = int(numpy.argmax(statistics))
+        return int(left_size[best]), float(statistics[best])
+
+    return best_split
+
+
+def optional_import(name):
+    """
+    Import a module of the `stats` extra if it is installed.
+
+    :param name: Name of the module, e.g. 'numpy'.
+    :return: Module, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def e_divisive(values, min_size=5, permutations=99, significance=0.05, rng=None,
+               use_numpy=None):
+    """
+    Detect change points in a series with E-Divisive.
+
+    The series is split recursively at its best split. A split is kept only if it scores higher
+    than splits of random permutations of the same segment often enough to be significant. With
+    numpy, every candidate split of a permutation is scored at once instead of in a python loop;
+    both ways test the same permutations and find the same change points.
+
+    :param values: Series of values.
+    :param min_size: Minimum number of values between change points, at least 2.
+    :param permutations: Number of permutations used for each significance test.
+    :param significance: Largest probability of a split being chance for it to be kept.
+    :param rng: random.Random instance used for permutations.
+    :param use_numpy: Score splits with numpy, defaults to using it if it is installed.
+    :return: List of (index, probability) for each change point, sorted by index.
+    """
+    rng = rng or random.Random(0)
+    numpy = None if use_numpy is False else optional_import('numpy')
+    if use_numpy and numpy is None:
+        raise ImportError('numpy is required for vectorized E-Divisive, install '
+                          'evergreen.py[stats]')
+    if numpy is None:
+        best_split = _python_split_scorer(values, min_size)
+    else:
+        best_split = _numpy_split_scorer(numpy, values, min_size)
+
+    change_points = []
+    segments = [(0, len(values))]
+    while segments:
+        start, end = segments.pop()
+        order = list(range(start, end))
+        split = best_split(order)
+        if split is None:
+            continue
+
+        index, statistic = split
+        # Stop permuting as soon as the split can no longer be significant.
+        max_as_extreme = significance * (permutations + 1) - 1
+        at_least_as_extreme = 0
+        for _ in range(permutations):
+            rng.shuffle(order)
+            if best_split(order)[1] >= statistic:
+                at_least_as_extreme += 1
+                if at_least_as_extreme > max_as_extreme:
+                    break
+        probability = (at_least_as_extreme + 1) / (permutations + 1)
+        if probability > significance:
+            continue
+
+        change_points.append((start + index, probability))
+        segments.append((start, start + index))
+        segments.append((start + index, end))
+    return sorted(change_points)
+
+
+def _beta_continued_fraction(a, b, x, max_iterations=200, epsilon=3e-14):
+    """Evaluate the continued fraction of the incomplete beta function with Lentz's method."""
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, max_iterations + 1):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < epsilon:
+            break
+    return result
+
+
+def regularized_incomplete_beta(a, b, x):
+    """
+    Regularized incomplete beta function I_x(a, b).
+
+    :param a: First shape parameter.
+    :param b: Second shape parameter.
+    :param x: Value between 0 and 1.
+    :return: Value of the function.
+    """
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+                 a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def _mean_and_variance(values):
+    """Get the mean and unbiased sample variance of the values."""
+    n = len(values)
+    mean = sum(values) / n
+    return mean, sum((value - mean) ** 2 for value in values) / (n - 1)
+
+
+def welch_t_test(first, second):
+    """
+    Two-sided Welch's t-test for a difference in means.
+
+    :param first: First sample, with at least two values.
+    :param second: Second sample, with at least two values.
+    :return: p-value of the test, or None if either sample is too small.
+    """
+    if len(first) < 2 or len(second) < 2:
+        return None
+    first_mean, first_variance = _mean_and_variance(first)
+    second_mean, second_variance = _mean_and_variance(second)
+    first_error = first_variance / len(first)
+    second_error = second_variance / len(second)
+    if first_error + second_error == 0:
+        return 1.0 if first_mean == second_mean else 0.0
+
+    t = (first_mean - second_mean) / math.sqrt(first_error + second_error)
+    degrees_of_freedom = (first_error + second_error) ** 2 / (
+        first_error ** 2 / (len(first) - 1) + second_error ** 2 / (len(second) - 1))
+    return regularized_incomplete_beta(degrees_of_freedom / 2, 0.5,
+                                       degrees_of_freedom / (degrees_of_freedom + t * t))
+
+
+def mann_whitney_u_test(first, second):
+    """
+    Two-sided Mann-Whitney U test, using the normal approximation with a tie correction.
+
+    :param first: First sample.
+    :param second: Second sample.
+    :return: p-value of the test, or None if either sample is empty.
+    """
+    n_first = len(first)
+    n_second = len(second)
+    if not n_first or not n_second:
+        return None
+
+    labelled = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+    n = len(labelled)
+    first_rank_sum = 0.0
+    tie_correction = 0.0
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and labelled[end + 1][0] == labelled[start][0]:
+            end += 1
+        tied = end - start + 1
+        average_rank = (start + end) / 2 + 1
+        first_rank_sum += average_rank * sum(1 for _, group in labelled[start:end + 1]
+                                             if group == 0)
+        tie_correction += tied ** 3 - tied
+        start = end + 1
+
+    u = first_rank_sum - n_first * (n_first + 1) / 2
+    mean_u = n_first * n_second / 2
+    variance_u = n_first * n_second / 12 * ((n + 1) - tie_correction / (n * (n - 1)))
+    if variance_u <= 0:
+        return 1.0
+    z = (abs(u - mean_u) - 0.5) / math.sqrt(variance_u)
+    return min(1.0, 2 * (1 - normal_cdf(max(z, 0.0))))
+
+
+def welch_t_tests(first, second):
+    """
+    Two-sided Welch's t-tests between each row of two arrays, requires numpy and scipy.
+
+    :param first: 2D numpy array with a first sample of at least two values in each row.
+    :param second: 2D numpy array with a second sample of at least two values in each row.
+    :return: numpy array of the p-value of the test for each row.
+    """
+    import numpy
+    from scipy import special
+
+    first_mean = first.mean(axis=1)
+    second_mean = second.mean(axis=1)
+    first_error = first.var(axis=1, ddof=1) / first.shape[1]
+    second_error = second.var(axis=1, ddof=1) / second.shape[1]
+    error = first_error + second_error
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        t = (first_mean - second_mean) / numpy.sqrt(error)
+        degrees_of_freedom = error ** 2 / (first_error ** 2 / (first.shape[1] - 1) +
+                                           second_error ** 2 / (second.shape[1] - 1))
+        p_values = special.betainc(degrees_of_freedom / 2, 0.5,
+                                   degrees_of_freedom / (degrees_of_freedom + t * t))
+    return numpy.where(error == 0, (first_mean == second_mean).astype(float), p_values)
+
+
+def mann_whitney_u_tests(first, second):
+    """
+    Two-sided Mann-Whitney U tests between each row of two arrays, requires numpy and scipy.
+
+    The same normal approximation with a tie correction as mann_whitney_u_test is used.
+
+    :param first: 2D numpy array with a non empty first sample in each row.
+    :param second: 2D numpy array with a non empty second sample in each row.
+    :return: numpy array of the p-value of the test for each row.
+    """
+    import numpy
+    from scipy import special
+
+    rows, n_first = first.shape
+    n_second = second.shape[1]
+    n = n_first + n_second
+    combined = numpy.concatenate([first, second], axis=1)
+    order = numpy.argsort(combined, axis=1, kind='mergesort')
+    ordered = numpy.take_along_axis(combined, order, axis=1)
+
+    # Number the runs of tied values in each row and count the values in every run, the values
+    # of a run all get the average of the ranks the run covers.
+    new_run = numpy.ones(ordered.shape, dtype=bool)
+    new_run[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    run = numpy.cumsum(new_run, axis=1) - 1
+    run_in_row = run + n * numpy.arange(rows)[:, numpy.newaxis]
+    counts = numpy.bincount(run_in_row.ravel(), minlength=rows * n).reshape(rows, n)
+    average_rank = numpy.cumsum(counts, axis=1) - counts + (counts + 1) / 2
+    ranks = numpy.take_along_axis(average_rank, run, axis=1)
+    first_rank_sum = numpy.where(order < n_first, ranks, 0).sum(axis=1)
+    tie_correction = (counts ** 3 - counts).sum(axis=1)
+
+    u = first_rank_sum - n_first * (n_first + 1) / 2
+    mean_u = n_first * n_second / 2
+    variance_u = n_first * n_second / 12 * ((n + 1) - tie_correction / (n * (n - 1)))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        z = (numpy.abs(u - mean_u) - 0.5) / numpy.sqrt(variance_u)
+        p_values = numpy.minimum(1.0, 2 * (1 - special.ndtr(numpy.maximum(z, 0.0))))
+    return numpy.where(variance_u <= 0, 1.0, p_values)
@@ -27,6 +27,7 @@ class PerformanceTestRun(_BaseEvergreenObject):
     def __init__(self, test_result, api):
         """Create an instance of a test run."""
         super(PerformanceTestRun, self).__init__(test_result, api)
+        self._test_results = None
 
     @property
     def start(self):
@@ -46,9 +47,19 @@ class PerformanceTestRun(_BaseEvergreenObject):
 
     @property
     def test_results(self):
-        """Get the performance test results for this run."""
-        return [PerformanceTestResult(item, self._api)
-                for item in _format_performance_results(self.json['results'])]
+        """
+        Get the performance test results for this run.
+
+        The results are formatted the first time they are accessed and reused after that, each
+        call returns a new list of them.
+
+        :return: List of performance test results.
+        """
+        if self._test_results is None:
+            self._test_results = tuple(
+                PerformanceTestResult(item, self._api)
+                for item in _format_performance_results(self.json['results']))
+        return list(self._test_results)
 
 
 class PerformanceTestBatch(_BaseEvergreenObject):
@@ -62,10 +73,22 @@ class PerformanceTestBatch(_BaseEvergreenObject):
         """Create an instance of a batch of tests"""
         super(PerformanceTestBatch, self).__init__(json, api)
         self.parent = parent
+        self._test_runs = None
 
     @property
     def test_runs(self):
-        return [PerformanceTestRun(item, self._api) for item in self.json['results']]
+        """
+        Get the test runs in this batch.
+
+        The runs are created the first time they are accessed and reused after that, so the
+        results of each run are only formatted once. Each call returns a new list of them.
+
+        :return: List of performance test runs.
+        """
+        if self._test_runs is None:
+            self._test_runs = tuple(
+                PerformanceTestRun(item, self._api) for item in self.json['results'])
+        return list(self._test_runs)
 
     def test_runs_matching(self, tests):
         return [item for item in self.test_runs if
@@ -88,10 +111,18 @@ class PerformanceData(_BaseEvergreenObject):
     def __init__(self, json, api):
         """Create an instance of performance data"""
         super(PerformanceData, self).__init__(json, api)
+        self._test_batch = None
 
     @property
     def test_batch(self):
-        return PerformanceTestBatch(self.json['data'], self._api, self)
+        """
+        Get the batch of tests in this performance data.
+
+        :return: PerformanceTestBatch, created the first time it is accessed.
+        """
+        if self._test_batch is None:
+            self._test_batch = PerformanceTestBatch(self.json['data'], self._api, self)
+        return self._test_batch
 
     def __repr__(self):
         """
@@ -251,19 +282,16 @@ def _format_performance_results(results):
     :param dict results: All the test results from the raw data file from Evergreen.
     :return: A list of PerformanceTestResults with test results organized by thread level.
     """
-    # Sort as integers
-    thread_levels = sorted(int(key) for key in results.keys() if key.isdigit())
-    # Cast back to string
-    thread_levels = [str(entry) for entry in thread_levels]
+    # Sort as integers, keeping the original string keys.
+    thread_levels = sorted((key for key in results.keys() if key.isdigit()), key=int)
     performance_results = []
     maxima = {}
 
     for thread_level in thread_levels:
         thread_results = results[thread_level]
-        measurement_names = [key for key in thread_results.keys() if 'values' not in key]
-        for measurement in measurement_names:
-            if measurement not in maxima:
-                maxima[measurement] = None
+        for measurement in thread_results:
+            if 'values' in measurement:
+                continue
             formatted = {
                 'thread_level': thread_level,
                 'mean_value': thread_results[measurement],
@@ -272,13 +300,16 @@ def _format_performance_results(results):
             }
             performance_results.append(formatted)
 
-            if maxima[measurement] is None or \
+            # Only remember the largest result, it is copied once all thread levels are seen.
+            if measurement not in maxima or \
                     maxima[measurement]['mean_value'] < formatted['mean_value']:
-                max_copy = copy(formatted)
-                max_copy['thread_level'] = 'max'
-                maxima[measurement] = max_copy
+                maxima[measurement] = formatted
 
-    return performance_results + list(maxima.values())
+    for formatted in maxima.values():
+        max_copy = copy(formatted)
+        max_copy['thread_level'] = 'max'
+        performance_results.append(max_copy)
+    return performance_results
 
 
 def _is_run_matching(test_run, tests):
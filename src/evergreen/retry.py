@@ -0,0 +1,201 @@
+# -*- encoding: utf-8 -*-
+"""Policies for retrying failed calls to the evergreen api."""
+from __future__ import absolute_import
+from __future__ import division
+
+from email.utils import mktime_tz, parsedate_tz
+import random
+import threading
+import time
+
+import requests
+
+from evergreen.log import get_logger
+
+LOGGER = get_logger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_START_WAIT_SEC = 2
+DEFAULT_MAX_WAIT_SEC = 5
+DEFAULT_MAX_RETRY_AFTER_SEC = 60
+DEFAULT_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+DEFAULT_BUDGET_RATIO = 0.2
+DEFAULT_BUDGET_BURST = 10
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse the value of a Retry-After header.
+
+    :param value: Value of the header, either a number of seconds or an HTTP date.
+    :param now: Current unix time, defaults to the time now.
+    :return: Number of seconds to wait, or None if the value could not be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, mktime_tz(parsed) - now)
+
+
+class RetryBudget(object):
+    """
+    Limit retries to a fraction of the calls made by a client.
+
+    Every call deposits `ratio` of a retry into the budget and every retry withdraws a whole one,
+    so over time at most `ratio` retries are made per call. The budget starts with, and can save
+    up to, `burst` retries. This stops retries from multiplying the load on a server that is
+    already failing.
+    """
+
+    def __init__(self, ratio=DEFAULT_BUDGET_RATIO, burst=DEFAULT_BUDGET_BURST):
+        """
+        Create a retry budget.
+
+        :param ratio: Number of retries allowed per call.
+        :param burst: Number of retries that can be saved up.
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self._balance = float(burst)
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Replace the lock, which another thread may have held when the process forked."""
+        self._lock = threading.Lock()
+
+    @property
+    def balance(self):
+        """Get the number of retries currently available."""
+        return self._balance
+
+    def deposit(self):
+        """Record a call being made."""
+        with self._lock:
+            self._balance = min(self.burst, self._balance + self.ratio)
+
+    def withdraw(self):
+        """
+        Take a retry from the budget.
+
+        :return: True if a retry was available.
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class RetryPolicy(object):
+    """
+    Policy for retrying calls to the evergreen api.
+
+    Only failures that might succeed on another attempt are retried: connection errors,
+    timeouts and responses with one of the retry statuses. Client errors like a 404 fail right
+    away. Waits between attempts use exponential backoff with full jitter, unless the server
+    sends a Retry-After header, in which case that is honored. All the calls made by a client
+    share a single retry budget. A call that fails after running out of attempts or budget raises
+    a tenacity RetryError. The evergreen api calls made by this client are all GETs, which
+    are idempotent, so they are always safe to retry.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, start_wait=DEFAULT_START_WAIT_SEC,
+                 max_wait=DEFAULT_MAX_WAIT_SEC, max_retry_after=DEFAULT_MAX_RETRY_AFTER_SEC,
+                 retry_statuses=DEFAULT_RETRY_STATUSES, budget=None, sleep=time.sleep):
+        """
+        Create a retry policy.
+
+        :param max_attempts: Maximum number of attempts for each call.
+        :param start_wait: Maximum wait before the first retry, doubled for every retry after.
+        :param max_wait: Largest maximum wait between attempts.
+        :param max_retry_after: Longest Retry-After that will be honored.
+        :param retry_statuses: HTTP status codes that should be retried.
+        :param budget: RetryBudget shared by all calls, defaults to a new budget.
+        :param sleep: Function to wait for a number of seconds.
+        """
+        self.max_attempts = max_attempts
+        self.start_wait = start_wait
+        self.max_wait = max_wait
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget if budget is not None else RetryBudget()
+        self._sleep = sleep
+
+    def is_retryable(self, exception):
+        """
+        Determine if a call that failed with the given exception should be tried again.
+
+        :param exception: Exception the call failed with.
+        :return: True if the call might succeed on another attempt.
+        """
+        if isinstance(exception, RETRYABLE_EXCEPTIONS):
+            return True
+        if isinstance(exception, requests.exceptions.HTTPError):
+            # Without a response there is no way to tell the failure is permanent.
+            response = exception.response
+            return response is None or response.status_code in self.retry_statuses
+        return False
+
+    def wait_time(self, attempt_number, exception=None):
+        """
+        Get the number of seconds to wait before the next attempt.
+
+        :param attempt_number: Number of the attempt that just failed, starting at 1.
+        :param exception: Exception the attempt failed with.
+        :return: Number of seconds to wait.
+        """
+        response = getattr(exception, 'response', None)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_wait, self.start_wait * 2 ** (attempt_number - 1)))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call a function, retrying it according to this policy.
+
+        :param fn: Function to call.
+        :param args: Positional arguments to pass to fn.
+        :param kwargs: Keyword arguments to pass to fn.
+        :return: Result of calling fn.
+        """
+        from tenacity import Retrying
+
+        self.budget.deposit()
+        retrying = Retrying(retry=self._should_retry, stop=self._should_stop, wait=self._wait,
+                            sleep=self._sleep, before_sleep=self._log_retry)
+        return retrying.wraps(fn)(*args, **kwargs)
+
+    def _should_retry(self, retry_state):
+        """Determine if the attempt described by retry_state should be retried."""
+        if not retry_state.outcome.failed:
+            return False
+        return self.is_retryable(retry_state.outcome.exception())
+
+    def _should_stop(self, retry_state):
+        """Determine if a retryable attempt described by retry_state should be the last one."""
+        # The budget is only spent on attempts that are actually retried.
+        return retry_state.attempt_number >= self.max_attempts or not self.budget.withdraw()
+
+    def _wait(self, retry_state):
+        """Get the number of seconds to wait after the attempt described by retry_state."""
+        return self.wait_time(retry_state.attempt_number, retry_state.outcome.exception())
+
+    @staticmethod
+    def _log_retry(retry_state):
+        """Log that an attempt is about to be retried."""
+        LOGGER.warning('Retrying failed call.', attempt=retry_state.attempt_number,
+                       error=str(retry_state.outcome.exception()))
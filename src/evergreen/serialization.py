@@ -0,0 +1,159 @@
+# -*- encoding: utf-8 -*-
+"""
+Encode and decode json and yaml with the fastest library that is installed.
+
+orjson and then ujson are used for json if they are installed, falling back to the json module
+of the standard library. The libyaml based dumper is used for yaml if PyYAML was built with it.
+The json backend can be chosen with the `EVERGREEN_JSON_BACKEND` environment variable, for
+example setting it to `json` always uses the standard library. Pretty json is always written by
+the standard library, so output meant to be read is the same whichever backend is installed.
+"""
+from __future__ import absolute_import
+
+from collections import namedtuple
+import json
+import os
+
+try:
+    from json.decoder import JSONDecodeError
+except ImportError:
+    JSONDecodeError = ValueError  # JSONDecodeError doesn't exist in python 2, ValueError is used.
+
+JSON_BACKEND_ENV = 'EVERGREEN_JSON_BACKEND'
+STDLIB_JSON = 'json'
+PRETTY_INDENT = 4
+
+JsonBackend = namedtuple('JsonBackend', ['name', 'loads', 'dumps'])
+
+
+def _orjson_backend():
+    """Create a backend using orjson, whose decode errors are already JSONDecodeErrors."""
+    import orjson
+
+    def dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    return JsonBackend('orjson', orjson.loads, dumps)
+
+
+def _ujson_backend():
+    """Create a backend using ujson."""
+    import ujson
+
+    def loads(data):
+        try:
+            return ujson.loads(data)
+        except ValueError as err:
+            raise JSONDecodeError(str(err), '', 0)
+
+    def dumps(data):
+        return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False)
+
+    return JsonBackend('ujson', loads, dumps)
+
+
+def _stdlib_backend():
+    """Create a backend using the json module of the standard library."""
+    return JsonBackend(STDLIB_JSON, json.loads, json.dumps)
+
+
+_JSON_BACKENDS = [
+    ('orjson', _orjson_backend),
+    ('ujson', _ujson_backend),
+    (STDLIB_JSON, _stdlib_backend),
+]
+_json_backend = None
+
+
+def available_json_backends():
+    """
+    Get the names of the json backends that are installed, fastest first.
+
+    :return: List of json backend names.
+    """
+    available = []
+    for name, create_backend in _JSON_BACKENDS:
+        try:
+            create_backend()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def create_json_backend(name=None):
+    """
+    Create a json backend.
+
+    :param name: Name of backend to create, the fastest installed backend is used if None.
+    :return: JsonBackend.
+    """
+    for backend_name, create_backend in _JSON_BACKENDS:
+        if name and name != backend_name:
+            continue
+        try:
+            return create_backend()
+        except ImportError:
+            if name:
+                raise
+    raise ValueError('Unknown json backend: {}'.format(name))
+
+
+def json_backend():
+    """
+    Get the json backend in use, choosing it on first use.
+
+    :return: JsonBackend.
+    """
+    global _json_backend
+    if _json_backend is None:
+        _json_backend = create_json_backend(os.environ.get(JSON_BACKEND_ENV))
+    return _json_backend
+
+
+def use_json_backend(name=None):
+    """
+    Change the json backend in use.
+
+    :param name: Name of backend to use, the fastest installed backend is used if None.
+    :return: JsonBackend now in use.
+    """
+    global _json_backend
+    _json_backend = create_json_backend(name)
+    return _json_backend
+
+
+def loads(data):
+    """
+    Decode json.
+
+    :param data: json document as bytes or text.
+    :return: Decoded data.
+    """
+    return json_backend().loads(data)
+
+
+def dumps(data, pretty=False):
+    """
+    Encode data as json.
+
+    :param data: Data to encode.
+    :param pretty: Indent the json to make it readable, using the standard library.
+    :return: json document as text.
+    """
+    if pretty:
+        return json.dumps(data, indent=PRETTY_INDENT)
+    return json_backend().dumps(data)
+
+
+def yaml_dump(data):
+    """
+    Encode data as yaml, using the libyaml dumper if it is available.
+
+    :param data: Data to encode.
+    :return: yaml document as text.
+    """
+    import yaml
+
+    dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    return yaml.dump(data, Dumper=dumper)
@@ -4,6 +4,9 @@ from __future__ import absolute_import
 
 from evergreen.base import _BaseEvergreenObject, evg_attrib, evg_date_attrib
 
+_COUNT_FIELDS = ('num_pass', 'num_fail')
+_AVERAGE_FIELDS = ('avg_duration_pass',)
+
 
 class TestStats(_BaseEvergreenObject):
     """Representation of an Evergreen test stats object."""
@@ -46,3 +49,35 @@ class TaskStats(_BaseEvergreenObject):
         :param json: json version of object.
         """
         super(TaskStats, self).__init__(json, api)
+
+
+def merge_stats(stats_list):
+    """
+    Merge stats json that describe the same test or task over the same dates.
+
+    Counts are summed and average durations are recomputed, weighted by the number of passes.
+    The order in which distinct stats are first seen is preserved.
+
+    :param stats_list: Iterable of stats json to merge.
+    :return: List of merged stats json.
+    """
+    merged = {}
+    for stats in stats_list:
+        key = tuple(sorted((field, value) for field, value in stats.items()
+                           if field not in _COUNT_FIELDS and field not in _AVERAGE_FIELDS))
+        if key not in merged:
+            merged[key] = dict(stats)
+            continue
+
+        existing = merged[key]
+        existing_passes = existing.get('num_pass') or 0
+        new_passes = stats.get('num_pass') or 0
+        for field in _AVERAGE_FIELDS:
+            if existing_passes + new_passes:
+                existing[field] = ((existing.get(field) or 0) * existing_passes +
+                                   (stats.get(field) or 0) * new_passes) / \
+                    (existing_passes + new_passes)
+        for field in _COUNT_FIELDS:
+            existing[field] = (existing.get(field) or 0) + (stats.get(field) or 0)
+
+    return list(merged.values())
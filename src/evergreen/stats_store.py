@@ -0,0 +1,279 @@
+# -*- encoding: utf-8 -*-
+"""Local store of evergreen daily stats history."""
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+import sqlite3
+import threading
+
+from evergreen.serialization import dumps, loads
+from evergreen.stats import TestStats, TaskStats
+from evergreen.util import as_date, EVG_DATE_FORMAT
+
+TEST_STATS_KIND = 'test'
+TASK_STATS_KIND = 'task'
+
+# Bump when the tables change, stores with an older schema are dropped and fetched again.
+SCHEMA_VERSION = 1
+DEFAULT_FINALIZED_AFTER_DAYS = 2
+
+# The columns that can be filtered on are stored next to the full json of each stats entry.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_stats (
+    project TEXT NOT NULL,
+    requesters TEXT NOT NULL,
+    variant TEXT,
+    task_name TEXT,
+    test_file TEXT,
+    distro TEXT,
+    date TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_stats_idx
+    ON test_stats (project, requesters, variant, task_name, test_file, date);
+CREATE INDEX IF NOT EXISTS test_stats_date_idx ON test_stats (project, requesters, date);
+
+CREATE TABLE IF NOT EXISTS task_stats (
+    project TEXT NOT NULL,
+    requesters TEXT NOT NULL,
+    variant TEXT,
+    task_name TEXT,
+    distro TEXT,
+    date TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_stats_idx
+    ON task_stats (project, requesters, variant, task_name, date);
+CREATE INDEX IF NOT EXISTS task_stats_date_idx ON task_stats (project, requesters, date);
+
+CREATE TABLE IF NOT EXISTS fetched_days (
+    kind TEXT NOT NULL,
+    project TEXT NOT NULL,
+    requesters TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (kind, project, requesters, date)
+);
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS test_stats;
+DROP TABLE IF EXISTS task_stats;
+DROP TABLE IF EXISTS fetched_days;
+"""
+
+_TABLES = {
+    TEST_STATS_KIND: ('test_stats', ('variant', 'task_name', 'test_file', 'distro', 'date')),
+    TASK_STATS_KIND: ('task_stats', ('variant', 'task_name', 'distro', 'date')),
+}
+
+
+def _days_between(after_date, before_date):
+    """Get every day from after_date up to, but not including, before_date."""
+    day = after_date
+    while day < before_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def _contiguous_ranges(days):
+    """Group sorted days into (first_day, day_after_last) ranges of consecutive days."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return ranges
+
+
+def _matches(stats, filters):
+    """Determine if the given stats json matches the filters."""
+    return all(not values or stats.get(column) in values for column, values in filters.items())
+
+
+class StatsStore(object):
+    """
+    Local store of daily test and task stats.
+
+    Stats for a day stop changing some time after the day is over, so the store only asks
+    evergreen for finalized days it has not seen before. Evergreen aggregates the stats with a
+    lag and tasks can finish or be restarted after the day they were created, so the last
+    `finalized_after_days` days before the current one (UTC) are treated like the current day:
+    they are always queried from evergreen and never stored. Results are reported per day,
+    grouped by test, task, variant and distro, with the full json returned by evergreen.
+    """
+
+    def __init__(self, api, path=':memory:', finalized_after_days=DEFAULT_FINALIZED_AFTER_DAYS):
+        """
+        Create a stats store.
+
+        :param api: Evergreen api to fetch missing stats with.
+        :param path: Path of the sqlite database to store stats in.
+        :param finalized_after_days: Number of days before the current day whose stats may
+                                     still change.
+        """
+        self._api = api
+        self.path = path
+        self.finalized_after_days = finalized_after_days
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+
+    def _connect(self):
+        """Open the database, creating or replacing the tables if needed."""
+        # Queries are serialized by the lock, so the connection can be used by any thread.
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript(_DROP_SCHEMA)
+            connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def after_fork(self):
+        """Reopen a database file inherited from the parent process, and replace the lock."""
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            self._connection = self._connect()
+
+    def close(self):
+        """Close the underlying database."""
+        self._connection.close()
+
+    def test_stats_by_project(self, project_id, after_date, before_date, requesters=None,
+                              tests=None, tasks=None, variants=None, distros=None):
+        """
+        Get daily test stats by project id.
+
+        :param project_id: Id of project to query for.
+        :param after_date: Collect stats on or after this date.
+        :param before_date: Collect stats before this date.
+        :param requesters: Filter by requesters (mainline, patch, trigger, or adhoc).
+        :param tests: Only include specified tests.
+        :param tasks: Only include specified tasks.
+        :param variants: Only include specified variants.
+        :param distros: Only include specified distros.
+        :return: List of test stats.
+        """
+        filters = {'test_file': tests, 'task_name': tasks, 'variant': variants,
+                   'distro': distros}
+        return [TestStats(json, self._api) for json in
+                self._query(TEST_STATS_KIND, project_id, after_date, before_date, requesters,
+                            filters)]
+
+    def task_stats_by_project(self, project_id, after_date, before_date, requesters=None,
+                              tasks=None, variants=None, distros=None):
+        """
+        Get daily task stats by project id.
+
+        :param project_id: Id of project to query for.
+        :param after_date: Collect stats on or after this date.
+        :param before_date: Collect stats before this date.
+        :param requesters: Filter by requesters (mainline, patch, trigger, or adhoc).
+        :param tasks: Only include specified tasks.
+        :param variants: Only include specified variants.
+        :param distros: Only include specified distros.
+        :return: List of task stats.
+        """
+        filters = {'task_name': tasks, 'variant': variants, 'distro': distros}
+        return [TaskStats(json, self._api) for json in
+                self._query(TASK_STATS_KIND, project_id, after_date, before_date, requesters,
+                            filters)]
+
+    def _query(self, kind, project_id, after_date, before_date, requesters, filters):
+        """
+        Fill in any missing days and get the stats for the given date range.
+
+        :param kind: Kind of stats to query.
+        :param project_id: Id of project to query for.
+        :param after_date: Collect stats on or after this date.
+        :param before_date: Collect stats before this date.
+        :param requesters: Filter by requesters.
+        :param filters: Dictionary of column to list of values to filter on.
+        :return: List of stats json.
+        """
+        after_date = as_date(after_date)
+        before_date = as_date(before_date)
+        requesters_key = ','.join(sorted(requesters)) if requesters else ''
+        finalized_before = min(before_date, datetime.utcnow().date() -
+                               timedelta(days=self.finalized_after_days))
+        with self._lock:
+            results = self._query_finalized(kind, project_id, requesters_key, after_date,
+                                            finalized_before, requesters, filters)
+        if finalized_before < before_date:
+            unfinalized = self._fetch(kind, project_id, max(after_date, finalized_before),
+                                      before_date, requesters)
+            results.extend(stats for stats in unfinalized if _matches(stats, filters))
+        return results
+
+    def _query_finalized(self, kind, project_id, requesters_key, after_date, before_date,
+                         requesters, filters):
+        """
+        Fetch the finalized days that have not been stored yet and read the stored stats.
+
+        :return: List of stored stats json for the date range.
+        """
+        missing_days = self._missing_days(kind, project_id, requesters_key, after_date,
+                                          before_date)
+        for range_start, range_end in _contiguous_ranges(missing_days):
+            stats = self._fetch(kind, project_id, range_start, range_end, requesters)
+            self._insert(kind, project_id, requesters_key, stats)
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO fetched_days VALUES (?, ?, ?, ?)',
+                [(kind, project_id, requesters_key, day.strftime(EVG_DATE_FORMAT))
+                 for day in _days_between(range_start, range_end)])
+        self._connection.commit()
+
+        return self._select(kind, project_id, requesters_key, after_date, before_date,
+                            filters)
+
+    def _missing_days(self, kind, project_id, requesters_key, after_date, before_date):
+        """Get the days in the given range that have not been fetched yet."""
+        cursor = self._connection.execute(
+            'SELECT date FROM fetched_days WHERE kind = ? AND project = ? AND requesters = ? '
+            'AND date >= ? AND date < ?',
+            (kind, project_id, requesters_key, after_date.strftime(EVG_DATE_FORMAT),
+             before_date.strftime(EVG_DATE_FORMAT)))
+        fetched = {row[0] for row in cursor}
+        return [day for day in _days_between(after_date, before_date)
+                if day.strftime(EVG_DATE_FORMAT) not in fetched]
+
+    def _fetch(self, kind, project_id, after_date, before_date, requesters):
+        """Get daily stats json for the given date range from evergreen."""
+        after = after_date.strftime(EVG_DATE_FORMAT)
+        before = before_date.strftime(EVG_DATE_FORMAT)
+        if kind == TEST_STATS_KIND:
+            stats = self._api.test_stats_by_project(project_id, after, before, group_num_days=1,
+                                                    requesters=requesters,
+                                                    group_by='test_task_variant_distro')
+        else:
+            stats = self._api.task_stats_by_project(project_id, after, before, group_num_days=1,
+                                                    requesters=requesters,
+                                                    group_by='task_variant_distro')
+        return [stat.json for stat in stats]
+
+    def _insert(self, kind, project_id, requesters_key, stats):
+        """Save the given stats json."""
+        table, columns = _TABLES[kind]
+        statement = 'INSERT INTO {table} (project, requesters, {columns}, json) VALUES ' \
+            '({values})'.format(table=table, columns=', '.join(columns),
+                                values=', '.join('?' * (len(columns) + 3)))
+        self._connection.executemany(
+            statement,
+            [(project_id, requesters_key) + tuple(stat.get(column) for column in columns) +
+             (dumps(stat),) for stat in stats])
+
+    def _select(self, kind, project_id, requesters_key, after_date, before_date, filters):
+        """Read stored stats json for the given date range."""
+        table, columns = _TABLES[kind]
+        conditions = ['project = ?', 'requesters = ?', 'date >= ?', 'date < ?']
+        args = [project_id, requesters_key, after_date.strftime(EVG_DATE_FORMAT),
+                before_date.strftime(EVG_DATE_FORMAT)]
+        for column, values in filters.items():
+            if values:
+                conditions.append('{column} IN ({values})'.format(
+                    column=column, values=', '.join('?' * len(values))))
+                args.extend(values)
+        cursor = self._connection.execute(
+            'SELECT json FROM {table} WHERE {conditions} ORDER BY date'.format(
+                table=table, conditions=' AND '.join(conditions)),
+            args)
+        return [loads(row[0]) for row in cursor]
@@ -0,0 +1,254 @@
+# -*- encoding: utf-8 -*-
+"""Client side throttling of calls to the evergreen api."""
+from __future__ import absolute_import
+from __future__ import division
+
+import threading
+import time
+
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_DECREASE_FACTOR = 0.5
+DEFAULT_LATENCY_TOLERANCE = 3.0
+LATENCY_SMOOTHING = 0.1
+OVERLOAD_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket(object):
+    """
+    Token bucket rate limiter.
+
+    Tokens are added at a fixed rate up to the size of the bucket, and every call takes a token,
+    waiting for one to be added if the bucket is empty. This allows short bursts while keeping
+    the average rate of calls under the limit.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Create a token bucket.
+
+        :param rate: Number of calls allowed per second on average.
+        :param burst: Number of calls that can be made at once, defaults to the rate.
+        :param clock: Function returning the current time in seconds.
+        :param sleep: Function to wait for a number of seconds.
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Replace the lock, which another thread may have held when the process forked."""
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting until one is available.
+
+        :return: Number of seconds spent waiting.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            # Tokens are reserved ahead of time so waiting callers are served in order.
+            self._tokens -= 1
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait_time:
+            self._sleep(wait_time)
+        return wait_time
+
+
+class AdaptiveConcurrencyLimiter(object):
+    """
+    Limit the number of calls in flight, adapting the limit to how the server is coping.
+
+    The limit follows additive increase, multiplicative decrease (AIMD): every successful call
+    grows the limit so that it increases by one for each full window of calls, and every
+    overloaded call (throttling or server errors, connection failures, or a latency spike)
+    multiplies it by the decrease factor. Decreases happen at most once per window of calls so
+    that a burst of failures from the same overload only backs off once.
+    """
+
+    def __init__(self, initial_limit=DEFAULT_INITIAL_CONCURRENCY,
+                 min_limit=DEFAULT_MIN_CONCURRENCY, max_limit=DEFAULT_MAX_CONCURRENCY,
+                 decrease_factor=DEFAULT_DECREASE_FACTOR,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+        """
+        Create an adaptive concurrency limiter.
+
+        :param initial_limit: Number of calls allowed in flight to start with.
+        :param min_limit: Smallest number of calls the limit can shrink to.
+        :param max_limit: Largest number of calls the limit can grow to.
+        :param decrease_factor: Factor to multiply the limit by on overload.
+        :param latency_tolerance: Multiple of the average latency considered a latency spike.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('limits must satisfy 1 <= min_limit <= initial_limit <= max_limit')
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._calls_until_decrease = 0
+        self._average_latency = None
+        self._condition = threading.Condition()
+
+    def after_fork(self):
+        """Forget calls in flight in other threads of the parent process, keeping the limit."""
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """Get the current number of calls allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """Get the number of calls currently in flight."""
+        return self._in_flight
+
+    def acquire(self):
+        """Wait until another call is allowed in flight."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency=None, overloaded=False):
+        """
+        Record the outcome of a call and allow another call in flight.
+
+        :param latency: Number of seconds the call took, if it completed.
+        :param overloaded: True if the call showed the server was overloaded.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if latency is not None and not overloaded:
+                overloaded = self._is_latency_spike(latency)
+            if self._calls_until_decrease:
+                self._calls_until_decrease -= 1
+
+            if overloaded:
+                if not self._calls_until_decrease:
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._calls_until_decrease = self._in_flight + int(self._limit)
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def _is_latency_spike(self, latency):
+        """Update the average latency and determine if the given latency is a spike."""
+        if self._average_latency is None:
+            self._average_latency = latency
+            return False
+        is_spike = latency > self.latency_tolerance * self._average_latency
+        if not is_spike:
+            self._average_latency += LATENCY_SMOOTHING * (latency - self._average_latency)
+        return is_spike
+
+
+class _Permit(object):
+    """Permission to make a single call, recording its outcome when it is done."""
+
+    def __init__(self, throttle):
+        """
+        Create a permit.
+
+        :param throttle: Throttle the permit belongs to.
+        """
+        self._throttle = throttle
+        self.status_code = None
+        self._start_time = None
+
+    def __enter__(self):
+        """Wait for permission to make the call."""
+        self._throttle.acquire()
+        self._start_time = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Record the outcome of the call."""
+        latency = time.monotonic() - self._start_time
+        overloaded = exc_type is not None or self.status_code in OVERLOAD_STATUS_CODES
+        self._throttle.release(latency, overloaded)
+        return False
+
+
+class Throttle(object):
+    """
+    Client side throttle combining a rate limit with an adaptive concurrency limit.
+
+    Either part can be left out by passing None.
+    """
+
+    def __init__(self, rate_limiter=None, concurrency_limiter=None):
+        """
+        Create a throttle.
+
+        :param rate_limiter: TokenBucket limiting the rate of calls.
+        :param concurrency_limiter: AdaptiveConcurrencyLimiter limiting calls in flight.
+        """
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+
+    @classmethod
+    def create(cls, rate=None, burst=None, initial_concurrency=DEFAULT_INITIAL_CONCURRENCY,
+               max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """
+        Create a throttle with an adaptive concurrency limit and an optional rate limit.
+
+        :param rate: Number of calls allowed per second on average, None for no rate limit.
+        :param burst: Number of calls that can be made at once.
+        :param initial_concurrency: Number of calls allowed in flight to start with.
+        :param max_concurrency: Largest number of calls allowed in flight.
+        :return: Throttle.
+        """
+        rate_limiter = TokenBucket(rate, burst) if rate else None
+        concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=min(initial_concurrency, max_concurrency),
+            max_limit=max_concurrency)
+        return cls(rate_limiter, concurrency_limiter)
+
+    def after_fork(self):
+        """Prepare the throttle for use in a process forked after it was created."""
+        for limiter in (self.rate_limiter, self.concurrency_limiter):
+            if limiter:
+                limiter.after_fork()
+
+    def permit(self):
+        """
+        Get a context manager that holds permission to make a call while it is open.
+
+        Set `status_code` on the permit once a response is received so overloads can be
+        detected.
+
+        :return: Context manager for a single call.
+        """
+        return _Permit(self)
+
+    def acquire(self):
+        """Wait for permission to make a call."""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        if self.concurrency_limiter:
+            self.concurrency_limiter.acquire()
+
+    def release(self, latency=None, overloaded=False):
+        """
+        Record the outcome of a call.
+
+        :param latency: Number of seconds the call took.
+        :param overloaded: True if the call showed the server was overloaded.
+        """
+        if self.concurrency_limiter:
+            self.concurrency_limiter.release(latency, overloaded)
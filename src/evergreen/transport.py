@@ -0,0 +1,212 @@
+# -*- encoding: utf-8 -*-
+"""
+Transports that record and replay calls to the evergreen api.
+
+An api object makes every call through `session.get`, so a transport can be plugged in by
+replacing the session::
+
+    api.session = RecordingTransport(api.session, 'cassettes/')
+    api.session = ReplayTransport('cassettes/', latency=0.05)
+
+Recorded calls are saved in a cassette directory, one gzip compressed json file per request.
+Replaying them needs no network access, which makes benchmarks and tests deterministic.
+"""
+from __future__ import absolute_import
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from evergreen.errors.exceptions import CassetteMissException
+from evergreen.validator_cache import NOT_MODIFIED
+
+CASSETTE_EXTENSION = '.json.gz'
+# The recorded body is saved decompressed, so these headers no longer describe it.
+_DROPPED_HEADERS = frozenset(['content-encoding', 'transfer-encoding'])
+
+
+def request_url(url, params=None):
+    """
+    Get the full url of a request, with its parameters in a consistent order.
+
+    :param url: Url of request.
+    :param params: Parameters of request.
+    :return: Full url of request.
+    """
+    if params:
+        params = sorted(params.items())
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+def cassette_name(url, params=None):
+    """
+    Get the name of the cassette file for a request.
+
+    :param url: Url of request.
+    :param params: Parameters of request.
+    :return: Name of cassette file.
+    """
+    digest = hashlib.sha1(request_url(url, params).encode('utf-8')).hexdigest()
+    return digest + CASSETTE_EXTENSION
+
+
+def session_after_fork(session):
+    """
+    Prepare a session or transport inherited from the parent process for use in a forked child.
+
+    Transports with an `after_fork` method prepare themselves. The HTTP adapters of a
+    requests.Session get new connection pools built from their configuration, without closing
+    the connections of the parent. Other sessions are left as they are.
+
+    :param session: Session or transport to prepare.
+    """
+    after_fork = getattr(session, 'after_fork', None)
+    if callable(after_fork):
+        after_fork()
+    elif isinstance(session, requests.Session):
+        for adapter in session.adapters.values():
+            if isinstance(adapter, requests.adapters.HTTPAdapter):
+                # Restoring the pickled state of an adapter creates its pool manager again.
+                adapter.__setstate__(adapter.__getstate__())
+
+
+class RecordingTransport(object):
+    """Make calls with a session, saving each request and response to a cassette directory."""
+
+    def __init__(self, session, cassette_dir):
+        """
+        Create a recording transport.
+
+        :param session: Session to make calls with.
+        :param cassette_dir: Directory to save recorded calls to.
+        """
+        self.session = session
+        self.cassette_dir = cassette_dir
+        if not os.path.isdir(cassette_dir):
+            os.makedirs(cassette_dir)
+
+    @property
+    def headers(self):
+        """Get the headers sent with every call."""
+        return self.session.headers
+
+    def get(self, url, params=None, **kwargs):
+        """
+        Make a call and record it.
+
+        Streaming calls are read completely so they can be recorded. A 304 Not Modified answer
+        to a conditional call is not recorded, since it has no body and would replace the full
+        response already recorded for the call.
+
+        :param url: Url to call.
+        :param params: Parameters to pass to the call.
+        :param kwargs: Other arguments to pass to the session.
+        :return: Response to the call.
+        """
+        response = self.session.get(url=url, params=params, **kwargs)
+        if response.status_code == NOT_MODIFIED:
+            return response
+
+        cassette = {
+            'request': {'url': request_url(url, params)},
+            'response': {
+                'status_code': response.status_code,
+                'url': response.url,
+                'encoding': response.encoding,
+                'headers': {key: value for key, value in response.headers.items()
+                            if key.lower() not in _DROPPED_HEADERS},
+                'body': base64.b64encode(response.content).decode('ascii'),
+            },
+        }
+        path = os.path.join(self.cassette_dir, cassette_name(url, params))
+        with gzip.open(path, 'wb') as cassette_file:
+            cassette_file.write(json.dumps(cassette).encode('utf-8'))
+        return response
+
+    def after_fork(self):
+        """Prepare the session calls are made with for use in a forked child."""
+        session_after_fork(self.session)
+
+    def close(self):
+        """Close the session calls are made with."""
+        self.session.close()
+
+
+class ReplayTransport(object):
+    """Serve calls from a cassette directory instead of the network."""
+
+    def __init__(self, cassette_dir, latency=0.0, sleep=time.sleep):
+        """
+        Create a replay transport.
+
+        :param cassette_dir: Directory with recorded calls.
+        :param latency: Seconds to wait before returning each response, to simulate a network.
+        :param sleep: Function to wait for a number of seconds.
+        """
+        self.cassette_dir = cassette_dir
+        self.latency = latency
+        self.headers = CaseInsensitiveDict()
+        self._sleep = sleep
+        self._cassettes = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, stream=False, **kwargs):
+        """
+        Replay a recorded call.
+
+        :param url: Url to call.
+        :param params: Parameters to pass to the call.
+        :param stream: Return the body as a stream.
+        :param kwargs: Other arguments that would be passed to a session, ignored.
+        :return: Recorded response to the call.
+        """
+        recorded = self._load(url, params)
+        if self.latency:
+            self._sleep(self.latency)
+
+        body = base64.b64decode(recorded['body'])
+        response = requests.Response()
+        response.status_code = recorded['status_code']
+        response.url = recorded['url']
+        response.encoding = recorded['encoding']
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response.request = requests.Request('GET', recorded['url']).prepare()
+        if stream:
+            response.raw = io.BytesIO(body)
+        else:
+            response._content = body
+        return response
+
+    def after_fork(self):
+        """Replace the lock, which another thread may have held when the process forked."""
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the transport."""
+        with self._lock:
+            self._cassettes.clear()
+
+    def _load(self, url, params):
+        """Get the recorded response for a request, reading it from its cassette if needed."""
+        name = cassette_name(url, params)
+        with self._lock:
+            recorded = self._cassettes.get(name)
+        if recorded is not None:
+            return recorded
+
+        path = os.path.join(self.cassette_dir, name)
+        if not os.path.isfile(path):
+            raise CassetteMissException(request_url(url, params))
+        with gzip.open(path, 'rb') as cassette_file:
+            recorded = json.loads(cassette_file.read().decode('utf-8'))['response']
+        with self._lock:
+            self._cassettes[name] = recorded
+        return recorded
@@ -1,12 +1,13 @@
 """Useful utilities for interacting with Evergreen."""
-from datetime import datetime
-
-from dateutil.parser import parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+import threading
 
 EVG_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 EVG_SHORT_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 EVG_DATE_FORMAT = '%Y-%m-%d'
 EVG_DATE_INPUT_FORMAT = '"%Y-%m-%dT%H:%M:%S.000Z"'
+DEFAULT_MAX_WORKERS = 8
 
 
 def parse_evergreen_datetime(evg_date):
@@ -20,6 +21,8 @@ def parse_evergreen_datetime(evg_date):
         return None
     if type(evg_date) in [int, float]:
         return datetime.fromtimestamp(evg_date)
+
+    from dateutil.parser import parse
     return parse(evg_date)
 
 
@@ -67,6 +70,50 @@ def parse_evergreen_date(evg_date):
     return datetime.strptime(evg_date, EVG_DATE_FORMAT).date()
 
 
+def as_date(value):
+    """
+    Convert an evergreen date string, datetime or date into a date.
+
+    :param value: Value to convert, dates are returned unchanged.
+    :return: date version of value.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return parse_evergreen_date(value)
+
+
+def date_chunks(after_date, before_date, chunk_num_days, group_num_days=1):
+    """
+    Split a date range into consecutive chunks.
+
+    The chunk size is rounded up to a multiple of `group_num_days` so that groups of days
+    starting at `after_date` never span two chunks. The last chunk ends at `before_date`.
+
+    :param after_date: Start of the date range, as a date or an evergreen date string.
+    :param before_date: End of the date range, as a date or an evergreen date string.
+    :param chunk_num_days: Desired number of days in each chunk.
+    :param group_num_days: Number of days in each group of results.
+    :return: Generator of (after_date, before_date) evergreen date strings for each chunk.
+    """
+    if not isinstance(after_date, date):
+        after_date = parse_evergreen_date(after_date)
+    if not isinstance(before_date, date):
+        before_date = parse_evergreen_date(before_date)
+    group_num_days = int(group_num_days)
+    num_groups = max(1, -(-int(chunk_num_days) // group_num_days))
+    chunk_size = timedelta(days=num_groups * group_num_days)
+
+    chunk_start = after_date
+    while True:
+        chunk_end = min(chunk_start + chunk_size, before_date)
+        yield chunk_start.strftime(EVG_DATE_FORMAT), chunk_end.strftime(EVG_DATE_FORMAT)
+        if chunk_end >= before_date:
+            break
+        chunk_start = chunk_end
+
+
 def iterate_by_time_window(iterator, before, after, time_attr):
     """
     Iterate over a window of time.
@@ -92,3 +139,94 @@ def iterate_by_time_window(iterator, before, after, time_attr):
             break
 
         yield item
+
+
+def parallel_map(fn, items, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Apply a function to each item using a pool of threads.
+
+    Results are yielded as soon as they are available, so they will not necessarily be in the
+    same order as the items. If the caller stops iterating early, any work that has not started
+    yet is cancelled.
+
+    :param fn: Function to apply to each item.
+    :param items: Iterable of items to process.
+    :param max_workers: Maximum number of threads to use.
+    :return: Generator of the results of calling fn on each item.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fn, item) for item in items]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class _Flight(object):
+    """A call in flight whose result is shared with other callers."""
+
+    def __init__(self):
+        """Create a call in flight."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """
+        Wait for the call to complete.
+
+        :return: Result of the call, raising its exception if it failed.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    """
+    Coalesce concurrent identical calls into a single call.
+
+    While a call for a key is in flight, other callers for the same key wait for it and share
+    its result, or its exception, instead of making the call again. Once the call completes the
+    next caller for the key makes a new call.
+    """
+
+    def __init__(self):
+        """Create a single flight group."""
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def call(self, key, fn, *args, **kwargs):
+        """
+        Call a function unless a call for the same key is already in flight.
+
+        :param key: Hashable key identifying identical calls.
+        :param fn: Function to call.
+        :param args: Positional arguments to pass to fn.
+        :param kwargs: Keyword arguments to pass to fn.
+        :return: Result of the call.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not is_leader:
+            return flight.wait()
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as err:
+            # Interrupts are shared too, otherwise waiting callers would get None as the result.
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
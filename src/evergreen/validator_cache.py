@@ -0,0 +1,103 @@
+# -*- encoding: utf-8 -*-
+"""Cache of responses with validators for making conditional requests."""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+import threading
+
+DEFAULT_MAX_SIZE = 1000
+NOT_MODIFIED = 304
+
+
+class CachedResponse(object):
+    """A response along with the validators needed to check if it is still current."""
+
+    def __init__(self, response, etag, last_modified):
+        """
+        Create a cached response.
+
+        :param response: Response from the api server.
+        :param etag: Value of the ETag header of the response.
+        :param last_modified: Value of the Last-Modified header of the response.
+        """
+        self.response = response
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self):
+        """
+        Get the headers that ask the server to only send the response again if it has changed.
+
+        :return: Dictionary of headers.
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ValidatorCache(object):
+    """
+    Cache of the latest response for each call that returned validators.
+
+    Responses with an ETag or Last-Modified header are kept so that repeating the call can send
+    If-None-Match and If-Modified-Since. If the server answers 304 Not Modified, the cached
+    response is reused instead of downloading the body again. The least recently used responses
+    are dropped once the cache is full.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        Create a validator cache.
+
+        :param max_size: Maximum number of responses to keep.
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Replace the lock, which another thread may have held when the process forked."""
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Get the number of cached responses."""
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get the cached response for a call.
+
+        :param key: Key identifying the call.
+        :return: CachedResponse for the call, or None if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def update(self, key, response):
+        """
+        Save a response if it has validators.
+
+        :param key: Key identifying the call.
+        :param response: Successful response to the call.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = CachedResponse(response, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
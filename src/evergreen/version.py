@@ -3,9 +3,11 @@
 from __future__ import absolute_import
 
 from enum import Enum, auto
+from itertools import chain
 
 from evergreen.base import _BaseEvergreenObject, evg_attrib, evg_datetime_attrib
 from evergreen.metrics.versionmetrics import VersionMetrics
+from evergreen.util import parallel_map, DEFAULT_MAX_WORKERS
 
 
 class Requester(Enum):
@@ -125,6 +127,39 @@ class Version(_BaseEvergreenObject):
         """
         return self._api.builds_by_version(self.version_id)
 
+    def get_all_tests(self, status=None, fetch_all_executions=False,
+                      max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get the tests for every task in every build of this version.
+
+        The builds and tasks are queried concurrently and tests are returned as they arrive.
+
+        :param status: Only return tests with the given status.
+        :param fetch_all_executions: Include tests from previous executions of tasks. A test
+                                     that ran in several executions is only reported once.
+        :param max_workers: Maximum number of builds or tasks to query at once.
+        :return: Generator of tests in this version.
+        """
+        task_lists = parallel_map(lambda build: build.get_tasks(fetch_all_executions),
+                                  self.get_builds(), max_workers)
+        return self._api.tests_by_tasks(chain.from_iterable(task_lists), status=status,
+                                        fetch_all_executions=fetch_all_executions,
+                                        max_workers=max_workers)
+
+    def get_performance_data(self, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Get the 'perf.json' performance results for every task in every build of this version.
+
+        The builds and tasks are queried concurrently and results are returned as they arrive.
+        Tasks without performance results are skipped.
+
+        :param max_workers: Maximum number of builds or tasks to query at once.
+        :return: Generator of performance results in this version.
+        """
+        task_lists = parallel_map(lambda build: build.get_tasks(), self.get_builds(), max_workers)
+        return self._api.performance_results_by_tasks(chain.from_iterable(task_lists),
+                                                      max_workers=max_workers)
+
     def is_patch(self):
         """
         Determine if this version from a patch build.
@@ -1,4 +1,5 @@
 import json
+import threading
 
 import yaml
 
@@ -10,6 +11,13 @@ except ImportError:
     from mock import MagicMock
 import os
 
+try:
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+
 import pytest
 
 from evergreen.api import EvergreenApi, CachedEvergreenApi, RetryingEvergreenApi
@@ -127,7 +135,7 @@ def mocked_api_response():
     """Mocked response returned by mock_api."""
     response_mock = MagicMock()
     response_mock.status_code = 200
-    response_mock.json.return_value = [{'create_time': "2019-03-10T02:43:49.330"}]
+    response_mock.content = json.dumps([{'create_time': "2019-03-10T02:43:49.330"}]).encode()
     return response_mock
 
 
@@ -147,6 +155,7 @@ def mocked_cached_api():
     api.session = MagicMock()
     response_mock = MagicMock()
     response_mock.status_code = 200
+    response_mock.content = b'{}'
     api.session.get.return_value = response_mock
     return api
 
@@ -158,6 +167,7 @@ def mocked_retrying_api():
     api.session = MagicMock()
     response_mock = MagicMock()
     response_mock.status_code = 200
+    response_mock.content = b'{}'
     api.session.get.return_value = response_mock
     return api
 
@@ -190,3 +200,29 @@ def sample_evergreen_auth(sample_evergreen_configuration):
 @pytest.fixture(params=(list(Requester)))
 def requester_value(request):
     return request.param
+
+
+class StubHTTPServer(ThreadingMixIn, HTTPServer):
+    """Http server handling each connection in a thread, so kept alive connections never block."""
+
+    daemon_threads = True
+
+
+@pytest.fixture()
+def stub_server_factory():
+    """Return a function that starts a local http server with the given request handler."""
+    servers = []
+
+    def _start(handler_class):
+        server = StubHTTPServer(('127.0.0.1', 0), handler_class)
+        server.url = 'http://127.0.0.1:{}'.format(server.server_port)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01})
+        thread.daemon = True
+        thread.start()
+        servers.append(server)
+        return server
+
+    yield _start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -1,3 +1,5 @@
+import json
+
 try:
     from unittest.mock import MagicMock
 except ImportError:
@@ -5,16 +7,21 @@ except ImportError:
 
 from click.testing import CliRunner
 import pytest
+from requests.exceptions import HTTPError
 
 import evergreen.cli.main as under_test
+from evergreen.errors.exceptions import ActiveTaskMetricsException
 from evergreen.host import Host
 from evergreen.patch import Patch
 from evergreen.project import Project
+from evergreen.stats import TestStats as ts
+from evergreen.version import Version
 
 
 output_formats = [
     '--json',
     '--yaml',
+    '--jsonl',
     None,
 ]
 
@@ -33,7 +40,7 @@ def _create_api_mock(monkeypatch):
 
 def test_list_hosts(monkeypatch, sample_host, output_fmt):
     evg_api_mock = _create_api_mock(monkeypatch)
-    evg_api_mock.all_hosts.return_value = [Host(sample_host, None)]
+    evg_api_mock.iter_all_hosts.return_value = [Host(sample_host, None)]
 
     runner = CliRunner()
     cmd_list = [output_fmt, 'list-hosts'] if output_fmt else ['list-hosts']
@@ -57,7 +64,7 @@ def test_list_patches(monkeypatch, sample_patch, output_fmt):
 
 def test_list_projects(monkeypatch, sample_project, output_fmt):
     evg_api_mock = _create_api_mock(monkeypatch)
-    evg_api_mock.all_projects.return_value = [Project(sample_project, None) for _ in range(10)]
+    evg_api_mock.iter_all_projects.return_value = [Project(sample_project, None) for _ in range(10)]
 
     runner = CliRunner()
     cmd_list = ['list-projects']
@@ -66,3 +73,205 @@ def test_list_projects(monkeypatch, sample_project, output_fmt):
     result = runner.invoke(under_test.cli, cmd_list)
     assert result.exit_code == 0
     assert sample_project['identifier'] in result.output
+
+
+def test_list_versions(monkeypatch, sample_version, output_fmt):
+    evg_api_mock = _create_api_mock(monkeypatch)
+    evg_api_mock.versions_by_project.return_value = (Version(sample_version, None)
+                                                     for _ in range(10))
+
+    runner = CliRunner()
+    cmd_list = ['list-versions', '--project', 'project', '--limit', '5']
+    if output_fmt:
+        cmd_list = [output_fmt] + cmd_list
+    result = runner.invoke(under_test.cli, cmd_list)
+    assert result.exit_code == 0
+    assert sample_version['version_id'] in result.output
+
+
+def test_test_stats(monkeypatch, sample_test_stats, output_fmt):
+    evg_api_mock = _create_api_mock(monkeypatch)
+    evg_api_mock.iter_test_stats_by_project.return_value = [ts(sample_test_stats, None)]
+
+    runner = CliRunner()
+    cmd_list = ['test-stats', '-p', 'project', '-a', '2019-01-01', '-b', '2019-02-01']
+    if output_fmt:
+        cmd_list = [output_fmt] + cmd_list
+    result = runner.invoke(under_test.cli, cmd_list)
+    assert result.exit_code == 0
+    assert sample_test_stats['test_file'] in result.output
+
+
+class TestJsonLines(object):
+    def test_one_record_per_line(self, monkeypatch, sample_version):
+        evg_api_mock = _create_api_mock(monkeypatch)
+        evg_api_mock.versions_by_project.return_value = (Version(sample_version, None)
+                                                         for _ in range(10))
+
+        runner = CliRunner()
+        result = runner.invoke(under_test.cli,
+                               ['--jsonl', 'list-versions', '--project', 'project', '--limit', '3'])
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert len(lines) == 3
+        assert all(json.loads(line) == sample_version for line in lines)
+
+    def test_records_are_written_as_they_are_fetched(self, monkeypatch, sample_host):
+        written = []
+        monkeypatch.setattr(under_test.click, 'echo', written.append)
+
+        def hosts():
+            for i in range(3):
+                assert len(written) == i
+                yield Host(sample_host, None)
+
+        evg_api_mock = _create_api_mock(monkeypatch)
+        evg_api_mock.iter_all_hosts.return_value = hosts()
+
+        runner = CliRunner()
+        result = runner.invoke(under_test.cli, ['--jsonl', 'list-hosts'])
+
+        assert result.exit_code == 0
+        assert len(written) == 3
+
+
+def _create_metrics_mock(object_id):
+    metrics = MagicMock()
+    metrics.as_dict.return_value = {'id': object_id}
+    metrics.__str__.return_value = 'Metrics for {}'.format(object_id)
+    return metrics
+
+
+def _create_build_mock(build_id):
+    build = MagicMock(id=build_id)
+    build.get_metrics.return_value = _create_metrics_mock(build_id)
+    return build
+
+
+class TestBuildStats(object):
+    def test_single_build(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+        evg_api_mock.build_by_id.side_effect = _create_build_mock
+
+        result = CliRunner().invoke(under_test.cli, ['--json', 'build-stats', '-b', 'build_1'])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == {'id': 'build_1'}
+
+    def test_builds_from_arguments_and_stdin(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+        evg_api_mock.build_by_id.side_effect = _create_build_mock
+
+        result = CliRunner().invoke(
+            under_test.cli, ['--jsonl', 'build-stats', '-b', 'build_1', '--build-file', '-'],
+            input='build_2\n\nbuild_3\nbuild_1\n')
+
+        assert result.exit_code == 0
+        records = [json.loads(line) for line in result.output.splitlines()]
+        assert sorted(record['id'] for record in records) == ['build_1', 'build_2', 'build_3']
+        assert evg_api_mock.build_by_id.call_count == 3
+
+    def test_human_readable_batch(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+        evg_api_mock.build_by_id.side_effect = _create_build_mock
+
+        result = CliRunner().invoke(under_test.cli,
+                                    ['build-stats', '-b', 'build_1', '-b', 'build_2'])
+
+        assert result.exit_code == 0
+        assert 'Metrics for build_1' in result.output
+        assert 'Metrics for build_2' in result.output
+
+    def test_active_build_in_batch_is_skipped(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+
+        def build_by_id(build_id):
+            build = _create_build_mock(build_id)
+            if build_id == 'build_2':
+                build.get_metrics.side_effect = ActiveTaskMetricsException(MagicMock())
+            return build
+
+        evg_api_mock.build_by_id.side_effect = build_by_id
+
+        result = CliRunner().invoke(
+            under_test.cli, ['--jsonl', 'build-stats', '-b', 'build_1', '-b', 'build_2', '-b',
+                             'build_3'])
+
+        assert result.exit_code == 1
+        records = [json.loads(line) for line in result.output.splitlines()
+                   if line.startswith('{')]
+        assert sorted(record['id'] for record in records) == ['build_1', 'build_3']
+        assert 'Skipping build_2' in result.output
+
+    def test_builds_are_required(self, monkeypatch):
+        _create_api_mock(monkeypatch)
+
+        result = CliRunner().invoke(under_test.cli, ['build-stats'])
+
+        assert result.exit_code != 0
+
+
+class TestVersionStats(object):
+    def test_versions_in_project_time_window(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+        versions = [MagicMock() for _ in range(3)]
+        for i, version in enumerate(versions):
+            version.get_metrics.return_value = _create_metrics_mock('version_{}'.format(i))
+        evg_api_mock.versions_by_project_time_window.return_value = iter(versions)
+
+        result = CliRunner().invoke(under_test.cli, [
+            '--json', 'version-stats', '-p', 'project', '-a', '2019-01-01', '-b', '2019-02-01'])
+
+        assert result.exit_code == 0
+        assert len(json.loads(result.output)) == 3
+        project, before, after = evg_api_mock.versions_by_project_time_window.call_args[0]
+        assert project == 'project'
+        assert before.isoformat() == '2019-02-01T00:00:00+00:00'
+        assert after.isoformat() == '2019-01-01T00:00:00+00:00'
+
+    def test_versions_without_metrics_are_skipped(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+
+        def version_by_id(version_id):
+            version = MagicMock()
+            version.get_metrics.return_value = (None if version_id == 'created'
+                                                else _create_metrics_mock(version_id))
+            return version
+
+        evg_api_mock.version_by_id.side_effect = version_by_id
+
+        result = CliRunner().invoke(under_test.cli, [
+            '--jsonl', 'version-stats', '-v', 'version_1', '-v', 'created'])
+
+        assert result.exit_code == 0
+        assert [json.loads(line) for line in result.output.splitlines()] == [{'id': 'version_1'}]
+
+    def test_versions_that_cannot_be_fetched_are_skipped(self, monkeypatch):
+        evg_api_mock = _create_api_mock(monkeypatch)
+
+        def version_by_id(version_id):
+            if version_id == 'missing':
+                raise HTTPError('404 Client Error')
+            version = MagicMock()
+            version.get_metrics.return_value = _create_metrics_mock(version_id)
+            return version
+
+        evg_api_mock.version_by_id.side_effect = version_by_id
+
+        result = CliRunner().invoke(under_test.cli, [
+            '--jsonl', 'version-stats', '-v', 'version_1', '-v', 'missing'])
+
+        assert result.exit_code == 1
+        records = [json.loads(line) for line in result.output.splitlines()
+                   if line.startswith('{')]
+        assert records == [{'id': 'version_1'}]
+        assert 'Skipping missing: 404 Client Error' in result.output
+
+    def test_after_is_required_with_project(self, monkeypatch):
+        _create_api_mock(monkeypatch)
+
+        result = CliRunner().invoke(under_test.cli, ['version-stats', '-p', 'project'])
+
+        assert result.exit_code != 0
+        assert '--after' in result.output
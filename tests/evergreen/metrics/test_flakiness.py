@@ -0,0 +1,149 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/metrics/flakiness.py."""
+from __future__ import absolute_import
+
+from datetime import date, timedelta
+import random
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+import pytest
+
+import evergreen.metrics.flakiness as under_test
+from evergreen.stats import TestStats as ts
+
+START_DATE = date(2019, 2, 1)
+
+
+def daily_stats(num_pass_fail, test_file='test.js', task_name='task', variant='variant'):
+    return [ts({
+        'test_file': test_file,
+        'task_name': task_name,
+        'variant': variant,
+        'date': (START_DATE + timedelta(days=day)).strftime('%Y-%m-%d'),
+        'num_pass': num_pass,
+        'num_fail': num_fail,
+    }, None) for day, (num_pass, num_fail) in enumerate(num_pass_fail)]
+
+
+def create_scorer(num_days=30, **kwargs):
+    return under_test.FlakinessScorer(START_DATE, START_DATE + timedelta(days=num_days), **kwargs)
+
+
+class TestFlakinessScorer(object):
+    def test_always_passing_test_is_not_flaky(self):
+        scorer = create_scorer().add_all(daily_stats([(5, 0)] * 30))
+
+        score = next(scorer.scores())
+
+        assert score.num_pass == 150
+        assert score.num_fail == 0
+        assert score.fail_rate == 0
+        assert not score.is_flaky
+        assert not scorer.flaky_tests()
+
+    def test_intermittent_failures_are_flaky(self):
+        scorer = create_scorer().add_all(daily_stats([(9, 1)] * 30))
+
+        flaky_tests = scorer.flaky_tests()
+
+        assert len(flaky_tests) == 1
+        assert flaky_tests[0].fail_rate == pytest.approx(0.1)
+        assert flaky_tests[0].fail_rate_low < 0.1 < flaky_tests[0].fail_rate_high
+        assert flaky_tests[0].changepoint is None
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_stationary_flaky_test_stays_flaky(self, seed):
+        rng = random.Random(seed)
+        num_fails = [sum(rng.random() < 0.1 for _ in range(20)) for _ in range(90)]
+        stats = daily_stats([(20 - num_fail, num_fail) for num_fail in num_fails])
+
+        score = next(create_scorer(num_days=90).add_all(stats).scores())
+
+        assert score.is_flaky
+        assert score.changepoint is None
+
+    def test_regression_is_a_changepoint(self):
+        scorer = create_scorer().add_all(daily_stats([(10, 0)] * 20 + [(2, 8)] * 10))
+
+        score = next(scorer.scores())
+
+        assert not score.is_flaky
+        assert score.changepoint.date == START_DATE + timedelta(days=20)
+        assert score.changepoint.fail_rate_before == 0
+        assert score.changepoint.fail_rate_after == pytest.approx(0.8)
+
+    def test_tests_are_scored_separately(self):
+        stats = daily_stats([(9, 1)] * 10, variant='variant_1') + \
+            daily_stats([(10, 0)] * 10, variant='variant_2')
+
+        scores = {score.variant: score for score in create_scorer().add_all(stats).scores()}
+
+        assert scores['variant_1'].is_flaky
+        assert not scores['variant_2'].is_flaky
+
+    def test_stats_outside_window_are_ignored(self):
+        scorer = create_scorer(num_days=5).add_all(daily_stats([(1, 1)] * 10))
+
+        score = next(scorer.scores())
+
+        assert score.num_pass == 5
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_numpy_gives_same_scores(self, seed):
+        pytest.importorskip('numpy')
+        rng = random.Random(seed)
+        stats = []
+        for test in range(50):
+            fail_rate = rng.choice([0, 0.05, 0.3, 1])
+            change_day = rng.choice([None, rng.randrange(5, 55)])
+            num_pass_fail = []
+            for day in range(60):
+                if rng.random() < 0.2:
+                    num_pass_fail.append((0, 0))
+                    continue
+                rate = 0.9 if change_day is not None and day >= change_day else fail_rate
+                num_fail = sum(rng.random() < rate for _ in range(10))
+                num_pass_fail.append((10 - num_fail, num_fail))
+            stats.extend(daily_stats(num_pass_fail, test_file='test_{}.js'.format(test)))
+
+        expected = list(create_scorer(num_days=60, use_numpy=False).add_all(stats).scores())
+        scores = list(create_scorer(num_days=60, use_numpy=True).add_all(stats).scores())
+
+        assert any(score.changepoint for score in expected)
+        assert any(score.is_flaky for score in expected)
+        assert len(scores) == len(expected)
+        for score, expected_score in zip(scores, expected):
+            assert score[:5] == expected_score[:5]
+            assert score[5:8] == pytest.approx(expected_score[5:8])
+            assert score.is_flaky == expected_score.is_flaky
+            if expected_score.changepoint is None:
+                assert score.changepoint is None
+            else:
+                assert score.changepoint.date == expected_score.changepoint.date
+                assert score.changepoint[1:] == pytest.approx(expected_score.changepoint[1:])
+
+    def test_numpy_is_not_required(self, monkeypatch):
+        monkeypatch.setattr(under_test, 'optional_import', lambda name: None)
+
+        scorer = create_scorer().add_all(daily_stats([(10, 0)] * 20 + [(2, 8)] * 10))
+
+        assert next(scorer.scores()).changepoint.date == START_DATE + timedelta(days=20)
+        with pytest.raises(ImportError):
+            create_scorer(use_numpy=True)
+
+
+class TestScoreProject(object):
+    def test_stats_are_queried_daily(self):
+        mock_api = MagicMock()
+        mock_api.iter_test_stats_by_project.return_value = daily_stats([(9, 1)] * 5)
+
+        scorer = under_test.score_project(mock_api, 'project', '2019-02-01', '2019-02-06')
+
+        mock_api.iter_test_stats_by_project.assert_called_once_with(
+            'project', '2019-02-01', '2019-02-06', group_num_days=1,
+            group_by='test_task_variant')
+        assert len(scorer.flaky_tests()) == 1
@@ -0,0 +1,114 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/metrics/performance_comparison.py."""
+from __future__ import absolute_import
+
+import random
+
+import pytest
+
+import evergreen.metrics.performance_comparison as under_test
+from evergreen.performance_results import PerformanceData
+
+
+def create_performance_data(measurements):
+    thread_results = {}
+    for measurement, values in measurements.items():
+        thread_results[measurement] = sum(values) / len(values)
+        thread_results[measurement + '_values'] = values
+    return PerformanceData({
+        'data': {
+            'results': [{'name': 'test_name', 'results': {'1': thread_results}}],
+        },
+    }, None)
+
+
+def compare(base_measurements, measurements):
+    comparisons = under_test.compare_performance_data(create_performance_data(base_measurements),
+                                                      create_performance_data(measurements))
+    return {(comparison.thread_level, comparison.measurement): comparison
+            for comparison in comparisons}
+
+
+class TestComparePerformanceData(object):
+    def test_results_are_matched(self):
+        comparisons = compare({'ops_per_sec': [100, 101, 99], 'latency': [10, 10, 10]},
+                              {'ops_per_sec': [100, 101, 99], 'other': [1]})
+
+        assert set(comparisons.keys()) == {('1', 'ops_per_sec'), ('max', 'ops_per_sec')}
+
+    def test_no_change(self):
+        comparison = compare({'ops_per_sec': [100, 101, 99, 100, 100]},
+                             {'ops_per_sec': [100, 100, 101, 99, 100]})[('1', 'ops_per_sec')]
+
+        assert comparison.percent_change == pytest.approx(0)
+        assert comparison.verdict == under_test.VERDICT_NO_CHANGE
+
+    def test_regression_in_throughput(self):
+        comparison = compare({'ops_per_sec': [100, 101, 99, 100, 100]},
+                             {'ops_per_sec': [80, 81, 79, 80, 80]})[('1', 'ops_per_sec')]
+
+        assert comparison.percent_change == pytest.approx(-20)
+        assert comparison.welch_p_value < 0.05
+        assert comparison.mann_whitney_p_value < 0.05
+        assert comparison.verdict == under_test.VERDICT_REGRESSION
+
+    def test_improvement_in_latency(self):
+        comparison = compare({'latency': [100, 101, 99, 100, 100]},
+                             {'latency': [80, 81, 79, 80, 80]})[('1', 'latency')]
+
+        assert comparison.verdict == under_test.VERDICT_IMPROVEMENT
+
+    def test_changes_within_noise_are_not_reported(self):
+        comparison = compare({'ops_per_sec': [60, 140, 80, 120, 100]},
+                             {'ops_per_sec': [80, 81, 79, 80, 80]})[('1', 'ops_per_sec')]
+
+        assert comparison.noise_percent > 20
+        assert comparison.verdict == under_test.VERDICT_NO_CHANGE
+
+    def test_single_values_are_inconclusive(self):
+        comparison = compare({'ops_per_sec': [100]}, {'ops_per_sec': [80]})[('1', 'ops_per_sec')]
+
+        assert comparison.welch_p_value is None
+        assert comparison.verdict == under_test.VERDICT_INCONCLUSIVE
+
+
+class TestVectorizedComparison(object):
+    def test_numpy_matches_python(self):
+        pytest.importorskip('numpy')
+        pytest.importorskip('scipy')
+        rng = random.Random(1)
+        base_measurements = {}
+        measurements = {}
+        for measurement in range(30):
+            n_values = rng.choice([1, 2, 5])
+            base_measurements['ops_{}'.format(measurement)] = [
+                rng.choice([0, 90, 100, 110]) for _ in range(n_values)]
+            measurements['ops_{}'.format(measurement)] = [
+                rng.choice([0, 80, 100, 120]) for _ in range(rng.choice([n_values, 3]))]
+        base = create_performance_data(base_measurements)
+        performance_data = create_performance_data(measurements)
+
+        expected = under_test.compare_performance_data(base, performance_data, use_numpy=False)
+        comparisons = under_test.compare_performance_data(base, performance_data, use_numpy=True)
+
+        assert len(comparisons) == len(expected) == 60
+        for comparison, expected_comparison in zip(comparisons, expected):
+            assert comparison._replace(welch_p_value=None, mann_whitney_p_value=None,
+                                       noise_percent=None) == \
+                expected_comparison._replace(welch_p_value=None, mann_whitney_p_value=None,
+                                             noise_percent=None)
+            assert comparison.noise_percent == pytest.approx(expected_comparison.noise_percent)
+            assert comparison.welch_p_value == pytest.approx(expected_comparison.welch_p_value)
+            assert comparison.mann_whitney_p_value == \
+                pytest.approx(expected_comparison.mann_whitney_p_value)
+
+    def test_numpy_is_not_required(self, monkeypatch):
+        monkeypatch.setattr(under_test, 'optional_import', lambda name: None)
+        base = create_performance_data({'ops_per_sec': [100, 101, 99, 100, 100]})
+        performance_data = create_performance_data({'ops_per_sec': [80, 81, 79, 80, 80]})
+
+        comparisons = under_test.compare_performance_data(base, performance_data)
+
+        assert comparisons[0].verdict == under_test.VERDICT_REGRESSION
+        with pytest.raises(ImportError):
+            under_test.compare_performance_data(base, performance_data, use_numpy=True)
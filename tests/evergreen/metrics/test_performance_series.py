@@ -0,0 +1,89 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/metrics/performance_series.py."""
+from __future__ import absolute_import
+
+import random
+
+import pytest
+
+import evergreen.metrics.performance_series as under_test
+from evergreen.performance_results import PerformanceData
+
+
+def create_performance_data(order, ops_per_sec, latency):
+    return PerformanceData({
+        'order': order,
+        'revision': 'revision_{}'.format(order),
+        'data': {
+            'results': [{
+                'name': 'test_name',
+                'results': {
+                    '1': {
+                        'ops_per_sec': ops_per_sec,
+                        'ops_per_sec_values': [ops_per_sec],
+                        'latency': latency,
+                        'latency_values': [latency],
+                    },
+                },
+            }],
+        },
+    }, None)
+
+
+def create_history(ops_per_sec_values):
+    rng = random.Random(1)
+    history = [create_performance_data(order, value + rng.gauss(0, 1), 10 + rng.gauss(0, 0.1))
+               for order, value in enumerate(ops_per_sec_values)]
+    rng.shuffle(history)
+    return history
+
+
+class TestPerformanceSeries(object):
+    def test_series_are_in_revision_order(self):
+        series = under_test.PerformanceSeries.from_performance_data(create_history([100] * 10))
+
+        key = under_test.SeriesKey('test_name', '1', 'ops_per_sec')
+        assert list(series.series(key).orders) == list(range(10))
+        assert series.series(key).revisions[0] == 'revision_0'
+        assert len(series.keys()) == 4
+
+    def test_as_columns(self):
+        series = under_test.PerformanceSeries.from_performance_data(create_history([100] * 10))
+
+        columns = series.as_columns()
+
+        assert len(columns['value']) == 40
+        assert set(columns['thread_level']) == {'1', 'max'}
+        assert all(len(column) == 40 for column in columns.values())
+
+    def test_no_change_points_in_stable_series(self):
+        series = under_test.PerformanceSeries.from_performance_data(create_history([100] * 30))
+
+        assert not series.change_points()
+
+    def test_change_point_is_detected(self):
+        history = create_history([100] * 20 + [80] * 20)
+        series = under_test.PerformanceSeries.from_performance_data(history)
+
+        change_points = [change_point for change_point in series.change_points()
+                         if change_point.thread_level == '1']
+
+        assert len(change_points) == 1
+        assert change_points[0].order == 20
+        assert change_points[0].revision == 'revision_20'
+        assert change_points[0].percent_change == pytest.approx(-20, abs=2)
+
+    def test_regressions(self):
+        dropping = under_test.PerformanceSeries.from_performance_data(
+            create_history([100] * 20 + [80] * 20))
+        rising = under_test.PerformanceSeries.from_performance_data(
+            create_history([80] * 20 + [100] * 20))
+
+        assert dropping.regressions()
+        assert not rising.regressions()
+
+
+class TestLowerIsBetter(object):
+    def test_lower_is_better(self):
+        assert under_test.lower_is_better('95th_read_latency_us')
+        assert not under_test.lower_is_better('ops_per_sec')
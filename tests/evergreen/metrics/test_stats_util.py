@@ -0,0 +1,145 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/metrics/stats_util.py."""
+from __future__ import absolute_import
+
+import random
+
+import pytest
+
+import evergreen.metrics.stats_util as under_test
+
+
+class TestNormalDistribution(object):
+    def test_cdf(self):
+        assert under_test.normal_cdf(0) == pytest.approx(0.5)
+        assert under_test.normal_cdf(1.96) == pytest.approx(0.975, abs=1e-4)
+
+    def test_ppf_inverts_cdf(self):
+        assert under_test.normal_ppf(0.975) == pytest.approx(1.96, abs=1e-3)
+
+
+class TestWilsonInterval(object):
+    def test_no_trials(self):
+        assert under_test.wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_interval_contains_proportion(self):
+        low, high = under_test.wilson_interval(10, 100)
+
+        assert low == pytest.approx(0.0552, abs=1e-3)
+        assert high == pytest.approx(0.1744, abs=1e-3)
+
+
+class TestChiSquare(object):
+    def test_critical_value(self):
+        assert under_test.chi_square_1_sf(3.841) == pytest.approx(0.05, abs=1e-3)
+
+
+class TestEDivisive(object):
+    def test_short_series_is_not_split(self):
+        assert under_test.e_divisive_split([1, 2, 3], 2) is None
+
+    def test_best_split(self):
+        index, _ = under_test.e_divisive_split([1, 1, 1, 1, 5, 5, 5], 2)
+
+        assert index == 4
+
+    @pytest.mark.parametrize('use_numpy', [False, None])
+    def test_change_points(self, use_numpy):
+        rng = random.Random(1)
+        values = [rng.gauss(10, 1) for _ in range(30)] + [rng.gauss(20, 1) for _ in range(30)]
+
+        change_points = under_test.e_divisive(values, use_numpy=use_numpy)
+
+        assert [index for index, _ in change_points] == [30]
+
+    @pytest.mark.parametrize('use_numpy', [False, None])
+    def test_no_change_points(self, use_numpy):
+        rng = random.Random(1)
+        values = [rng.gauss(10, 1) for _ in range(60)]
+
+        assert under_test.e_divisive(values, use_numpy=use_numpy) == []
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_numpy_finds_same_change_points(self, seed):
+        pytest.importorskip('numpy')
+        rng = random.Random(seed)
+        values = [rng.gauss(10, 1) for _ in range(40)] + [rng.gauss(12, 1) for _ in range(20)] + \
+            [rng.gauss(9, 1) for _ in range(40)]
+
+        expected = under_test.e_divisive(values, use_numpy=False)
+
+        assert under_test.e_divisive(values, use_numpy=True) == expected
+
+    def test_numpy_is_not_required(self, monkeypatch):
+        monkeypatch.setattr(under_test, 'optional_import', lambda name: None)
+        values = [1] * 10 + [5] * 10
+
+        assert [index for index, _ in under_test.e_divisive(values)] == [10]
+        with pytest.raises(ImportError):
+            under_test.e_divisive(values, use_numpy=True)
+
+
+class TestIncompleteBeta(object):
+    def test_known_value(self):
+        assert under_test.regularized_incomplete_beta(2, 3, 0.4) == pytest.approx(0.5248)
+
+    def test_bounds(self):
+        assert under_test.regularized_incomplete_beta(2, 3, 0) == 0
+        assert under_test.regularized_incomplete_beta(2, 3, 1) == 1
+
+
+class TestWelchTTest(object):
+    def test_known_value(self):
+        p_value = under_test.welch_t_test([1, 2, 3, 4, 5], [2, 3, 4, 5, 9])
+
+        assert p_value == pytest.approx(0.2937, abs=1e-3)
+
+    def test_too_few_values(self):
+        assert under_test.welch_t_test([1], [2, 3]) is None
+
+    def test_no_variance(self):
+        assert under_test.welch_t_test([1, 1], [1, 1]) == 1.0
+        assert under_test.welch_t_test([1, 1], [2, 2]) == 0.0
+
+
+class TestMannWhitneyUTest(object):
+    def test_known_value(self):
+        p_value = under_test.mann_whitney_u_test([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+
+        assert p_value == pytest.approx(0.0122, abs=1e-3)
+
+    def test_all_tied(self):
+        assert under_test.mann_whitney_u_test([1, 1], [1, 1]) == 1.0
+
+
+class TestVectorizedTests(object):
+    SAMPLES = [
+        ([1, 2, 3, 4, 5], [2, 3, 4, 5, 9]),
+        ([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]),
+        ([1, 1, 2, 2, 3], [2, 2, 3, 3, 3]),
+        ([1, 1, 1, 1, 1], [1, 1, 1, 1, 1]),
+        ([1, 1, 1, 1, 1], [2, 2, 2, 2, 2]),
+        ([100, 101, 99, 100, 100], [80, 81, 79, 80, 80]),
+    ]
+
+    def test_welch_t_tests_match_single_tests(self):
+        numpy = pytest.importorskip('numpy')
+        pytest.importorskip('scipy')
+        first = numpy.array([sample[0] for sample in self.SAMPLES], dtype=float)
+        second = numpy.array([sample[1] for sample in self.SAMPLES], dtype=float)
+
+        p_values = under_test.welch_t_tests(first, second)
+
+        assert p_values.tolist() == pytest.approx(
+            [under_test.welch_t_test(*sample) for sample in self.SAMPLES])
+
+    def test_mann_whitney_u_tests_match_single_tests(self):
+        numpy = pytest.importorskip('numpy')
+        pytest.importorskip('scipy')
+        first = numpy.array([sample[0] for sample in self.SAMPLES], dtype=float)
+        second = numpy.array([sample[1] for sample in self.SAMPLES], dtype=float)
+
+        p_values = under_test.mann_whitney_u_tests(first, second)
+
+        assert p_values.tolist() == pytest.approx(
+            [under_test.mann_whitney_u_test(*sample) for sample in self.SAMPLES])
@@ -1,7 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from datetime import timedelta
+import json
 import os
 import sys
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
 
 from evergreen.config import DEFAULT_API_SERVER, DEFAULT_NETWORK_TIMEOUT_SEC
 from evergreen.util import parse_evergreen_datetime, EVG_DATETIME_FORMAT
@@ -12,15 +21,15 @@ except ImportError:
     from mock import MagicMock, patch
 
 import pytest
-from requests.exceptions import HTTPError
+from requests.exceptions import ConnectionError, HTTPError
 from tenacity import RetryError
 
 import evergreen.api as under_test
+from evergreen.task import Task
 
-try:
-    from json.decoder import JSONDecodeError
-except ImportError:  # This doesn't exist in python 2.
-    pass
+
+def json_content(data):
+    return json.dumps(data).encode('utf-8')
 
 
 def ns(relative):
@@ -53,6 +62,35 @@ class TestConfiguration(object):
         assert kwargs['timeout'] == DEFAULT_NETWORK_TIMEOUT_SEC
 
 
+class TestThrottle(object):
+    def test_calls_are_throttled(self, mocked_api):
+        throttle = MagicMock()
+        mocked_api._throttle = throttle
+
+        mocked_api.version_by_id('version_id')
+
+        throttle.permit.return_value.__enter__.assert_called_once()
+        throttle.permit.return_value.__exit__.assert_called_once()
+
+    def test_overloads_shrink_concurrency(self, mocked_api):
+        throttle = under_test.Throttle.create(initial_concurrency=8)
+        mocked_api._throttle = throttle
+        mocked_api.session.get.return_value.status_code = 503
+        mocked_api.session.get.return_value.raise_for_status.side_effect = HTTPError()
+
+        with pytest.raises(HTTPError):
+            mocked_api.version_by_id('version_id')
+
+        assert throttle.concurrency_limiter.limit == 4
+
+    def test_get_api_passes_throttle(self):
+        throttle = under_test.Throttle.create()
+
+        api = under_test.RetryingEvergreenApi.get_api(throttle=throttle)
+
+        assert api._throttle == throttle
+
+
 class TestRaiseForStatus(object):
     @pytest.mark.skipif(
         sys.version_info.major == 2,
@@ -60,7 +98,7 @@ class TestRaiseForStatus(object):
     )
     def test_non_json_error(self, mocked_api):
         mocked_response = MagicMock()
-        mocked_response.json.side_effect = JSONDecodeError('json error', '', 0)
+        mocked_response.content = b'<html>not json</html>'
         mocked_response.status_code = 500
         mocked_response.raise_for_status.side_effect = HTTPError()
         mocked_api.session.get.return_value = mocked_response
@@ -73,7 +111,7 @@ class TestRaiseForStatus(object):
     def test_json_errors_are_passed_through(self, mocked_api):
         error_msg = 'the error'
         mocked_response = MagicMock()
-        mocked_response.json.return_value = {'error': error_msg}
+        mocked_response.content = json_content({'error': error_msg})
         mocked_response.status_code = 500
         mocked_response.raise_for_status.side_effect = HTTPError()
         mocked_api.session.get.return_value = mocked_response
@@ -84,11 +122,32 @@ class TestRaiseForStatus(object):
         assert error_msg in str(excinfo.value)
         mocked_response.raise_for_status.assert_not_called()
 
+    def test_successful_responses_are_decoded_once(self, mocked_api, sample_version):
+        mocked_api.session.get.return_value.content = json_content(sample_version)
+
+        with patch.object(under_test, 'loads', wraps=under_test.loads) as loads:
+            mocked_api.version_by_id('version_id')
+
+        loads.assert_called_once()
+
+    def test_paginated_pages_are_decoded_once(self, mocked_api):
+        next_url = 'http://url_to_next'
+        first_page = MagicMock(status_code=200, links={'next': {'url': next_url}})
+        first_page.content = json_content(['item 1'])
+        last_page = MagicMock(status_code=200, links={})
+        last_page.content = json_content(['item 2'])
+        mocked_api.session.get.side_effect = [first_page, last_page]
+
+        with patch.object(under_test, 'loads', wraps=under_test.loads) as loads:
+            assert mocked_api._paginate('http://url') == ['item 1', 'item 2']
+
+        assert loads.call_count == 2
+
 
 class TestLazyPagination(object):
     def test_with_no_next(self, mocked_api):
         returned_items = ['item 1', 'item 2', 'item 3']
-        mocked_api.session.get.return_value.json.return_value = returned_items
+        mocked_api.session.get.return_value.content = json_content(returned_items)
 
         results = mocked_api._lazy_paginate('http://url')
 
@@ -102,7 +161,7 @@ class TestLazyPagination(object):
     def test_next_in_response(self, mocked_api):
         returned_items = ['item 1', 'item 2', 'item 3']
         next_url = 'http://url_to_next'
-        mocked_api.session.get.return_value.json.return_value = returned_items
+        mocked_api.session.get.return_value.content = json_content(returned_items)
         mocked_api.session.get.return_value.links = {
             'next': {
                 'url': next_url
@@ -119,8 +178,28 @@ class TestLazyPagination(object):
 
         assert i > items_to_check
 
+    def test_params_are_only_passed_to_first_page(self, mocked_api):
+        next_url = 'http://url_to_next'
+        first_page = MagicMock(status_code=200, links={'next': {'url': next_url}})
+        first_page.content = json_content(['item 1'])
+        last_page = MagicMock(status_code=200, links={})
+        last_page.content = json_content(['item 2'])
+        mocked_api.session.get.side_effect = [first_page, last_page]
+
+        results = list(mocked_api._lazy_paginate('http://url', {'param': 'value'}))
+
+        assert results == ['item 1', 'item 2']
+        mocked_api.session.get.assert_called_with(url=next_url, params=None, timeout=None)
+
 
 class TestDistrosApi(object):
+    def test_iter_all_distros(self, mocked_api):
+        distros = mocked_api.iter_all_distros()
+        next(distros)
+        mocked_api.session.get.assert_called_with(url=mocked_api._create_url('/distros'),
+                                                  params={'limit': under_test.DEFAULT_LIMIT},
+                                                  timeout=None)
+
     def test_all_distros(self, mocked_api):
         mocked_api.all_distros()
         mocked_api.session.get.assert_called_with(url=mocked_api._create_url('/distros'),
@@ -128,6 +207,16 @@ class TestDistrosApi(object):
 
 
 class TestHostApi(object):
+    def test_iter_all_hosts_stops_early(self, mocked_api):
+        mocked_api.session.get.return_value.links = {'next': {'url': 'http://url_to_next'}}
+
+        hosts = mocked_api.iter_all_hosts(status='running')
+
+        assert next(hosts)
+        mocked_api.session.get.assert_called_once_with(url=mocked_api._create_url('/hosts'),
+                                                       params={'status': 'running'},
+                                                       timeout=None)
+
     def test_all_hosts(self, mocked_api):
         mocked_api.all_hosts()
         mocked_api.session.get.assert_called_with(url=mocked_api._create_url('/hosts'), params={},
@@ -140,6 +229,20 @@ class TestHostApi(object):
 
 
 class TestProjectApi(object):
+    def test_iter_all_projects(self, mocked_api):
+        projects = list(mocked_api.iter_all_projects())
+        assert len(projects) == 1
+        mocked_api.session.get.assert_called_with(url=mocked_api._create_url('/projects'),
+                                                  params={'limit': under_test.DEFAULT_LIMIT},
+                                                  timeout=None)
+
+    def test_iter_tasks_by_project(self, mocked_api):
+        tasks = mocked_api.iter_tasks_by_project('project_id', statuses=['failed'])
+        next(tasks)
+        expected_url = mocked_api._create_url('/projects/project_id/versions/tasks')
+        mocked_api.session.get.assert_called_with(url=expected_url,
+                                                  params={'status': ['failed']}, timeout=None)
+
     def test_all_projects(self, mocked_api):
         mocked_api.all_projects()
         expected_url = mocked_api._create_url('/projects')
@@ -182,7 +285,7 @@ class TestProjectApi(object):
         version_list[1]['create_time'] = (before_date - one_hour).strftime(EVG_DATETIME_FORMAT)
         version_list[2]['create_time'] = (after_date - one_day).strftime(EVG_DATETIME_FORMAT)
 
-        mocked_api_response.json.return_value = version_list
+        mocked_api_response.content = json_content(version_list)
 
         windowed_versions = mocked_api.versions_by_project_time_window('project_id', before_date,
                                                                        after_date)
@@ -216,7 +319,7 @@ class TestProjectApi(object):
         patch_list[1]['create_time'] = (before_date - one_hour).strftime(EVG_DATETIME_FORMAT)
         patch_list[2]['create_time'] = (after_date - one_day).strftime(EVG_DATETIME_FORMAT)
 
-        mocked_api_response.json.return_value = patch_list
+        mocked_api_response.content = json_content(patch_list)
 
         windowed_versions = mocked_api.patches_by_project_time_window('project_id', before_date,
                                                                       after_date)
@@ -243,6 +346,53 @@ class TestProjectApi(object):
         mocked_api.session.get.assert_called_with(url=expected_url, params=expected_params,
                                                   timeout=None)
 
+    def test_test_stats_by_project_in_chunks(self, mocked_api, sample_test_stats):
+        mocked_api.session.get.return_value.content = json_content([sample_test_stats])
+
+        test_stats = mocked_api.test_stats_by_project('project_id', '2019-01-01', '2019-01-20',
+                                                      chunk_num_days=7)
+
+        assert mocked_api.session.get.call_count == 3
+        queried_ranges = sorted((call[1]['params']['after_date'], call[1]['params']['before_date'])
+                                for call in mocked_api.session.get.call_args_list)
+        assert queried_ranges == [
+            ('2019-01-01', '2019-01-08'),
+            ('2019-01-08', '2019-01-15'),
+            ('2019-01-15', '2019-01-20'),
+        ]
+        assert len(test_stats) == 1
+        assert test_stats[0].num_pass == 3 * sample_test_stats['num_pass']
+
+    def test_iter_test_stats_by_project(self, mocked_api):
+        after_date = '2019-01-01'
+        before_date = '2019-02-01'
+        stats = mocked_api.iter_test_stats_by_project('project_id', after_date, before_date,
+                                                      tasks=['task'])
+        next(stats)
+        expected_url = mocked_api._create_url('/projects/project_id/test_stats')
+        expected_params = {
+            'after_date': after_date,
+            'before_date': before_date,
+            'tasks': ['task'],
+        }
+        mocked_api.session.get.assert_called_with(url=expected_url, params=expected_params,
+                                                  timeout=None)
+
+    def test_iter_task_stats_by_project(self, mocked_api):
+        stats = mocked_api.iter_task_stats_by_project('project_id', '2019-01-01', '2019-02-01')
+        next(stats)
+        expected_url = mocked_api._create_url('/projects/project_id/task_stats')
+        mocked_api.session.get.assert_called_with(
+            url=expected_url, params={'after_date': '2019-01-01', 'before_date': '2019-02-01'},
+            timeout=None)
+
+    def test_iter_task_reliability_by_project(self, mocked_api):
+        scores = mocked_api.iter_task_reliability_by_project('project_id', tasks=['compile'])
+        next(scores)
+        expected_url = mocked_api._create_url('/projects/project_id/task_reliability')
+        mocked_api.session.get.assert_called_with(url=expected_url, params={'tasks': ['compile']},
+                                                  timeout=None)
+
     def test_tasks_by_project(self, mocked_api):
         mocked_api.tasks_by_project('project_id')
         expected_url = mocked_api._create_url('/projects/project_id/versions/tasks')
@@ -256,6 +406,14 @@ class TestProjectApi(object):
 
 
 class TestBuildApi(object):
+    def test_iter_tasks_by_build(self, mocked_api):
+        tasks = mocked_api.iter_tasks_by_build('build_id', fetch_all_executions=True)
+        next(tasks)
+        expected_url = mocked_api._create_url('/builds/build_id/tasks')
+        mocked_api.session.get.assert_called_with(url=expected_url,
+                                                  params={'fetch_all_executions': 1},
+                                                  timeout=None)
+
     def test_build_by_id(self, mocked_api):
         mocked_api.build_by_id('build_id')
         expected_url = mocked_api._create_url('/builds/build_id')
@@ -268,6 +426,14 @@ class TestBuildApi(object):
 
 
 class TestVersionApi(object):
+    def test_iter_builds_by_version(self, mocked_api):
+        builds = mocked_api.iter_builds_by_version('version_id')
+        next(builds)
+        expected_url = mocked_api._create_url('/versions/version_id/builds')
+        mocked_api.session.get.assert_called_with(url=expected_url,
+                                                  params={'limit': under_test.DEFAULT_LIMIT},
+                                                  timeout=None)
+
     def test_version_by_id(self, mocked_api):
         mocked_api.version_by_id('version_id')
         expected_url = mocked_api._create_url('/versions/version_id')
@@ -287,6 +453,14 @@ class TestPatchApi(object):
 
 
 class TestTaskApi(object):
+    def test_iter_tests_by_task(self, mocked_api):
+        tests = mocked_api.iter_tests_by_task('task_id', status='fail', execution=1)
+        next(tests)
+        expected_url = mocked_api._create_url('/tasks/task_id/tests')
+        mocked_api.session.get.assert_called_with(url=expected_url,
+                                                  params={'status': 'fail', 'execution': 1},
+                                                  timeout=None)
+
     def test_task_by_id(self, mocked_api):
         mocked_api.task_by_id('task_id')
         expected_url = mocked_api._create_url('/tasks/task_id')
@@ -336,6 +510,57 @@ class TestTaskApi(object):
         mocked_api.session.get.assert_called_with(url=expected_url, params=expected_params,
                                                   timeout=None)
 
+    def test_tests_by_tasks(self, mocked_api, sample_task):
+        tasks = [Task(dict(sample_task, task_id='task_{}'.format(i)), None) for i in range(5)]
+        mocked_api.session.get.return_value.content = json_content(
+            [{'test_file': 'test_1'}, {'test_file': 'test_2'}])
+
+        tests = list(mocked_api.tests_by_tasks(tasks))
+
+        assert len(tests) == 10
+        assert mocked_api.session.get.call_count == 5
+
+    def test_tests_by_tasks_queries_each_task_once(self, mocked_api, sample_task):
+        tasks = [Task(sample_task, None) for _ in range(3)]
+        mocked_api.session.get.return_value.content = json_content([{'test_file': 'test_1'}])
+
+        tests = list(mocked_api.tests_by_tasks(tasks))
+
+        assert len(tests) == 1
+        assert mocked_api.session.get.call_count == 1
+
+    def test_tests_by_tasks_dedupes_across_executions(self, mocked_api, sample_task):
+        sample_task['execution'] = 1
+        sample_task['previous_executions'] = [dict(sample_task, execution=0)]
+        tasks = [Task(sample_task, None)]
+        mocked_api.session.get.return_value.content = json_content([{'test_file': 'test_1'}])
+
+        tests = list(mocked_api.tests_by_tasks(tasks, fetch_all_executions=True))
+
+        assert len(tests) == 1
+        assert mocked_api.session.get.call_count == 2
+
+    def test_tests_by_tasks_filters_status_of_latest_execution(self, mocked_api, sample_task):
+        sample_task['execution'] = 1
+        sample_task['previous_executions'] = [dict(sample_task, execution=0)]
+        tasks = [Task(sample_task, None)]
+        tests_by_execution = {
+            0: [{'test_file': 'test_1', 'status': 'fail'},
+                {'test_file': 'test_2', 'status': 'fail'}],
+            1: [{'test_file': 'test_1', 'status': 'pass'}],
+        }
+
+        def get(url, params, timeout):
+            assert 'status' not in params
+            return MagicMock(status_code=200, links={},
+                             content=json_content(tests_by_execution[params['execution']]))
+
+        mocked_api.session.get.side_effect = get
+
+        tests = list(mocked_api.tests_by_tasks(tasks, status='fail', fetch_all_executions=True))
+
+        assert [test.test_file for test in tests] == ['test_2']
+
     def test_performance_results_by_task(self, mocked_api):
         mocked_api.performance_results_by_task('task_id')
         expected_url = mocked_api._create_plugin_url('/task/task_id/perf')
@@ -343,6 +568,36 @@ class TestTaskApi(object):
         mocked_api.session.get.assert_called_with(url=expected_url, params=expected_params,
                                                   timeout=None)
 
+    def test_performance_results_by_tasks(self, mocked_api, sample_task,
+                                          sample_performance_results):
+        tasks = [Task(dict(sample_task, task_id='task_{}'.format(i)), None) for i in range(3)]
+        tasks.append(Task(dict(sample_task, task_id='display', display_only=True), None))
+        mocked_api.session.get.return_value.content = json_content(sample_performance_results)
+
+        results = list(mocked_api.performance_results_by_tasks(tasks))
+
+        assert len(results) == 3
+        assert mocked_api.session.get.call_count == 3
+
+    def test_performance_results_by_tasks_skips_missing_results(self, mocked_api, sample_task):
+        tasks = [Task(dict(sample_task, task_id='task_{}'.format(i)), None) for i in range(2)]
+        missing_response = MagicMock(status_code=404)
+        missing_response.content = json_content({'error': 'not found'})
+        empty_response = MagicMock(status_code=200)
+        empty_response.content = json_content(None)
+        mocked_api.session.get.side_effect = [missing_response, empty_response]
+
+        assert list(mocked_api.performance_results_by_tasks(tasks)) == []
+
+    def test_performance_results_by_tasks_raises_other_errors(self, mocked_api, sample_task):
+        tasks = [Task(sample_task, None)]
+        error_response = MagicMock(status_code=500)
+        error_response.content = json_content({'error': 'server error'})
+        mocked_api.session.get.return_value = error_response
+
+        with pytest.raises(HTTPError):
+            list(mocked_api.performance_results_by_tasks(tasks))
+
     def test_performance_results_by_task_name(self, mocked_api):
         mocked_api.performance_results_by_task_name('task_id', 'task_name')
         expected_url = '{api_server}/api/2/task/task_id/json/history/task_name/perf'.format(
@@ -371,13 +626,243 @@ class TestLogApi(object):
 
     def test_stream_log(self, mocked_api):
         streamed_data = ["line_{}".format(i) for i in range(10)]
-        mocked_response = MagicMock()
-        mocked_response.iter_lines.return_value = streamed_data
+        mocked_response = MagicMock(encoding='utf-8')
+        mocked_response.iter_content.return_value = [
+            '{}\n'.format(line).encode('utf-8') for line in streamed_data]
         mocked_response.status_code = 200
-        mocked_api.session.get.return_value.__enter__.return_value = mocked_response
+        mocked_response.__enter__.return_value = mocked_response
+        mocked_api.session.get.return_value = mocked_response
+
+        assert list(mocked_api.stream_log('log_url')) == streamed_data
+
+
+class StreamingLogHandler(BaseHTTPRequestHandler):
+    """Send the first line of a log, then wait to be released before sending the rest."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.send_chunk(b'first line\n')
+        self.server.release.wait(5)
+        self.send_chunk(b'second line\n')
+        self.send_chunk(b'')
+
+    def send_chunk(self, data):
+        self.wfile.write('{:x}\r\n'.format(len(data)).encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
 
-        for line in mocked_api.stream_log('log_url'):
-            assert line in streamed_data
+    def log_message(self, *args):
+        pass
+
+
+class TestStreaming(object):
+    def test_lines_are_yielded_before_the_body_is_complete(self, stub_server_factory):
+        server = stub_server_factory(StreamingLogHandler)
+        server.release = threading.Event()
+        api = under_test.EvergreenApi(api_server=server.url)
+
+        lines = api.stream_log(server.url + '/task_log_raw/task_id/0')
+
+        try:
+            assert next(lines) == 'first line'
+            assert not server.release.is_set()
+            server.release.set()
+            assert list(lines) == ['second line']
+        finally:
+            api.session.close()
+
+    def test_successful_stream_bodies_are_not_decoded(self, mocked_api):
+        mocked_response = MagicMock(status_code=200, encoding='utf-8')
+        mocked_response.iter_content.return_value = [b'line\n']
+        mocked_response.__enter__.return_value = mocked_response
+        mocked_api.session.get.return_value = mocked_response
+
+        with patch.object(under_test, 'loads') as loads:
+            assert list(mocked_api.stream_log('log_url')) == ['line']
+
+        loads.assert_not_called()
+
+    def test_stopping_early_closes_the_stream(self, mocked_api):
+        mocked_response = MagicMock(status_code=200, encoding='utf-8')
+        mocked_response.iter_content.return_value = iter([b'line 1\n', b'line 2\n'])
+        mocked_response.__enter__.return_value = mocked_response
+        mocked_api.session.get.return_value = mocked_response
+
+        lines = mocked_api.stream_log('log_url')
+        next(lines)
+        lines.close()
+
+        mocked_response.__exit__.assert_called_once()
+
+
+class EchoVersionHandler(BaseHTTPRequestHandler):
+    """Serve a version whose id is the requested path, keeping connections alive."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({'version_id': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestThreadSafety(object):
+    def test_each_thread_has_its_own_session(self):
+        api = under_test.EvergreenApi()
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(api.session))
+        thread.start()
+        thread.join()
+
+        assert api.session is api.session
+        assert sessions[0] is not api.session
+        assert sessions[0].get_adapter(DEFAULT_API_SERVER) is api.session.get_adapter(
+            DEFAULT_API_SERVER)
+
+    def test_assigned_session_is_used_by_every_thread(self):
+        api = under_test.EvergreenApi()
+        session = MagicMock()
+        api.session = session
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(api.session))
+        thread.start()
+        thread.join()
+
+        assert sessions == [session]
+
+    def test_sessions_send_api_headers(self, sample_evergreen_auth):
+        api = under_test.EvergreenApi(auth=sample_evergreen_auth, compression=['gzip'])
+
+        assert api.session.headers['Api-User'] == sample_evergreen_auth.username
+        assert api.session.headers['Accept-Encoding'] == 'gzip'
+
+    def test_concurrent_calls(self, stub_server_factory, caplog):
+        server = stub_server_factory(EchoVersionHandler)
+        server.lock = threading.Lock()
+        server.connections = 0
+        api = under_test.EvergreenApi(api_server=server.url)
+        n_calls = 400
+
+        def call(i):
+            version_id = 'version_{}'.format(i)
+            return version_id, api.version_by_id(version_id).version_id
+
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(call, range(n_calls)))
+        finally:
+            api.close()
+
+        assert all(returned == '/rest/v2/versions/' + requested
+                   for requested, returned in results)
+        assert api.metrics.endpoints()['/versions/{}'].requests == n_calls
+        assert server.connections <= under_test.POOL_MAX_SIZE
+        assert 'Connection pool is full' not in caplog.text
+
+
+class TestForkSafety(object):
+    def test_child_gets_new_connections(self, monkeypatch):
+        api = under_test.EvergreenApi()
+        session = api.session
+        adapter = api._adapter
+        single_flight = api._single_flight
+
+        monkeypatch.setattr(under_test.os, 'getpid', lambda: -1)
+
+        assert api.session is not session
+        assert api._adapter is not adapter
+        assert api.session.get_adapter(DEFAULT_API_SERVER) is api._adapter
+        assert api._single_flight is not single_flight
+
+    def test_session_override_gets_new_connections(self, monkeypatch):
+        api = under_test.EvergreenApi()
+        session = api.session
+        api.session = session
+        pool_manager = session.get_adapter(DEFAULT_API_SERVER).poolmanager
+
+        monkeypatch.setattr(under_test.os, 'getpid', lambda: -1)
+
+        assert api.session is session
+        assert session.get_adapter(DEFAULT_API_SERVER).poolmanager is not pool_manager
+
+    def test_session_override_is_prepared(self, monkeypatch):
+        api = under_test.EvergreenApi()
+        transport = MagicMock()
+        api.session = transport
+
+        monkeypatch.setattr(under_test.os, 'getpid', lambda: -1)
+        api._check_fork()
+
+        transport.after_fork.assert_called_once_with()
+
+    def test_cached_data_is_kept(self, monkeypatch, mocked_cached_api):
+        validator_cache = MagicMock()
+        mocked_cached_api._validator_cache = validator_cache
+        mocked_cached_api.build_by_id('build_id')
+        mocked_cached_api.metrics.record('http://url/hosts', 10, 20)
+
+        monkeypatch.setattr(under_test.os, 'getpid', lambda: -1)
+        mocked_cached_api.build_by_id('build_id')
+
+        assert mocked_cached_api.session.get.call_count == 1
+        assert mocked_cached_api.metrics.endpoints()['/hosts'].requests == 1
+        validator_cache.after_fork.assert_called_once()
+
+    def test_retry_budget_is_prepared(self, monkeypatch):
+        budget = MagicMock()
+        api = under_test.RetryingEvergreenApi(retry_policy=under_test.RetryPolicy(budget=budget))
+
+        monkeypatch.setattr(under_test.os, 'getpid', lambda: -1)
+        api._check_fork()
+
+        budget.after_fork.assert_called_once()
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='fork is not available')
+    def test_calls_from_forked_child(self, stub_server_factory):
+        server = stub_server_factory(EchoVersionHandler)
+        server.lock = threading.Lock()
+        server.connections = 0
+        api = under_test.EvergreenApi(api_server=server.url)
+        api.version_by_id('parent')
+        parent_adapter = api._adapter
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                version = api.version_by_id('child')
+                result = 'new pool' if api._adapter is not parent_adapter else 'shared pool'
+                os.write(write_fd, '{} {}'.format(result, version.version_id).encode('utf-8'))
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        output = os.read(read_fd, 1024).decode('utf-8')
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        try:
+            assert output == 'new pool /rest/v2/versions/child'
+            assert api._adapter is parent_adapter
+            assert api.version_by_id('parent_2').version_id == '/rest/v2/versions/parent_2'
+        finally:
+            api.close()
 
 
 class TestCachedEvergreenApi(object):
@@ -397,6 +882,22 @@ class TestCachedEvergreenApi(object):
         assert mocked_cached_api.version_by_id(another_version_id)
         assert mocked_cached_api.session.get.call_count == 2
 
+    def test_concurrent_calls_share_a_request(self, mocked_cached_api):
+        release = threading.Event()
+        response = mocked_cached_api.session.get.return_value
+        mocked_cached_api.session.get.side_effect = lambda **kwargs: release.wait() and response
+
+        threads = [threading.Thread(target=mocked_cached_api.build_by_id, args=('build id',))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert mocked_cached_api.session.get.call_count == 1
+
     def test_clear_caches(self, mocked_cached_api):
         build_id = 'some build id'
         version_id = 'some version id'
@@ -441,6 +942,39 @@ class TestRetryingEvergreenApi(object):
 
         assert mocked_retrying_api.session.get.call_count == 2
 
+    def test_no_retries_on_client_errors(self, mocked_retrying_api):
+        mocked_response = mocked_retrying_api.session.get.return_value
+        mocked_response.status_code = 404
+        mocked_response.raise_for_status.side_effect = HTTPError(response=mocked_response)
+
+        with pytest.raises(HTTPError):
+            mocked_retrying_api.version_by_id('version id')
+
+        assert mocked_retrying_api.session.get.call_count == 1
+
+    def test_retries_on_connection_errors(self):
+        api = under_test.RetryingEvergreenApi(
+            retry_policy=under_test.RetryPolicy(sleep=MagicMock()))
+        api.session = MagicMock()
+        successful_response = MagicMock(status_code=200, content=b'{}')
+        api.session.get.side_effect = [ConnectionError(), successful_response]
+
+        api.version_by_id('version id')
+
+        assert api.session.get.call_count == 2
+
+    def test_streams_are_retried(self):
+        api = under_test.RetryingEvergreenApi(
+            retry_policy=under_test.RetryPolicy(sleep=MagicMock()))
+        api.session = MagicMock()
+        successful_response = MagicMock(status_code=200, encoding='utf-8')
+        successful_response.__enter__.return_value = successful_response
+        successful_response.iter_content.return_value = [b'line 0\nline 1\n']
+        api.session.get.side_effect = [ConnectionError(), successful_response]
+
+        assert list(api.stream_log('log_url')) == ['line 0', 'line 1']
+        assert api.session.get.call_count == 2
+
     def test_no_retries_on_non_http_errors(self, mocked_retrying_api):
         version_id = 'version id'
         mocked_retrying_api.session.get.side_effect = ValueError('Unexpected Failure')
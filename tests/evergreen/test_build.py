@@ -9,6 +9,7 @@ except ImportError:
 
 from evergreen.build import Build
 from evergreen.metrics.buildmetrics import BuildMetrics
+from evergreen.util import DEFAULT_MAX_WORKERS
 
 
 class TestBuild(object):
@@ -21,6 +22,15 @@ class TestBuild(object):
         build = Build(sample_build, mock_api)
         assert mock_api.tasks_by_build.return_value == build.get_tasks()
 
+    def test_get_all_tests(self, sample_build):
+        mock_api = MagicMock()
+        build = Build(sample_build, mock_api)
+
+        assert mock_api.tests_by_tasks.return_value == build.get_all_tests()
+        mock_api.tests_by_tasks.assert_called_once_with(
+            mock_api.tasks_by_build.return_value, status=None, fetch_all_executions=False,
+            max_workers=DEFAULT_MAX_WORKERS)
+
     def test_status_counts(self, sample_build):
         build = Build(sample_build, None)
         assert sample_build['status_counts']['succeeded'] == build.status_counts.succeeded
@@ -0,0 +1,168 @@
+import gzip
+import json
+
+try:
+    from http.server import BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+
+import pytest
+
+from evergreen.api import EvergreenApi
+import evergreen.compression as under_test
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+VERSION_JSON = {'version_id': 'version_id', 'message': 'a repetitive message ' * 100}
+
+
+class GzipStubHandler(BaseHTTPRequestHandler):
+    """Serve a version, compressing it with gzip if the client accepts it."""
+
+    def do_GET(self):
+        self.server.accept_encodings.append(self.headers.get('Accept-Encoding'))
+        body = json.dumps(VERSION_JSON).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server(stub_server_factory):
+    server = stub_server_factory(GzipStubHandler)
+    server.accept_encodings = []
+    return server
+
+
+class TestAcceptEncodingHeader(object):
+    def test_all_supported_encodings_by_default(self):
+        header = under_test.accept_encoding_header()
+
+        assert 'gzip' in header
+        assert 'deflate' in header
+
+    def test_encodings_in_order_of_preference(self):
+        assert under_test.accept_encoding_header(['deflate', 'gzip']) == 'deflate, gzip'
+
+    def test_unsupported_encodings_are_left_out(self):
+        assert under_test.accept_encoding_header(['made-up', 'gzip']) == 'gzip'
+
+    def test_no_compression(self):
+        assert under_test.accept_encoding_header([]) == under_test.IDENTITY
+
+
+class TestEndpointName(object):
+    @pytest.mark.parametrize('url,expected', [
+        ('https://evergreen.mongodb.com/rest/v2/hosts', '/hosts'),
+        ('https://evergreen.mongodb.com/rest/v2/versions/abc123', '/versions/{}'),
+        ('https://evergreen.mongodb.com/rest/v2/builds/build_id/tasks', '/builds/{}/tasks'),
+        ('https://evergreen.mongodb.com/plugin/json/task/task_id/perf', '/task/{}/perf'),
+    ])
+    def test_ids_are_replaced(self, url, expected):
+        assert under_test.endpoint_name(url) == expected
+
+
+class TestResponseSizes(object):
+    def test_sizes_from_raw_response(self):
+        response = MagicMock(content=b'x' * 100)
+        response.raw.tell.return_value = 10
+
+        assert under_test.response_sizes(response) == (10, 100)
+
+    def test_content_length_is_used_without_raw_response(self):
+        response = MagicMock(content=b'x' * 100, raw=None, headers={'Content-Length': '20'})
+
+        assert under_test.response_sizes(response) == (20, 100)
+
+    def test_unknown_wire_size(self):
+        response = MagicMock(content=b'x' * 100, raw=None, headers={})
+
+        assert under_test.response_sizes(response) == (100, 100)
+
+
+class TestClientMetrics(object):
+    def test_metrics_are_grouped_by_endpoint(self):
+        metrics = under_test.ClientMetrics()
+
+        metrics.record('https://evergreen.mongodb.com/rest/v2/versions/v1', 10, 100)
+        metrics.record('https://evergreen.mongodb.com/rest/v2/versions/v2', 20, 200)
+        metrics.record('https://evergreen.mongodb.com/rest/v2/hosts', 50, 50)
+
+        assert metrics.endpoints() == {
+            '/versions/{}': under_test.EndpointMetrics(2, 30, 300),
+            '/hosts': under_test.EndpointMetrics(1, 50, 50),
+        }
+
+    def test_compression_ratio(self):
+        metrics = under_test.ClientMetrics()
+        metrics.record('https://evergreen.mongodb.com/rest/v2/versions/v1', 10, 100)
+        metrics.record('https://evergreen.mongodb.com/rest/v2/hosts', 40, 40)
+
+        assert metrics.compression_ratio('/versions/{}') == 10
+        assert metrics.compression_ratio() == 140 / 50
+        assert metrics.compression_ratio('/builds') is None
+
+    def test_reset(self):
+        metrics = under_test.ClientMetrics()
+        metrics.record('https://evergreen.mongodb.com/rest/v2/hosts', 40, 40)
+
+        metrics.reset()
+
+        assert metrics.endpoints() == {}
+
+
+class TestResponseLines(object):
+    def test_lines_are_split_across_chunks(self):
+        response = MagicMock(encoding='utf-8')
+        response.iter_content.return_value = [b'first\nsec', b'ond\nthird']
+
+        assert list(under_test.ResponseLines(response)) == ['first', 'second', 'third']
+
+    def test_bytes_are_counted(self):
+        chunks = [u'caf\u00e9\r\n'.encode('utf-8'), u'na\u00efve\r\n'.encode('utf-8')]
+        response = MagicMock(encoding='utf-8')
+        response.iter_content.return_value = chunks
+        lines = under_test.ResponseLines(response)
+
+        assert list(lines) == [u'caf\u00e9', u'na\u00efve']
+        assert lines.num_bytes == sum(len(chunk) for chunk in chunks) == 15
+
+    def test_lines_are_not_decoded_without_an_encoding(self):
+        response = MagicMock(encoding=None)
+        response.iter_content.return_value = [b'{"a": 1}\n']
+
+        assert list(under_test.ResponseLines(response)) == [b'{"a": 1}']
+
+
+class TestCompressedResponses(object):
+    def test_compressed_responses_are_measured(self, stub_server):
+        api = EvergreenApi(api_server=stub_server.url)
+
+        version = api.version_by_id('version_id')
+
+        assert version.json == VERSION_JSON
+        assert 'gzip' in stub_server.accept_encodings[0]
+        metrics = api.metrics.endpoints()['/versions/{}']
+        assert metrics.requests == 1
+        assert metrics.uncompressed_bytes == len(json.dumps(VERSION_JSON))
+        assert metrics.compressed_bytes < metrics.uncompressed_bytes
+
+    def test_compression_can_be_disabled(self, stub_server):
+        api = EvergreenApi(api_server=stub_server.url, compression=[])
+
+        version = api.version_by_id('version_id')
+
+        assert version.json == VERSION_JSON
+        assert stub_server.accept_encodings == [under_test.IDENTITY]
+        assert api.metrics.compression_ratio() == 1
@@ -0,0 +1,64 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/export.py."""
+from __future__ import absolute_import
+
+from datetime import date
+
+import pytest
+
+import evergreen.export as under_test
+from evergreen.stats import TestStats as ts, TaskStats
+from evergreen.task_reliability import TaskReliability
+
+pyarrow = pytest.importorskip('pyarrow')
+pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+
+
+class TestToRecordBatches(object):
+    def test_test_stats_are_typed(self, sample_test_stats):
+        stats = [ts(sample_test_stats, None)]
+
+        batches = list(under_test.to_record_batches(stats, under_test.TEST_STATS_FIELDS))
+
+        assert len(batches) == 1
+        row = batches[0].to_pylist()[0]
+        assert row['date'] == date(2019, 2, 23)
+        assert row['num_pass'] == sample_test_stats['num_pass']
+        assert batches[0].schema.field('num_fail').type == pyarrow.int64()
+
+    def test_results_are_batched(self, sample_task_stats):
+        stats = (TaskStats(sample_task_stats, None) for _ in range(25))
+
+        batches = list(under_test.to_record_batches(stats, under_test.TASK_STATS_FIELDS,
+                                                    batch_size=10))
+
+        assert [batch.num_rows for batch in batches] == [10, 10, 5]
+
+    def test_missing_fields_are_null(self, sample_task_reliability):
+        del sample_task_reliability['num_timeout']
+        stats = [TaskReliability(sample_task_reliability, None)]
+
+        batches = list(under_test.to_record_batches(stats, under_test.TASK_RELIABILITY_FIELDS))
+
+        assert batches[0].to_pylist()[0]['num_timeout'] is None
+
+
+class TestWriteParquet(object):
+    def test_write_parquet(self, sample_test_stats, tmpdir):
+        stats = (ts(sample_test_stats, None) for _ in range(5))
+        path = str(tmpdir.join('stats.parquet'))
+
+        n_rows = under_test.write_parquet(stats, under_test.TEST_STATS_FIELDS, path)
+
+        table = pyarrow_parquet.read_table(path)
+        assert n_rows == 5
+        assert table.num_rows == 5
+        assert table.column('test_file')[0].as_py() == sample_test_stats['test_file']
+
+    def test_write_empty_parquet(self, tmpdir):
+        path = str(tmpdir.join('stats.parquet'))
+
+        n_rows = under_test.write_parquet([], under_test.TASK_STATS_FIELDS, path)
+
+        assert n_rows == 0
+        assert pyarrow_parquet.read_table(path).num_rows == 0
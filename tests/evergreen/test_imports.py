@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+import evergreen as under_test
+
+HEAVY_MODULES = ['requests', 'structlog', 'tenacity', 'yaml', 'dateutil', 'pylibversion']
+
+
+def imported_modules(statement):
+    """Run an import statement in a new interpreter and list the heavy modules it imported."""
+    script = '{}\nimport sys\nprint(" ".join(m for m in {!r} if m in sys.modules))'.format(
+        statement, HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return output.decode('utf-8').split()
+
+
+class TestImportedDependencies(object):
+    def test_importing_evergreen_imports_no_dependencies(self):
+        assert imported_modules('import evergreen') == []
+
+    def test_importing_models_does_not_import_client(self):
+        assert imported_modules('from evergreen.task import Task\n'
+                                'from evergreen.version import Version') == []
+
+    def test_importing_api_only_imports_requests(self):
+        assert imported_modules('from evergreen.api import EvergreenApi') == ['requests']
+
+    def test_structlog_is_imported_on_first_log(self):
+        assert 'structlog' in imported_modules(
+            'from evergreen.api import LOGGER\nLOGGER.debug("message")')
+
+
+class TestShortcuts(object):
+    def test_classes_can_be_imported_from_package(self):
+        from evergreen.api import EvergreenApi
+        from evergreen.task import Task
+
+        assert under_test.EvergreenApi is EvergreenApi
+        assert under_test.Task is Task
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            under_test.NotAClass
+
+    def test_shortcuts_are_listed(self):
+        assert 'Version' in dir(under_test)
+        assert 'Version' in under_test.__all__
@@ -0,0 +1,31 @@
+import structlog
+
+import evergreen.log as under_test
+
+
+class TestConfigureLogging(object):
+    def test_existing_configuration_is_kept(self):
+        processors = [structlog.processors.JSONRenderer()]
+        structlog.configure(processors=processors)
+        try:
+            under_test.configure_logging()
+
+            assert structlog.get_config()['processors'] == processors
+        finally:
+            structlog.reset_defaults()
+
+    def test_default_configuration(self):
+        structlog.reset_defaults()
+
+        under_test.configure_logging()
+
+        assert structlog.is_configured()
+        assert isinstance(structlog.get_config()['logger_factory'],
+                          structlog.stdlib.LoggerFactory)
+
+
+class TestLazyLogger(object):
+    def test_calls_are_forwarded_to_structlog(self):
+        logger = under_test.get_logger(__name__)
+
+        assert logger.bind(key='value')._context == {'key': 'value'}
@@ -2,6 +2,12 @@
 import random
 from copy import copy
 
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from evergreen import performance_results
 from evergreen.performance_results import PerformanceData
 from evergreen.util import parse_evergreen_short_datetime
 
@@ -15,6 +21,29 @@ class TestPerformanceResults(object):
         results.reverse()
         assert results[0].thread_level == 'max'
 
+    def test_results_are_only_formatted_once(self, sample_performance_results, monkeypatch):
+        format_results = MagicMock(wraps=_format_performance_results)
+        monkeypatch.setattr(performance_results, '_format_performance_results', format_results)
+        performance_data = PerformanceData(sample_performance_results, None)
+
+        for _ in range(3):
+            performance_data.test_batch.test_runs[0].test_results
+
+        assert format_results.call_count == 1
+        assert performance_data.test_batch is performance_data.test_batch
+
+    def test_changing_returned_lists_does_not_change_cached_ones(self,
+                                                                 sample_performance_results):
+        performance_data = PerformanceData(sample_performance_results, None)
+        test_run = performance_data.test_batch.test_runs[0]
+        results = test_run.test_results
+
+        results.reverse()
+        del performance_data.test_batch.test_runs[:]
+
+        assert test_run.test_results[-1].thread_level == 'max'
+        assert performance_data.test_batch.test_runs[0] is test_run
+
     def test_sorting(self, sample_performance_results):
         duplicate = copy(sample_performance_results)
         data = list(sample_performance_results['data']['results'][0]['results'].items())
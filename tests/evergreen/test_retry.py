@@ -0,0 +1,131 @@
+import pytest
+from requests.exceptions import ConnectionError, HTTPError, ReadTimeout
+from tenacity import RetryError
+
+import evergreen.retry as under_test
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+
+def http_error(status_code, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    return HTTPError(response=response)
+
+
+def create_policy(**kwargs):
+    return under_test.RetryPolicy(sleep=MagicMock(), **kwargs)
+
+
+class TestParseRetryAfter(object):
+    def test_seconds(self):
+        assert under_test.parse_retry_after('30') == 30
+
+    def test_http_date(self):
+        now = 784111777 - 10
+
+        assert under_test.parse_retry_after('Sun, 06 Nov 1994 08:49:37 GMT', now) == 10
+
+    def test_date_in_past(self):
+        assert under_test.parse_retry_after('Sun, 06 Nov 1994 08:49:37 GMT') == 0
+
+    @pytest.mark.parametrize('value', [None, '', 'not a date'])
+    def test_invalid_values(self, value):
+        assert under_test.parse_retry_after(value) is None
+
+
+class TestRetryBudget(object):
+    def test_withdraw_up_to_burst(self):
+        budget = under_test.RetryBudget(ratio=0.5, burst=2)
+
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+    def test_deposits_refill_budget(self):
+        budget = under_test.RetryBudget(ratio=0.5, burst=1)
+        budget.withdraw()
+
+        budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+
+    def test_deposits_are_capped_at_burst(self):
+        budget = under_test.RetryBudget(ratio=1, burst=2)
+
+        for _ in range(10):
+            budget.deposit()
+
+        assert budget.balance == 2
+
+
+class TestRetryPolicy(object):
+    @pytest.mark.parametrize('exception', [
+        ConnectionError(), ReadTimeout(), http_error(503), http_error(429), HTTPError()])
+    def test_retryable_errors(self, exception):
+        assert create_policy().is_retryable(exception)
+
+    @pytest.mark.parametrize('exception', [http_error(404), http_error(400), ValueError()])
+    def test_permanent_errors(self, exception):
+        assert not create_policy().is_retryable(exception)
+
+    def test_wait_time_uses_full_jitter(self):
+        policy = create_policy(start_wait=1, max_wait=3)
+
+        for attempt in range(1, 5):
+            assert 0 <= policy.wait_time(attempt) <= min(3, 2 ** (attempt - 1))
+
+    def test_wait_time_honors_retry_after(self):
+        policy = create_policy(max_wait=1)
+
+        assert policy.wait_time(1, http_error(503, {'Retry-After': '7'})) == 7
+
+    def test_retry_after_is_capped(self):
+        policy = create_policy(max_retry_after=10)
+
+        assert policy.wait_time(1, http_error(503, {'Retry-After': '3600'})) == 10
+
+    def test_call_retries_until_success(self):
+        fn = MagicMock(side_effect=[ConnectionError(), http_error(502), 'result'])
+        policy = create_policy()
+
+        assert policy.call(fn, 'arg') == 'result'
+        assert fn.call_count == 3
+        fn.assert_called_with('arg')
+
+    def test_call_does_not_retry_permanent_errors(self):
+        fn = MagicMock(side_effect=http_error(404))
+
+        with pytest.raises(HTTPError):
+            create_policy().call(fn)
+
+        assert fn.call_count == 1
+
+    def test_call_raises_retry_error_after_max_attempts(self):
+        fn = MagicMock(side_effect=ConnectionError())
+
+        with pytest.raises(RetryError):
+            create_policy(max_attempts=4).call(fn)
+
+        assert fn.call_count == 4
+
+    def test_call_stops_when_budget_is_spent(self):
+        fn = MagicMock(side_effect=ConnectionError())
+        policy = create_policy(budget=under_test.RetryBudget(ratio=0, burst=1))
+
+        with pytest.raises(RetryError):
+            policy.call(fn)
+
+        assert fn.call_count == 2
+
+    def test_spent_budget_does_not_stop_permanent_errors(self):
+        fn = MagicMock(side_effect=http_error(404))
+        policy = create_policy(budget=under_test.RetryBudget(ratio=0, burst=0))
+
+        with pytest.raises(HTTPError):
+            policy.call(fn)
+
+        assert fn.call_count == 1
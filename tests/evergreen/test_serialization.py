@@ -0,0 +1,93 @@
+import json
+import sys
+
+import pytest
+import yaml
+
+import evergreen.serialization as under_test
+
+DATA = {'task_id': 'task/1', 'status': 'success', 'time_taken_ms': 3.5, 'tags': ['a', 'b']}
+
+
+@pytest.fixture(autouse=True)
+def reset_backend(monkeypatch):
+    monkeypatch.setattr(under_test, '_json_backend', None)
+    monkeypatch.delenv(under_test.JSON_BACKEND_ENV, raising=False)
+
+
+def hide_module(monkeypatch, name):
+    """Make importing the named module fail."""
+    monkeypatch.setitem(sys.modules, name, None)
+
+
+class TestBackendSelection(object):
+    def test_fastest_installed_backend_is_used(self):
+        assert under_test.json_backend().name == under_test.available_json_backends()[0]
+
+    def test_falls_back_to_stdlib(self, monkeypatch):
+        hide_module(monkeypatch, 'orjson')
+        hide_module(monkeypatch, 'ujson')
+
+        assert under_test.available_json_backends() == [under_test.STDLIB_JSON]
+        assert under_test.json_backend().name == under_test.STDLIB_JSON
+
+    def test_backend_from_environment(self, monkeypatch):
+        monkeypatch.setenv(under_test.JSON_BACKEND_ENV, under_test.STDLIB_JSON)
+
+        assert under_test.json_backend().name == under_test.STDLIB_JSON
+
+    def test_use_json_backend(self):
+        under_test.use_json_backend(under_test.STDLIB_JSON)
+
+        assert under_test.json_backend().name == under_test.STDLIB_JSON
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            under_test.use_json_backend('made-up')
+
+    def test_requested_backend_that_is_not_installed(self, monkeypatch):
+        hide_module(monkeypatch, 'orjson')
+
+        with pytest.raises(ImportError):
+            under_test.use_json_backend('orjson')
+
+
+@pytest.fixture(params=['orjson', 'ujson', under_test.STDLIB_JSON])
+def backend(request):
+    if request.param not in under_test.available_json_backends():
+        pytest.skip('{} is not installed'.format(request.param))
+    return under_test.use_json_backend(request.param)
+
+
+class TestJsonBackends(object):
+    def test_round_trip(self, backend):
+        assert under_test.loads(under_test.dumps(DATA)) == DATA
+        assert under_test.loads(under_test.dumps(DATA).encode('utf-8')) == DATA
+
+    def test_compact_output_is_one_line(self, backend):
+        assert '\n' not in under_test.dumps(DATA)
+
+    def test_pretty_output(self, backend):
+        pretty = under_test.dumps(DATA, pretty=True)
+
+        assert '\n' in pretty
+        assert under_test.loads(pretty) == DATA
+
+    def test_pretty_output_is_the_same_for_every_backend(self, backend):
+        data = dict(DATA, message=u'caf\u00e9 / \u2713')
+
+        assert under_test.dumps(data, pretty=True) == json.dumps(data, indent=4)
+
+    def test_decode_errors(self, backend):
+        with pytest.raises(under_test.JSONDecodeError):
+            under_test.loads(b'<html>not json</html>')
+
+
+class TestYamlDump(object):
+    def test_matches_safe_dump(self):
+        assert under_test.yaml_dump(DATA) == yaml.safe_dump(DATA)
+
+    def test_without_libyaml(self, monkeypatch):
+        monkeypatch.delattr(yaml, 'CSafeDumper', raising=False)
+
+        assert under_test.yaml_dump(DATA) == yaml.safe_dump(DATA)
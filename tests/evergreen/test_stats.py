@@ -2,7 +2,7 @@
 """Unit tests for stats representation of evergreen."""
 from __future__ import absolute_import
 
-from evergreen.stats import TestStats as ts
+from evergreen.stats import TestStats as ts, merge_stats
 
 
 class TestTestStats(object):
@@ -17,3 +17,32 @@ class TestTaskStats(object):
         task_stats = ts(sample_task_stats, None)
         assert task_stats.test_file == sample_task_stats['test_file']
         assert task_stats.task_name == sample_task_stats['task_name']
+
+
+class TestMergeStats(object):
+    def test_distinct_stats_are_not_merged(self, sample_test_stats):
+        other_stats = dict(sample_test_stats, date='2019-02-24')
+
+        merged = merge_stats([sample_test_stats, other_stats])
+
+        assert merged == [sample_test_stats, other_stats]
+
+    def test_matching_stats_are_merged(self, sample_test_stats):
+        first = dict(sample_test_stats, num_pass=1, num_fail=2, avg_duration_pass=10.0)
+        second = dict(sample_test_stats, num_pass=3, num_fail=1, avg_duration_pass=30.0)
+
+        merged = merge_stats([first, second])
+
+        assert len(merged) == 1
+        assert merged[0]['num_pass'] == 4
+        assert merged[0]['num_fail'] == 3
+        assert merged[0]['avg_duration_pass'] == 25.0
+
+    def test_merging_stats_with_no_passes(self, sample_test_stats):
+        first = dict(sample_test_stats, num_pass=0, num_fail=2, avg_duration_pass=0)
+        second = dict(sample_test_stats, num_pass=0, num_fail=1, avg_duration_pass=0)
+
+        merged = merge_stats([first, second])
+
+        assert merged[0]['num_fail'] == 3
+        assert merged[0]['avg_duration_pass'] == 0
@@ -0,0 +1,185 @@
+# -*- encoding: utf-8 -*-
+"""Unit tests for src/evergreen/stats_store.py."""
+from __future__ import absolute_import
+
+from datetime import datetime, timedelta
+import sqlite3
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+import pytest
+
+from evergreen.api import EvergreenApi
+import evergreen.stats_store as under_test
+from evergreen.stats import TestStats as ts, TaskStats
+
+
+def _daily_stats(stats_type, sample, after_date, before_date):
+    after = datetime.strptime(after_date, '%Y-%m-%d')
+    before = datetime.strptime(before_date, '%Y-%m-%d')
+    return [stats_type(dict(sample, date=(after + timedelta(days=i)).strftime('%Y-%m-%d')), None)
+            for i in range((before - after).days)]
+
+
+@pytest.fixture()
+def mock_api(sample_test_stats, sample_task_stats):
+    api = MagicMock()
+    api.test_stats_by_project.side_effect = \
+        lambda project, after, before, **kwargs: _daily_stats(ts, sample_test_stats, after,
+                                                              before)
+    api.task_stats_by_project.side_effect = \
+        lambda project, after, before, **kwargs: _daily_stats(TaskStats, sample_task_stats,
+                                                              after, before)
+    return api
+
+
+class TestStatsStore(object):
+    def test_stats_are_fetched_on_first_query(self, mock_api, sample_test_stats):
+        store = under_test.StatsStore(mock_api)
+
+        stats = store.test_stats_by_project('project', '2019-02-01', '2019-02-08')
+
+        assert len(stats) == 7
+        assert stats[0].date == '2019-02-01'
+        assert stats[0].num_pass == sample_test_stats['num_pass']
+        mock_api.test_stats_by_project.assert_called_once()
+
+    def test_stored_days_are_not_fetched_again(self, mock_api):
+        store = under_test.StatsStore(mock_api)
+        store.test_stats_by_project('project', '2019-02-01', '2019-02-08')
+
+        stats = store.test_stats_by_project('project', '2019-02-03', '2019-02-05')
+
+        assert len(stats) == 2
+        mock_api.test_stats_by_project.assert_called_once()
+
+    def test_only_missing_days_are_fetched(self, mock_api):
+        store = under_test.StatsStore(mock_api)
+        store.task_stats_by_project('project', '2019-02-05', '2019-02-08')
+
+        stats = store.task_stats_by_project('project', '2019-02-01', '2019-02-10')
+
+        assert len(stats) == 9
+        fetched_ranges = [call[0][1:3] for call in mock_api.task_stats_by_project.call_args_list]
+        assert fetched_ranges == [
+            ('2019-02-05', '2019-02-08'),
+            ('2019-02-01', '2019-02-05'),
+            ('2019-02-08', '2019-02-10'),
+        ]
+
+    def test_requesters_are_stored_separately(self, mock_api):
+        store = under_test.StatsStore(mock_api)
+        store.test_stats_by_project('project', '2019-02-01', '2019-02-03')
+
+        store.test_stats_by_project('project', '2019-02-01', '2019-02-03', requesters=['patch'])
+
+        assert mock_api.test_stats_by_project.call_count == 2
+
+    def test_filters_are_applied_locally(self, mock_api, sample_test_stats):
+        store = under_test.StatsStore(mock_api)
+        store.test_stats_by_project('project', '2019-02-01', '2019-02-03')
+
+        matching = store.test_stats_by_project('project', '2019-02-01', '2019-02-03',
+                                               tests=[sample_test_stats['test_file']])
+        not_matching = store.test_stats_by_project('project', '2019-02-01', '2019-02-03',
+                                                   variants=['other variant'])
+
+        assert len(matching) == 2
+        assert not not_matching
+        mock_api.test_stats_by_project.assert_called_once()
+
+    def test_unfinalized_days_are_not_stored(self, mock_api):
+        store = under_test.StatsStore(mock_api, finalized_after_days=0)
+        today = datetime.utcnow().date()
+        after_date = (today - timedelta(days=2)).strftime('%Y-%m-%d')
+        before_date = (today + timedelta(days=1)).strftime('%Y-%m-%d')
+
+        first = store.test_stats_by_project('project', after_date, before_date)
+        second = store.test_stats_by_project('project', after_date, before_date)
+
+        assert len(first) == len(second) == 3
+        assert mock_api.test_stats_by_project.call_count == 3
+
+    def test_recent_days_are_not_stored_until_they_settle(self, mock_api):
+        store = under_test.StatsStore(mock_api, finalized_after_days=2)
+        today = datetime.utcnow().date()
+        after_date = (today - timedelta(days=4)).strftime('%Y-%m-%d')
+        before_date = today.strftime('%Y-%m-%d')
+
+        store.test_stats_by_project('project', after_date, before_date)
+        store.test_stats_by_project('project', after_date, before_date)
+
+        fetched = [call[0][1:3] for call in mock_api.test_stats_by_project.call_args_list]
+        settled = (today - timedelta(days=2)).strftime('%Y-%m-%d')
+        assert fetched == [(after_date, settled), (settled, before_date),
+                           (settled, before_date)]
+
+    def test_stored_stats_keep_every_field(self, mock_api, sample_test_stats):
+        store = under_test.StatsStore(mock_api)
+
+        stored = store.test_stats_by_project('project', '2019-02-01', '2019-02-02')[0]
+
+        assert stored.json == dict(sample_test_stats, date='2019-02-01')
+
+    def test_store_with_old_schema_is_replaced(self, mock_api, tmpdir):
+        path = str(tmpdir.join('stats.db'))
+        connection = sqlite3.connect(path)
+        connection.execute('CREATE TABLE test_stats (project TEXT, date TEXT, num_pass INTEGER)')
+        connection.execute('CREATE TABLE fetched_days (kind TEXT, project TEXT, '
+                           'requesters TEXT, date TEXT)')
+        connection.execute("INSERT INTO fetched_days VALUES ('test', 'project', '', "
+                           "'2019-02-01')")
+        connection.commit()
+        connection.close()
+        store = under_test.StatsStore(mock_api, path)
+
+        stats = store.test_stats_by_project('project', '2019-02-01', '2019-02-02')
+
+        assert len(stats) == 1
+        mock_api.test_stats_by_project.assert_called_once()
+
+    def test_store_persists_to_disk(self, mock_api, tmpdir):
+        path = str(tmpdir.join('stats.db'))
+        store = under_test.StatsStore(mock_api, path)
+        store.test_stats_by_project('project', '2019-02-01', '2019-02-03')
+        store.close()
+
+        reopened = under_test.StatsStore(mock_api, path)
+        stats = reopened.test_stats_by_project('project', '2019-02-01', '2019-02-03')
+
+        assert len(stats) == 2
+        mock_api.test_stats_by_project.assert_called_once()
+
+
+class TestApiWithStatsStore(object):
+    @pytest.fixture()
+    def api(self, sample_test_stats, sample_task_stats):
+        api = EvergreenApi(stats_store_path=':memory:')
+        samples = {'test_stats': sample_test_stats, 'task_stats': sample_task_stats}
+        api._paginate = MagicMock(side_effect=lambda url, params: [
+            dict(samples[url.rsplit('/', 1)[-1]], date=params['after_date'])])
+        return api
+
+    def test_daily_stats_fill_the_store(self, api):
+        first = api.test_stats_by_project('project', '2019-02-01', '2019-02-08')
+        second = api.test_stats_by_project('project', '2019-02-01', '2019-02-08')
+
+        assert [stats.json for stats in first] == [stats.json for stats in second]
+        api._paginate.assert_called_once()
+        assert api._paginate.call_args[0][1]['group_by'] == 'test_task_variant_distro'
+
+    def test_task_stats_fill_the_store(self, api):
+        api.task_stats_by_project('project', '2019-02-01', '2019-02-08')
+        api.task_stats_by_project('project', '2019-02-01', '2019-02-08')
+
+        api._paginate.assert_called_once()
+        assert api._paginate.call_args[0][1]['group_by'] == 'task_variant_distro'
+
+    def test_other_groupings_are_queried_from_evergreen(self, api):
+        api.test_stats_by_project('project', '2019-02-01', '2019-02-08', group_num_days=7)
+        api.test_stats_by_project('project', '2019-02-01', '2019-02-08', group_num_days=7)
+
+        assert api._paginate.call_count == 2
@@ -0,0 +1,194 @@
+import threading
+
+import pytest
+
+import evergreen.throttle as under_test
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(object):
+    def test_burst_does_not_wait(self):
+        clock = FakeClock()
+        bucket = under_test.TokenBucket(10, burst=3, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire()
+
+        assert clock.sleeps == []
+
+    def test_calls_past_burst_wait_for_tokens(self):
+        clock = FakeClock()
+        bucket = under_test.TokenBucket(10, burst=1, clock=clock, sleep=clock.sleep)
+
+        bucket.acquire()
+        bucket.acquire()
+        bucket.acquire()
+
+        assert clock.sleeps == pytest.approx([0.1, 0.1])
+
+    def test_tokens_refill_over_time(self):
+        clock = FakeClock()
+        bucket = under_test.TokenBucket(10, burst=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 1
+        bucket.acquire()
+        bucket.acquire()
+
+        assert clock.sleeps == []
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            under_test.TokenBucket(0)
+
+
+class TestAdaptiveConcurrencyLimiter(object):
+    def test_limit_grows_with_successes(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(latency=1)
+
+        assert limiter.limit > 2
+
+    def test_limit_does_not_grow_past_max(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=3)
+
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(latency=1)
+
+        assert limiter.limit == 3
+
+    def test_limit_shrinks_on_overload(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1)
+
+        limiter.acquire()
+        limiter.release(overloaded=True)
+
+        assert limiter.limit == 4
+
+    def test_burst_of_overloads_only_backs_off_once(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=8)
+        for _ in range(4):
+            limiter.acquire()
+
+        for _ in range(4):
+            limiter.release(overloaded=True)
+
+        assert limiter.limit == 4
+
+    def test_limit_does_not_shrink_past_min(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+
+        limiter.acquire()
+        limiter.release(overloaded=True)
+
+        assert limiter.limit == 2
+
+    def test_latency_spike_is_an_overload(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=8, latency_tolerance=3)
+        limiter.acquire()
+        limiter.release(latency=1)
+        limit = limiter.limit
+
+        limiter.acquire()
+        limiter.release(latency=10)
+
+        assert limiter.limit < limit
+
+    def test_calls_past_the_limit_wait(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.05)
+
+        limiter.release(latency=1)
+        assert acquired.wait(1)
+        thread.join()
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            under_test.AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=5)
+
+    def test_calls_in_flight_are_forgotten_after_fork(self):
+        limiter = under_test.AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        limiter.after_fork()
+
+        assert limiter.in_flight == 0
+        assert limiter.limit == 2
+
+
+class TestThrottle(object):
+    def test_server_errors_are_overloads(self):
+        concurrency_limiter = MagicMock()
+        throttle = under_test.Throttle(concurrency_limiter=concurrency_limiter)
+
+        with throttle.permit() as permit:
+            permit.status_code = 503
+
+        concurrency_limiter.acquire.assert_called_once()
+        assert concurrency_limiter.release.call_args[0][1]
+
+    def test_success_is_not_an_overload(self):
+        concurrency_limiter = MagicMock()
+        throttle = under_test.Throttle(concurrency_limiter=concurrency_limiter)
+
+        with throttle.permit() as permit:
+            permit.status_code = 200
+
+        assert not concurrency_limiter.release.call_args[0][1]
+
+    def test_exceptions_are_overloads(self):
+        concurrency_limiter = MagicMock()
+        throttle = under_test.Throttle(concurrency_limiter=concurrency_limiter)
+
+        with pytest.raises(IOError):
+            with throttle.permit():
+                raise IOError('connection reset')
+
+        assert concurrency_limiter.release.call_args[0][1]
+
+    def test_rate_limiter_is_used(self):
+        rate_limiter = MagicMock()
+        throttle = under_test.Throttle(rate_limiter=rate_limiter)
+
+        with throttle.permit():
+            pass
+
+        rate_limiter.acquire.assert_called_once()
+
+    def test_create(self):
+        throttle = under_test.Throttle.create(rate=5, max_concurrency=2)
+
+        assert throttle.rate_limiter.rate == 5
+        assert throttle.concurrency_limiter.limit == 2
@@ -0,0 +1,187 @@
+import json
+
+try:
+    from http.server import BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from evergreen.api import EvergreenApi
+from evergreen.errors.exceptions import CassetteMissException
+import evergreen.transport as under_test
+from evergreen.validator_cache import ValidatorCache
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+
+ETAG = '"hosts"'
+
+
+class PagedHostsHandler(BaseHTTPRequestHandler):
+    """Serve two pages of hosts and a log, hosts are not modified if their ETag is sent."""
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if self.path.startswith('/log'):
+            self.send_body(b'line 1\nline 2\n', 'text/plain; charset=utf-8')
+            return
+
+        if self.headers.get('If-None-Match') == ETAG:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+
+        if 'start_at' in self.path:
+            hosts = [{'host_id': 'host 2'}]
+            links = None
+        else:
+            hosts = [{'host_id': 'host 1'}]
+            links = '<{}/rest/v2/hosts?start_at=host2>; rel="next"'.format(self.server.url)
+        self.send_body(json.dumps(hosts).encode('utf-8'), 'application/json', links)
+
+    def send_body(self, body, content_type, links=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        if links:
+            self.send_header('Link', links)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server(stub_server_factory):
+    server = stub_server_factory(PagedHostsHandler)
+    server.paths = []
+    server.not_modified = 0
+    return server
+
+
+def record(stub_server, cassette_dir):
+    api = EvergreenApi(api_server=stub_server.url)
+    api.session = under_test.RecordingTransport(api.session, str(cassette_dir))
+    hosts = [host.host_id for host in api.all_hosts()]
+    log = list(api.stream_log(stub_server.url + '/log'))
+    return hosts, log
+
+
+class TestRequestUrl(object):
+    def test_params_are_in_a_consistent_order(self):
+        assert (under_test.request_url('http://url', {'a': 1, 'b': 2}) ==
+                under_test.request_url('http://url', {'b': 2, 'a': 1}))
+
+    def test_params_are_part_of_the_url(self):
+        assert under_test.request_url('http://url', {'a': [1, 2]}) == 'http://url/?a=1&a=2'
+
+
+class TestRecordAndReplay(object):
+    def test_replay_matches_recording(self, stub_server, tmpdir):
+        recorded = record(stub_server, tmpdir)
+        api = EvergreenApi(api_server=stub_server.url)
+        api.session = under_test.ReplayTransport(str(tmpdir))
+        stub_server.paths = []
+
+        hosts = [host.host_id for host in api.all_hosts()]
+        log = list(api.stream_log(stub_server.url + '/log'))
+
+        assert recorded == (['host 1', 'host 2'], ['line 1', 'line 2'])
+        assert (hosts, log) == recorded
+        assert stub_server.paths == []
+
+    def test_not_modified_responses_are_not_recorded(self, stub_server, tmpdir):
+        api = EvergreenApi(api_server=stub_server.url, validator_cache=ValidatorCache())
+        api.session = under_test.RecordingTransport(api.session, str(tmpdir))
+        api.all_hosts()
+        api.all_hosts()
+        api = EvergreenApi(api_server=stub_server.url)
+        api.session = under_test.ReplayTransport(str(tmpdir))
+
+        hosts = [host.host_id for host in api.all_hosts()]
+
+        assert stub_server.not_modified == 2
+        assert hosts == ['host 1', 'host 2']
+
+    def test_closing_api_closes_recorded_session(self, tmpdir):
+        session = MagicMock()
+        api = EvergreenApi()
+        api.session = under_test.RecordingTransport(session, str(tmpdir))
+
+        api.close()
+
+        session.close.assert_called_once_with()
+
+    def test_cassettes_are_compressed(self, stub_server, tmpdir):
+        record(stub_server, tmpdir)
+
+        assert len(tmpdir.listdir()) == 3
+        assert all(path.basename.endswith('.json.gz') for path in tmpdir.listdir())
+
+    def test_missing_recording(self, tmpdir):
+        transport = under_test.ReplayTransport(str(tmpdir))
+
+        with pytest.raises(CassetteMissException) as excinfo:
+            transport.get('http://url/missing', params={'a': 1})
+
+        assert excinfo.value.url == 'http://url/missing?a=1'
+
+    def test_latency_is_simulated(self, stub_server, tmpdir):
+        record(stub_server, tmpdir)
+        sleep = MagicMock()
+        api = EvergreenApi(api_server=stub_server.url)
+        api.session = under_test.ReplayTransport(str(tmpdir), latency=0.25, sleep=sleep)
+
+        api.all_hosts()
+
+        assert sleep.call_count == 2
+        sleep.assert_called_with(0.25)
+
+    def test_replayed_responses_are_responses(self, stub_server, tmpdir):
+        record(stub_server, tmpdir)
+        transport = under_test.ReplayTransport(str(tmpdir))
+
+        response = transport.get(stub_server.url + '/rest/v2/hosts')
+
+        assert isinstance(response, requests.Response)
+        assert response.json() == [{'host_id': 'host 1'}]
+        assert 'next' in response.links
+
+
+class TestSessionAfterFork(object):
+    def test_session_gets_new_connection_pools(self):
+        session = requests.Session()
+        adapter = session.get_adapter('https://evergreen.mongodb.com')
+        pool_manager = adapter.poolmanager
+
+        under_test.session_after_fork(session)
+
+        assert session.get_adapter('https://evergreen.mongodb.com') is adapter
+        assert adapter.poolmanager is not pool_manager
+
+    def test_recorded_session_is_prepared(self, tmpdir):
+        session = requests.Session()
+        pool_manager = session.get_adapter('https://evergreen.mongodb.com').poolmanager
+        transport = under_test.RecordingTransport(session, str(tmpdir))
+
+        under_test.session_after_fork(transport)
+
+        assert session.get_adapter('https://evergreen.mongodb.com').poolmanager is not \
+            pool_manager
+
+    def test_replay_lock_is_replaced(self, tmpdir):
+        transport = under_test.ReplayTransport(str(tmpdir))
+        lock = transport._lock
+
+        under_test.session_after_fork(transport)
+
+        assert transport._lock is not lock
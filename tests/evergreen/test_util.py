@@ -1,6 +1,9 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import threading
 import time
 
+import pytest
+
 import evergreen.util as under_test
 
 try:
@@ -56,6 +59,13 @@ class TestParseEvergreenDate(object):
         assert now.date() == under_test.parse_evergreen_date(now_str)
 
 
+class TestAsDate(object):
+    @pytest.mark.parametrize('value', ['2019-02-13', datetime(2019, 2, 13, 14, 55),
+                                       date(2019, 2, 13)])
+    def test_values_are_converted_to_dates(self, value):
+        assert under_test.as_date(value) == date(2019, 2, 13)
+
+
 def mock_by_seconds(start_time, n_items):
     return [MagicMock(the_time=(start_time - timedelta(minutes=7 * i))) for i in range(n_items)]
 
@@ -90,3 +100,138 @@ class TestIteratorByTimeWindow(object):
         items = list(under_test.iterate_by_time_window(iterator, before_time, after_time,
                                                        "the_time"))
         assert (60 // 7) + 1 == len(items)
+
+
+class TestParallelMap(object):
+    def test_all_items_are_processed(self):
+        results = under_test.parallel_map(lambda x: x * 2, range(20), max_workers=4)
+
+        assert sorted(results) == [x * 2 for x in range(20)]
+
+    def test_exceptions_are_raised_to_caller(self):
+        def fail(item):
+            raise ValueError('failure')
+
+        with pytest.raises(ValueError):
+            list(under_test.parallel_map(fail, range(3)))
+
+    def test_no_items(self):
+        assert list(under_test.parallel_map(lambda x: x, [])) == []
+
+
+class TestDateChunks(object):
+    def test_range_smaller_than_chunk(self):
+        chunks = list(under_test.date_chunks('2019-01-01', '2019-01-03', 7))
+
+        assert chunks == [('2019-01-01', '2019-01-03')]
+
+    def test_range_is_split_into_chunks(self):
+        chunks = list(under_test.date_chunks('2019-01-01', '2019-01-20', 7))
+
+        assert chunks == [
+            ('2019-01-01', '2019-01-08'),
+            ('2019-01-08', '2019-01-15'),
+            ('2019-01-15', '2019-01-20'),
+        ]
+
+    def test_chunks_are_aligned_to_groups(self):
+        chunks = list(under_test.date_chunks(datetime(2019, 1, 1), datetime(2019, 1, 20), 7, 3))
+
+        assert chunks == [
+            ('2019-01-01', '2019-01-10'),
+            ('2019-01-10', '2019-01-19'),
+            ('2019-01-19', '2019-01-20'),
+        ]
+
+
+class TestSingleFlight(object):
+    def run_concurrently(self, single_flight, fn, num_callers=5):
+        results = []
+        errors = []
+
+        def caller():
+            try:
+                results.append(single_flight.call('key', fn))
+            except ValueError as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=caller) for _ in range(num_callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = under_test.SingleFlight()
+        release = threading.Event()
+        fn = MagicMock(side_effect=lambda: release.wait() and 'result')
+
+        threads, results, _ = self.run_concurrently(single_flight, fn)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert fn.call_count == 1
+        assert results == ['result'] * 5
+
+    def test_errors_are_shared(self):
+        single_flight = under_test.SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait()
+            raise ValueError('failure')
+
+        threads, _, errors = self.run_concurrently(single_flight, fail)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 5
+
+    def test_interrupts_are_shared(self):
+        class Interrupt(BaseException):
+            pass
+
+        single_flight = under_test.SingleFlight()
+        release = threading.Event()
+        interrupts = []
+
+        def interrupt():
+            release.wait()
+            raise Interrupt()
+
+        def caller():
+            try:
+                single_flight.call('key', interrupt)
+            except Interrupt as err:
+                interrupts.append(err)
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(interrupts) == 5
+
+    def test_sequential_calls_are_not_coalesced(self):
+        single_flight = under_test.SingleFlight()
+        fn = MagicMock(return_value='result')
+
+        single_flight.call('key', fn)
+        single_flight.call('key', fn)
+
+        assert fn.call_count == 2
+
+    def test_different_keys_are_not_coalesced(self):
+        single_flight = under_test.SingleFlight()
+        fn = MagicMock(return_value='result')
+
+        single_flight.call('key', fn)
+        single_flight.call('other key', fn)
+
+        assert fn.call_count == 2
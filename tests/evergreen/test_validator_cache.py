@@ -0,0 +1,124 @@
+import json
+
+try:
+    from http.server import BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+
+import pytest
+
+from evergreen.api import EvergreenApi
+import evergreen.validator_cache as under_test
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+VERSION_JSON = {'version_id': 'version_id', 'revision': 'abc123'}
+ETAG = '"v1"'
+LAST_MODIFIED = 'Sun, 06 Nov 1994 08:49:37 GMT'
+
+
+def create_response(headers):
+    return MagicMock(headers=headers)
+
+
+class StubEvergreenHandler(BaseHTTPRequestHandler):
+    """Serve a version with an ETag, answering 304 to matching conditional requests."""
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(VERSION_JSON).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server(stub_server_factory):
+    server = stub_server_factory(StubEvergreenHandler)
+    server.requests = []
+    return server
+
+
+class TestValidatorCache(object):
+    def test_responses_without_validators_are_not_cached(self):
+        cache = under_test.ValidatorCache()
+
+        cache.update('key', create_response({}))
+
+        assert cache.get('key') is None
+
+    def test_conditional_headers(self):
+        cache = under_test.ValidatorCache()
+        response = create_response({'ETag': ETAG, 'Last-Modified': LAST_MODIFIED})
+
+        cache.update('key', response)
+
+        entry = cache.get('key')
+        assert entry.response == response
+        assert entry.conditional_headers() == {
+            'If-None-Match': ETAG,
+            'If-Modified-Since': LAST_MODIFIED,
+        }
+
+    def test_response_without_validators_replaces_cached_response(self):
+        cache = under_test.ValidatorCache()
+        cache.update('key', create_response({'ETag': ETAG}))
+
+        cache.update('key', create_response({}))
+
+        assert cache.get('key') is None
+
+    def test_least_recently_used_responses_are_dropped(self):
+        cache = under_test.ValidatorCache(max_size=2)
+        cache.update('key 1', create_response({'ETag': ETAG}))
+        cache.update('key 2', create_response({'ETag': ETAG}))
+        cache.get('key 1')
+
+        cache.update('key 3', create_response({'ETag': ETAG}))
+
+        assert len(cache) == 2
+        assert cache.get('key 1')
+        assert cache.get('key 2') is None
+
+    def test_clear(self):
+        cache = under_test.ValidatorCache()
+        cache.update('key', create_response({'ETag': ETAG}))
+
+        cache.clear()
+
+        assert len(cache) == 0
+
+
+class TestConditionalRequests(object):
+    def test_unmodified_responses_are_reused(self, stub_server):
+        api = EvergreenApi(api_server=stub_server.url, validator_cache=under_test.ValidatorCache())
+
+        first = api.version_by_id('version_id')
+        second = api.version_by_id('version_id')
+
+        assert first.json == VERSION_JSON
+        assert second.json == VERSION_JSON
+        assert 'If-None-Match' not in stub_server.requests[0]
+        assert stub_server.requests[1]['If-None-Match'] == ETAG
+
+    def test_no_conditional_requests_without_cache(self, stub_server):
+        api = EvergreenApi(api_server=stub_server.url)
+
+        api.version_by_id('version_id')
+        api.version_by_id('version_id')
+
+        assert all('If-None-Match' not in headers for headers in stub_server.requests)
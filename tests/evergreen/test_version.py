@@ -93,6 +93,29 @@ class TestVersion(object):
 
         assert not version.get_patch()
 
+    def test_get_all_tests(self, sample_version):
+        mock_api = MagicMock()
+        builds = [MagicMock(), MagicMock()]
+        builds[0].get_tasks.return_value = ['task_1', 'task_2']
+        builds[1].get_tasks.return_value = ['task_3']
+        mock_api.builds_by_version.return_value = builds
+        mock_api.tests_by_tasks.side_effect = lambda tasks, **kwargs: sorted(tasks)
+        version = Version(sample_version, mock_api)
+
+        assert ['task_1', 'task_2', 'task_3'] == version.get_all_tests()
+
+    def test_get_performance_data(self, sample_version):
+        mock_api = MagicMock()
+        builds = [MagicMock(), MagicMock()]
+        builds[0].get_tasks.return_value = ['task_1']
+        builds[1].get_tasks.return_value = ['task_2', 'task_3']
+        mock_api.builds_by_version.return_value = builds
+        mock_api.performance_results_by_tasks.side_effect = \
+            lambda tasks, **kwargs: sorted(tasks)
+        version = Version(sample_version, mock_api)
+
+        assert ['task_1', 'task_2', 'task_3'] == version.get_performance_data()
+
     def test_get_patch_for_patch(self, sample_version):
         sample_version['version_id'] = SAMPLE_VERSION_ID_FOR_PATCH
         mock_api = MagicMock()